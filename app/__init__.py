@@ -6,6 +6,11 @@ from flask_login import LoginManager
 from app.models.entities.user import User
 from app.extensions import db
 from app.config import config
+from app.utils.parse_cache import parse_cache
+from app.utils.parser_registry import parser_registry
+from app.utils.dependency_graph import dependency_graph
+from app.utils import effective_config  # Enregistre le rafraîchissement de effective_parameter_values
+from app.utils import slug_helpers  # Enregistre l'attribution des slugs en lot à chaque flush
 from datetime import datetime
 import jinja2
 
@@ -99,6 +104,17 @@ def create_app(config_name='default'):
     migrate.init_app(app, db)
     login_manager.init_app(app)
 
+    # Limites du cache de parsing partagé
+    parse_cache.configure(
+        max_entries=app.config.get('PARSE_CACHE_MAX_ENTRIES'),
+        max_size=app.config.get('PARSE_CACHE_MAX_SIZE')
+    )
+    parser_registry.configure(
+        default_parser=app.config.get('DEFAULT_CONFIG_PARSER'),
+        ttl=app.config.get('PARSER_REGISTRY_TTL')
+    )
+    dependency_graph.configure(ttl=app.config.get('DEPENDENCY_GRAPH_TTL'))
+
     @app.template_filter('datetimeformat')
     def datetimeformat(value, format='%d/%m/%Y'):
         """Filtre personnalisé pour formater les dates"""
@@ -12,6 +12,29 @@ class Config:
         }
     }
     
+    # Upload des fichiers de configuration (lecture par blocs)
+    CONFIG_UPLOAD_FOLDER = os.getenv('CONFIG_UPLOAD_FOLDER', '/app/uploads/configurations')
+    CONFIG_UPLOAD_CHUNK_SIZE = 64 * 1024
+    CONFIG_INLINE_MAX_SIZE = 1024 * 1024  # Au-delà, le contenu reste uniquement sur disque (file_path)
+
+    # Cache des résultats de parsing (indexé par sha256 du contenu)
+    PARSE_CACHE_MAX_ENTRIES = 256
+    PARSE_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+    # Registre des parsers (ConfigSchema.file_pattern -> ConfigSchema.parser_class)
+    DEFAULT_CONFIG_PARSER = 'ConfigFileParser'  # Fichiers ne correspondant à aucun schéma
+    PARSER_REGISTRY_TTL = 300  # Secondes avant relecture des schémas
+
+    # Graphe des dépendances entre paramètres (parameter_dependencies)
+    DEPENDENCY_GRAPH_TTL = 300  # Secondes avant reconstruction (écritures hors ORM)
+
+    # Configuration effective matérialisée : recalcul des robots concernés à chaque commit
+    EFFECTIVE_CONFIG_AUTO_REFRESH = True
+
+    # Archivage des valeurs désactivées (flask archive-parameter-values)
+    PARAMETER_ARCHIVE_AFTER_DAYS = 365  # Âge minimal depuis la désactivation
+    PARAMETER_ARCHIVE_BATCH_SIZE = 5000  # Valeurs par transaction
+
     # Nouvelles configurations de sécurité
     SESSION_COOKIE_NAME = 'config_analyzer_session'
     SESSION_REFRESH_EACH_REQUEST = True
@@ -29,7 +29,9 @@ from .parameters import (
     FloatParameterValue,
     StringParameterValue,
     JSONParameterValue,
-    ParameterDependency
+    ParameterDependency,
+    EffectiveParameterValue,
+    ParameterValueArchive
 )
 
 
@@ -71,5 +73,7 @@ __all__ = [
     'StringParameterValue',
     'JSONParameterValue',
     'ParameterDependency',
+    'EffectiveParameterValue',
+    'ParameterValueArchive',
 
 ]
@@ -1,6 +1,9 @@
 # app/models/associations/configuration_entity_link.py
+from collections import defaultdict
+
 from sqlalchemy import CheckConstraint, Index, ForeignKey
 from sqlalchemy.orm import relationship, validates, declared_attr
+from sqlalchemy.orm.util import identity_key
 from app.extensions import db
 from app.models.enums import EntityType
 from app.models.base import Entity
@@ -64,7 +67,8 @@ class ConfigurationEntityLink(db.Model):
     @property
     def resolved_entity(self):
         """Résout l'entité référencée de manière polymorphique"""
-        return Entity.get_polymorphic_class(EntityType(self.entity_type)).query.get(self.entity_id)
+        entity_class = Entity.get_polymorphic_class(EntityType(self.entity_type))
+        return db.session.get(entity_class, self.entity_id)
 
     @resolved_entity.setter
     def resolved_entity(self, value):
@@ -73,3 +77,31 @@ class ConfigurationEntityLink(db.Model):
             raise TypeError("Seulement des sous-classes Entity autorisées")
         self.entity_type = value.entity_type
         self.entity_id = value.id
+
+    @classmethod
+    def resolve_many(cls, links):
+        """
+        Entités référencées par un ensemble de liens : une requête IN par type d'entité
+        (les entités déjà présentes dans la session ne sont pas relues).
+
+        Returns:
+            dict: {(EntityType, entity_id): entité} ; les références introuvables sont absentes
+        """
+        ids_by_type = defaultdict(set)
+        for link in links:
+            ids_by_type[EntityType(link.entity_type)].add(link.entity_id)
+
+        entities = {}
+        for entity_type, entity_ids in ids_by_type.items():
+            entity_class = Entity.get_polymorphic_class(entity_type)
+            missing = set()
+            for entity_id in entity_ids:
+                entity = db.session.identity_map.get(identity_key(entity_class, entity_id))
+                if entity is None:
+                    missing.add(entity_id)
+                else:
+                    entities[(entity_type, entity_id)] = entity
+            if missing:
+                for entity in entity_class.query.filter(entity_class.id.in_(missing)):
+                    entities[(entity_type, entity.id)] = entity
+        return entities
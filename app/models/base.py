@@ -1,6 +1,6 @@
 # app/models/base.py
 from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, event, and_, or_
-from sqlalchemy.orm import declared_attr, relationship, backref
+from sqlalchemy.orm import declared_attr, relationship, backref, object_session
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from app.extensions import db
@@ -40,9 +40,13 @@ class QueryMixin:
     
     @classmethod
     def get_polymorphic_class(cls, entity_type: EntityType):
-        # Conversion du snake_case au CamelCase
-        class_name = inflection.camelize(entity_type.value)
-        return getattr(db.Model, class_name)
+        """Classe mappée d'un EntityType (registre précalculé, voir entity_classes)"""
+        entity_type = EntityType(entity_type)
+        registry = entity_classes()
+        if entity_type not in registry:
+            # Sous-classe importée après la construction du registre
+            registry = entity_classes(refresh=True)
+        return registry[entity_type]
 
 # Supprimez __abstract__ = True pour créer une vraie table
 class Entity(db.Model, EntityMixin, QueryMixin):
@@ -78,6 +82,22 @@ class Entity(db.Model, EntityMixin, QueryMixin):
             passive_deletes=True
         )
 
+_ENTITY_CLASSES = {}
+
+def entity_classes(refresh=False):
+    """
+    Registre EntityType -> classe mappée, construit une fois à partir des identités
+    polymorphiques de Entity (Entity.__mapper__.polymorphic_map).
+    """
+    if refresh or not _ENTITY_CLASSES:
+        _ENTITY_CLASSES.clear()
+        _ENTITY_CLASSES.update({
+            identity: mapper.class_
+            for identity, mapper in Entity.__mapper__.polymorphic_map.items()
+            if identity is not None
+        })
+    return _ENTITY_CLASSES
+
 # Classe pour les entités spécifiques
 class SpecificEntity(Entity):
     """Classe de base pour les entités spécifiques"""
@@ -102,20 +122,20 @@ class SpecificEntity(Entity):
         return {}
 
 def configure_slug_generation(cls):
+    cls.__generates_slug__ = True
+
     @event.listens_for(cls, 'before_insert')
     @event.listens_for(cls, 'before_update')
     def generate_slug(mapper, connection, target):
-        from ..utils.slug_helpers import generate_model_slug  # Import local
+        from ..utils.slug_helpers import default_base_text, slug_allocator  # Import local
         
         if not target.slug:
             base_text = getattr(target, 'name', '')
             custom_field = getattr(cls, 'CUSTOM_SLUG_FIELD', None)
             custom_value = getattr(target, custom_field, None) if custom_field else None
 
-            target.slug = generate_model_slug(
-                base_text=base_text,
-                model_class=cls,
-                custom_value=custom_value,
-                max_length=25
-            )
+            # Allocateur partagé par le flush : slugs existants lus en lot, pas de doublon
+            # entre objets insérés ensemble
+            allocator = slug_allocator(object_session(target), cls, connection, max_length=25)
+            target.slug = allocator.allocate(base_text, custom_value, default_base_text(cls))
     return cls
@@ -1,13 +1,19 @@
 # app/models/configuration.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, event
-from sqlalchemy.orm import relationship, declared_attr
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, event, inspect, select
+from sqlalchemy.orm import relationship, declared_attr, validates
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from app.extensions import db
 from app.models.enums import EntityType
 from app.models.base import Entity
-from app.models.parameters import ParameterValue, ParameterDefinition, FloatParameterDefinition
+from app.models.parameters import ParameterValue, ParameterDefinition, FloatParameterDefinition, StringParameterDefinition
+from app.models.parameters.values import parse_float
 from app.models.associations.configuration_entity_link import ConfigurationEntityLink
+from app.utils.section_index import SectionIndex
+from app.utils.parse_cache import content_hash
+from app.utils.parser_registry import parser_registry
+from app.utils.param_helpers import insert_records
+from app.utils.parameter_validation import ParameterValidator, InvalidParameterError
 
 class ConfigurationInstance(db.Model):
     """Fichier de configuration brut + paramètres associés"""
@@ -16,10 +22,11 @@ class ConfigurationInstance(db.Model):
     id = Column(Integer, primary_key=True)
     entity_id = Column(Integer, nullable=False)
     entity_type = Column(db.Enum(EntityType), nullable=False)
-    file_hash = Column(String(64), unique=True)
+    file_hash = Column(String(64), index=True)  # sha256 du contenu, partagé si fichiers identiques
     file_name = Column(String(100), nullable=False)
     file_path = Column(String(255))
     raw_content = Column(Text)
+    section_index = Column(db.JSON, comment="Index des sections : ligne et position en octets de chaque clé")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -77,6 +84,67 @@ class ConfigurationInstance(db.Model):
     def client_configurations(self):
         return [pv for pv in self.parameters if pv.definition.target_entity == EntityType.CLIENT]
 
+    @property
+    def content_hash(self):
+        """Empreinte sha256 du contenu (calculée si file_hash n'a pas été renseigné)"""
+        if self.file_hash:
+            return self.file_hash
+        if self.raw_content is not None:
+            return content_hash(self.raw_content)
+        return None
+
+    @validates('raw_content', 'file_path')
+    def reset_section_index(self, key, value):
+        """Le contenu change : l'index des sections n'est plus valable"""
+        self.section_index = None
+        return value
+
+    def get_parser(self):
+        """
+        Parser du fichier, le même qu'à l'import : celui de son ConfigSchema, sinon celui
+        que le registre associe à son nom (ConfigFileParser par défaut)
+        """
+        _schema_id, parser = parser_registry.parser_for(self.file_name, self.schema_id)
+        return parser
+
+    def get_section_index(self):
+        """
+        Index des sections du fichier : celui enregistré à l'import, sinon construit à la
+        volée (sans modifier la configuration, cf. index_sections)
+        """
+        index = SectionIndex.from_dict(self.section_index)
+        if index is None:
+            index = self.build_section_index()
+        return index
+
+    def build_section_index(self):
+        """Index des sections construit depuis le contenu, ou None sans contenu"""
+        parser = self.get_parser()
+        # raw_content est toujours du texte (même sur une ligne) ; le chemin n'est lu que sans lui
+        if self.raw_content is not None:
+            return parser.build_text_section_index(self.raw_content)
+        if self.file_path:
+            return parser.build_file_section_index(self.file_path)
+        return None
+
+    def index_sections(self):
+        """Construit et enregistre l'index des sections (à l'import, une fois le contenu rangé)"""
+        index = self.build_section_index()
+        self.section_index = index.to_dict() if index is not None else None
+        return index
+
+    def iter_section_records(self, section_name):
+        """Enregistrements d'une seule section, relus directement à leurs positions"""
+        index = self.get_section_index()
+        if index is None:
+            return
+        parser = self.get_parser()
+        for entry in index.get_sections(section_name):
+            if self.raw_content is not None:
+                yield from parser.iter_text_section_records(self.raw_content, entry)
+            else:
+                yield from parser.iter_file_section_records(self.file_path, entry)
+
     @property
     def active_parameters(self):
         return [pv for pv in self.parameters if pv.is_active]
@@ -86,33 +154,100 @@ class ConfigurationInstance(db.Model):
         param_dates = [pv.updated_at for pv in self.parameters if pv.updated_at]
         return max(param_dates) if param_dates else self.updated_at
 
+    def iter_records(self, parser):
+        """
+        Enregistrements du fichier : raw_content est toujours lu comme du texte (même
+        sur une seule ligne ou vide), file_path n'est lu que si raw_content est absent.
+        """
+        if self.raw_content is not None:
+            return parser.iter_text_records(self.raw_content)
+        if self.file_path:
+            return parser.iter_file_records(self.file_path)
+        return iter(())
+
     def extract_parameters(self):
-        parser = ConfigFileParser(self)
-        for name, value in parser.parse():
-            definition = ParameterDefinition.query.filter_by(name=name).first()
-            if not definition:
-                definition = self._create_definition(name, value)
-            
-            ParameterValue.create(
-                definition=definition,
-                value=value,
-                config_instance=self
-            )
+        """Valeurs du fichier écrites par tranches, au fil du parsing"""
+        if self.id is None:
+            db.session.add(self)
+            db.session.flush()
+        records = self.iter_records(self.get_parser())
+        insert_records(self, ((record.key, record.value) for record in records))
+        if self.section_index is None:
+            self.index_sections()
     
     def _create_definition(self, name, value):
-        if value.isdigit():
-            return FloatParameterDefinition(name=name)
+        # Valeur déjà typée par le parser (CustomConfigParser) ou texte brut (ConfigFileParser) :
+        # définition float pour tout nombre fini, texte numérique compris ('-5', '3.14')
+        # (description obligatoire en base : renseignée avec le fichier d'origine)
+        description = f"Importé depuis {self.file_name}"
+        number = parse_float(value)
+        if number is not None:
+            # Bornes ouvertes : à affiner ensuite depuis l'interface
+            return FloatParameterDefinition(
+                name=name,
+                description=description,
+                default_value=number,
+                min_value=float('-inf'),
+                max_value=float('inf'),
+                unit=''
+            )
         # Ajouter d'autres types si nécessaire
+        return StringParameterDefinition(name=name, description=description)
 
     def validate(self):
-        for pv in self.parameters:
-            if not pv.definition.validate(pv.value):
-                raise InvalidParameterError(f"Valeur invalide pour {pv.definition.name}")
+        """
+        Vérifie toutes les valeurs actives de la configuration contre leur définition
+        (une requête pour les valeurs, une pour les définitions).
+
+        Raises:
+            InvalidParameterError: Au moins une valeur non conforme (détail dans .violations)
+        """
+        report = ParameterValidator().validate(config_instance_id=self.id)
+        if not report.is_valid:
+            first = report.violations[0]
+            raise InvalidParameterError(
+                f"Valeur invalide pour {first.name} : {first.message}",
+                report.violations
+            )
 
     @hybrid_property
     def linked_entities(self):
-        """Retourne toutes les entités liées de manière polymorphique"""
-        return [link.resolved_entity for link in self.entity_links]
+        """Retourne toutes les entités liées de manière polymorphique (une requête par type)"""
+        entities = ConfigurationEntityLink.resolve_many(self.entity_links)
+        return [
+            entities[key] for key in
+            ((EntityType(link.entity_type), link.entity_id) for link in self.entity_links)
+            if key in entities
+        ]
+
+    def first_linked_entity(self):
+        """Première entité liée, sans résoudre les autres liens"""
+        for link in self.entity_links:
+            entity = link.resolved_entity
+            if entity is not None:
+                return entity
+        return None
+
+    @classmethod
+    def load_linked_entities(cls, configurations):
+        """
+        Entités liées d'une liste de configurations : une requête pour les liens, puis
+        une requête par type d'entité.
+
+        Returns:
+            dict: {config_id: [entités]}
+        """
+        config_ids = [config.id for config in configurations]
+        if not config_ids:
+            return {}
+        links = ConfigurationEntityLink.query.filter(ConfigurationEntityLink.config_id.in_(config_ids)).all()
+        entities = ConfigurationEntityLink.resolve_many(links)
+        linked = {config_id: [] for config_id in config_ids}
+        for link in links:
+            entity = entities.get((EntityType(link.entity_type), link.entity_id))
+            if entity is not None:
+                linked[link.config_id].append(entity)
+        return linked
 
     def link_entity(self, entity):
         """Ajoute une liaison à une entité"""
@@ -135,16 +270,6 @@ class ConfigurationInstance(db.Model):
         if link:
             self.entity_links.remove(link)
 
-class ConfigFileParser:
-    def __init__(self, config_instance):
-        self.raw_content = config_instance.raw_content
-        
-    def parse(self):
-        for line in self.raw_content.split('\n'):
-            if '=' in line:
-                name, value = line.split('=', 1)
-                yield name.strip(), value.strip()
-
 class ConfigSchema(db.Model):
     __tablename__ = 'config_schemas'
     
@@ -159,9 +284,49 @@ class ConfigSchema(db.Model):
         cascade="all, delete-orphan"
     )
 
-@event.listens_for(ConfigurationEntityLink, 'before_insert')
-@event.listens_for(ConfigurationEntityLink, 'before_update')
-def validate_entity_ref(mapper, connection, target):
-    entity_class = Entity.get_polymorphic_class(EntityType(target.entity_type))
-    if not entity_class.query.get(target.entity_id):
-        raise ValueError(f"Entité {target.entity_type}:{target.entity_id} introuvable")
+@event.listens_for(ConfigSchema, 'after_insert')
+@event.listens_for(ConfigSchema, 'after_update')
+@event.listens_for(ConfigSchema, 'after_delete')
+def invalidate_parser_registry(mapper, connection, target):
+    """Les motifs ou parsers ont changé : le registre sera recompilé au prochain upload"""
+    parser_registry.invalidate()
+
+_PENDING_LINKS_KEY = 'pending_entity_links'
+
+@event.listens_for(db.session, 'after_flush')
+def collect_entity_refs(session, flush_context):
+    """Liens créés ou réorientés : références vérifiées en lot au commit"""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, ConfigurationEntityLink):
+            continue
+        if obj not in session.new:
+            state = inspect(obj)
+            if not (state.attrs.entity_type.history.has_changes() or state.attrs.entity_id.history.has_changes()):
+                continue
+        session.info.setdefault(_PENDING_LINKS_KEY, set()).add((obj.entity_type, obj.entity_id))
+
+@event.listens_for(db.session, 'before_commit')
+def validate_entity_refs(session):
+    """
+    Vérifie que chaque lien en attente désigne une entité existante du bon type :
+    une requête par type d'entité, quel que soit le nombre de liens.
+    """
+    session.flush()  # Les liens encore en attente alimentent la file (after_flush)
+    pending = session.info.pop(_PENDING_LINKS_KEY, None)
+    if not pending:
+        return
+    ids_by_type = {}
+    for entity_type, entity_id in pending:
+        ids_by_type.setdefault(EntityType(entity_type), set()).add(entity_id)
+    for entity_type, entity_ids in ids_by_type.items():
+        entity_class = Entity.get_polymorphic_class(entity_type)
+        found = set(session.execute(
+            select(entity_class.id).where(entity_class.id.in_(entity_ids))
+        ).scalars())
+        missing = sorted(entity_ids - found)
+        if missing:
+            raise ValueError(f"Entité {entity_type.value}:{missing[0]} introuvable")
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_entity_refs(session):
+    session.info.pop(_PENDING_LINKS_KEY, None)
@@ -12,6 +12,8 @@ from .values import (
     StringParameterValue,
     JSONParameterValue
 )
+from .effective import EffectiveParameterValue
+from .archive import ParameterValueArchive
 
 __all__ = [
     'ParameterDefinition',
@@ -22,5 +24,7 @@ __all__ = [
     'ParameterValue',
     'FloatParameterValue',
     'StringParameterValue',
-    'JSONParameterValue'
+    'JSONParameterValue',
+    'EffectiveParameterValue',
+    'ParameterValueArchive'
 ]
@@ -0,0 +1,48 @@
+# app/models/parameters/archive.py
+from sqlalchemy.sql import func
+from app.extensions import db
+from app.models.enums import EntityType
+
+class ParameterValueArchive(db.Model):
+    """
+    Valeurs désactivées depuis longtemps, sorties de parameter_values pour garder la
+    table chaude (et ses index) petite. Mêmes colonnes que parameter_values, la valeur
+    typée (et les autres colonnes de sa table concrète) étant recopiée dans les colonnes
+    de son value_type (tables concrètes à plat).
+    Alimentée par app.utils.value_archive (ne pas écrire directement).
+    """
+    __tablename__ = 'parameter_values_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Id d'origine conservé
+    value_type = db.Column(db.String(50))
+    parameter_definition_id = db.Column(
+        db.Integer,
+        db.ForeignKey('parameter_definitions.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    entity_id = db.Column(db.Integer)
+    entity_type = db.Column(db.Enum(EntityType))
+    config_instance_id = db.Column(db.Integer)  # Sans clé étrangère : la configuration peut avoir disparu
+    created_at = db.Column(db.DateTime(timezone=True))
+    updated_at = db.Column(db.DateTime(timezone=True))
+    is_active = db.Column(db.Boolean, default=False)
+    deactivated_at = db.Column(db.DateTime(timezone=True))
+    notes = db.Column(db.Text)
+
+    # Valeur typée, une colonne par table concrète
+    float_value = db.Column(db.Float)
+    string_value = db.Column(db.String(255))
+    json_value = db.Column(db.JSON)
+    enum_value = db.Column(db.JSON)
+    # Autres colonnes des tables concrètes : {value_type}_{colonne}
+    float_unit = db.Column(db.String(50))
+    string_max_length = db.Column(db.Integer)
+
+    archived_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        db.Index('idx_param_values_archive_validity', 'entity_type', 'entity_id', 'created_at', 'deactivated_at'),
+    )
+
+    definition = db.relationship("ParameterDefinition", foreign_keys=[parameter_definition_id])
@@ -1,8 +1,10 @@
 # app/models/parameters/dependencies.py
-from sqlalchemy import Column, ForeignKey, Integer, CheckConstraint
+from itertools import chain
+from sqlalchemy import Column, ForeignKey, Integer, CheckConstraint, event
 from sqlalchemy.orm import relationship, declared_attr
 from sqlalchemy.sql import func
 from app.extensions import db
+from app.utils.dependency_graph import dependency_graph
 from .definitions import ParameterDefinition
 
 class ParameterDependency(db.Model):
@@ -48,4 +50,29 @@ class ParameterDependency(db.Model):
         "ParameterValue",
         foreign_keys=[source_value_id],
         back_populates="dependencies"
-    )
\ No newline at end of file
+    )
+
+_DIRTY_KEY = 'dependency_graph_dirty'
+
+@event.listens_for(db.session, 'after_flush')
+def collect_dependency_changes(session, flush_context):
+    """Arcs ou conditions écrits dans la transaction : graphe à reconstruire à sa fin"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, ParameterDependency):
+            session.info[_DIRTY_KEY] = True
+            return
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_dependency_graph(session):
+    """Modifications validées : le graphe sera reconstruit au prochain accès"""
+    if session.info.pop(_DIRTY_KEY, False):
+        dependency_graph.invalidate()
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_dependency_changes(session):
+    """
+    Modifications annulées : un graphe reconstruit pendant la transaction (lignes non
+    validées) ne doit pas survivre jusqu'à l'expiration du TTL
+    """
+    if session.info.pop(_DIRTY_KEY, False):
+        dependency_graph.invalidate()
@@ -0,0 +1,47 @@
+# app/models/parameters/effective.py
+from sqlalchemy import Index
+from sqlalchemy.sql import func
+from app.extensions import db
+from app.models.enums import EntityType
+
+class EffectiveParameterValue(db.Model):
+    """
+    Configuration effective matérialisée : une ligne par robot et par définition,
+    avec la valeur retenue après héritage et le niveau d'où elle provient.
+    Tenue à jour par app.utils.effective_config (ne pas écrire directement).
+    """
+    __tablename__ = 'effective_parameter_values'
+
+    robot_instance_id = db.Column(
+        db.Integer,
+        db.ForeignKey('robotinstance.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    parameter_definition_id = db.Column(
+        db.Integer,
+        db.ForeignKey('parameter_definitions.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True
+    )
+    value_type = db.Column(db.String(50))
+    value = db.Column(db.JSON, comment="Valeur typée (nombre, texte, liste ou objet)")
+
+    # Provenance
+    source_entity_type = db.Column(db.Enum(EntityType), nullable=False)
+    source_entity_id = db.Column(db.Integer, nullable=False)
+    source_value_id = db.Column(
+        db.Integer,
+        db.ForeignKey('parameter_values.id', ondelete='CASCADE'),
+        index=True
+    )
+    refreshed_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+
+    robot_instance = db.relationship("RobotInstance", foreign_keys=[robot_instance_id])
+    definition = db.relationship("ParameterDefinition", foreign_keys=[parameter_definition_id])
+
+    __table_args__ = (
+        Index('idx_effective_source', 'source_entity_type', 'source_entity_id'),
+    )
+
+    def __repr__(self):
+        return f'<EffectiveParameterValue robot={self.robot_instance_id} def={self.parameter_definition_id}>'
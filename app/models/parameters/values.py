@@ -1,11 +1,20 @@
 # app/models/parameters/values.py
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, event, and_, or_
+import math
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, event, and_, or_, inspect
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, declared_attr, validates
 from sqlalchemy.ext.hybrid import hybrid_property
 from app.extensions import db
 from app.models.enums import EntityType
-from app.models.parameters.definitions import EnumParameterDefinition
+from app.models.parameters.definitions import EnumParameterDefinition, FloatParameterDefinition
+
+def parse_float(text):
+    """Nombre fini lu depuis un texte ('5', '-3.14', '1e3') ou un nombre, None sinon"""
+    try:
+        number = float(text)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
 
 class ParameterValue(db.Model):
     """Valeur polymorphique avec historisation"""
@@ -36,8 +45,22 @@ class ParameterValue(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
     is_active = db.Column(db.Boolean, default=True, index=True)
+    # Fin de validité : renseignée quand la valeur est désactivée (voir valid_at)
+    deactivated_at = db.Column(db.DateTime(timezone=True))
     notes = db.Column(db.Text)
 
+    __table_args__ = (
+        # Valeurs d'une entité (héritage, sélections en masse par entité)
+        db.Index('idx_param_values_entity', 'entity_type', 'entity_id', 'parameter_definition_id'),
+        # Historique d'une entité : valeurs valides à une date (created_at <= t < deactivated_at)
+        db.Index('idx_param_values_validity', 'entity_type', 'entity_id', 'created_at', 'deactivated_at'),
+        # Lectures courantes : valeurs actives uniquement (index partiel, hors historique)
+        db.Index(
+            'idx_param_values_active', 'entity_type', 'entity_id',
+            postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active')
+        ),
+    )
+
     configuration_instance = db.relationship(
         "ConfigurationInstance",
         back_populates="parameters",
@@ -109,29 +132,70 @@ class ParameterValue(db.Model):
             raise TypeError(f"Type de valeur non supporté: {type(value)}")
 
     @classmethod
-    def create_value(cls, definition, value, **kwargs):
+    def valid_at(cls, at, table=None):
         """
-        Méthode factory pour créer une instance de valeur du type approprié
-        en fonction de la définition et de la valeur fournie.
+        Condition SQL "la valeur était en vigueur à la date `at`" : créée avant `at` et
+        encore active, ou désactivée après `at`. Les lignes désactivées avant l'ajout de
+        deactivated_at se rabattent sur updated_at.
+
+        Args:
+            at (datetime): Date d'observation
+            table: Table ou alias portant les colonnes de parameter_values (défaut : la table)
+        """
+        table = cls.__table__ if table is None else table
+        return and_(
+            table.c.created_at <= at,
+            or_(
+                table.c.is_active == True,
+                func.coalesce(table.c.deactivated_at, table.c.updated_at) > at
+            )
+        )
+
+    @classmethod
+    def value_type_for(cls, definition, value):
+        """Type concret ('float', 'string', 'enum' ou 'json') d'une valeur, cf. coerce"""
+        return cls.coerce(definition, value)[0]
+
+    @classmethod
+    def coerce(cls, definition, value):
+        """
+        Type concret et valeur à stocker selon la définition. Règle unique partagée par
+        create_value et les insertions en masse : un texte numérique (parsers non typés)
+        rattaché à une définition float est converti et stocké en float.
+
+        Returns:
+            tuple: (type concret, valeur convertie)
         """
+        if isinstance(value, str) and isinstance(definition, FloatParameterDefinition):
+            number = parse_float(value)
+            if number is not None:
+                return 'float', number
         if isinstance(value, (int, float)) and not isinstance(value, bool):
-            return FloatParameterValue(definition=definition, value=float(value), **kwargs)
-        elif isinstance(value, str):
+            return 'float', float(value)
+        return cls._value_type(definition, value), value
+
+    @staticmethod
+    def _value_type(definition, value):
+        if isinstance(value, str):
             # Vérifier si c'est une enum ou une string
-            if isinstance(definition, EnumParameterDefinition):
-                return EnumParameterValue(definition=definition, value=value, **kwargs)
-            else:
-                return StringParameterValue(definition=definition, value=value, **kwargs)
+            return 'enum' if isinstance(definition, EnumParameterDefinition) else 'string'
         elif isinstance(value, list):
             # Liste d'enum ou liste JSON
             if isinstance(definition, EnumParameterDefinition) and definition.allow_multiple:
-                return EnumParameterValue(definition=definition, value=value, **kwargs)
-            else:
-                return JSONParameterValue(definition=definition, value=value, **kwargs)
+                return 'enum'
+            return 'json'
         elif isinstance(value, dict):
-            return JSONParameterValue(definition=definition, value=value, **kwargs)
-        else:
-            raise TypeError(f"Type de valeur non pris en charge: {type(value)}")
+            return 'json'
+        raise TypeError(f"Type de valeur non pris en charge: {type(value)}")
+
+    @classmethod
+    def create_value(cls, definition, value, **kwargs):
+        """
+        Méthode factory pour créer une instance de valeur du type approprié
+        en fonction de la définition et de la valeur fournie.
+        """
+        value_type, value = cls.coerce(definition, value)
+        return VALUE_CLASSES[value_type](definition=definition, value=value, **kwargs)
 
 
 class FloatParameterValue(ParameterValue):
@@ -180,3 +244,19 @@ class EnumParameterValue(ParameterValue):
                 if value not in allowed_values:
                     raise ValueError(f"Valeur {value} non autorisée")
         return value
+
+# Classe concrète de chaque value_type
+VALUE_CLASSES = {
+    'float': FloatParameterValue,
+    'string': StringParameterValue,
+    'json': JSONParameterValue,
+    'enum': EnumParameterValue,
+}
+
+
+@event.listens_for(ParameterValue, 'before_update', propagate=True)
+def track_deactivation(mapper, connection, target):
+    """Date de fin de validité posée (ou effacée) quand is_active change"""
+    history = inspect(target).attrs.is_active.history
+    if history.has_changes():
+        target.deactivated_at = None if target.is_active else func.now()
@@ -1,11 +1,16 @@
 #app/routes/additional_params.py
 
-from flask import Blueprint, request, render_template, redirect, url_for, flash, abort
+from datetime import datetime, timezone
+
+from flask import Blueprint, request, render_template, redirect, url_for, flash, abort, jsonify
 from app.models.entities import Client, RobotInstance, RobotModel, Software, SoftwareVersion
 from app.models.parameters.definitions import ParameterDefinition
 from app.models.parameters.values import ParameterValue
 from app.models.enums import EntityType
 from app.extensions import db
+from app.utils.parameter_validation import validate_form_rows
+from app.utils.bulk_apply_helpers import BulkParameterApply
+from app.utils.config_history import configuration_at, parameter_history, parse_timestamp
 from sqlalchemy.exc import SQLAlchemyError
 
 additional_params_bp = Blueprint('additional_params', __name__, url_prefix='/additional-params')
@@ -100,21 +105,40 @@ def edit_additional_params(table_name, entity_identifier):
     entity_name = entity.name
     
     if request.method == 'POST':
+        # Lignes saisies, dans l'ordre du formulaire : param_<id de valeur existante ou de définition>
+        submitted = [
+            (int(key.split('_')[1]), value)
+            for key, value in request.form.items(multi=True) if key.startswith('param_')
+        ]
+        param_ids = {param_id for param_id, _value in submitted}
+        existing = {
+            param_value.id: param_value
+            for param_value in ParameterValue.query.filter(ParameterValue.id.in_(param_ids)).all()
+        } if param_ids else {}
+
+        # Contrôle avant écriture de chaque ligne : règles compilées en cache (définition + updated_at)
+        errors = validate_form_rows([
+            (existing[param_id].parameter_definition_id if param_id in existing else param_id, value)
+            for param_id, value in submitted
+        ])
+        if errors:
+            for _index, message in errors:
+                flash(message, 'danger')
+            return redirect(url_for('additional_params.edit_additional_params', table_name=table_name, entity_identifier=entity_identifier))
+
         try:
-            for key, value in request.form.items():
-                if key.startswith('param_'):
-                    param_id = int(key.split('_')[1])
-                    param_value = ParameterValue.query.get(param_id)
-                    if param_value:
-                        param_value.value = value
-                    else:
-                        new_param = ParameterValue(
-                            parameter_definition_id=param_id,
-                            entity_id=entity.id,
-                            entity_type=entity.entity_type,
-                            value=value
-                        )
-                        db.session.add(new_param)
+            for param_id, value in submitted:
+                param_value = existing.get(param_id)
+                if param_value:
+                    param_value.value = value
+                else:
+                    new_param = ParameterValue(
+                        parameter_definition_id=param_id,
+                        entity_id=entity.id,
+                        entity_type=entity.entity_type,
+                        value=value
+                    )
+                    db.session.add(new_param)
             
             db.session.commit()
             flash('Paramètres mis à jour avec succès', 'success')
@@ -188,6 +212,74 @@ def add_additional_param(table_name, entity_identifier):
     )
 
 
+@additional_params_bp.route('/bulk-apply', methods=['POST'])
+def bulk_apply():
+    """
+    Pose (mode 'set') ou désactive (mode 'deactivate') un paramètre sur toutes les entités
+    où un autre paramètre a une valeur donnée.
+    Corps JSON : match_definition_id, match_value, definition_id, value, mode,
+    entity_type (optionnel), dry_run (défaut : true)
+    """
+    try:
+        data = request.get_json()
+        operation = BulkParameterApply(
+            int(data['match_definition_id']),
+            data['match_value'],
+            int(data['definition_id']),
+            data.get('value'),
+            mode=data.get('mode', 'set'),
+            entity_type=data.get('entity_type')
+        )
+        if data.get('dry_run', True):
+            return jsonify({'status': 'success', 'dry_run': True, **operation.dry_run()})
+        return jsonify({'status': 'success', 'dry_run': False, **operation.run()})
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except SQLAlchemyError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@additional_params_bp.route('/snapshot/<string:entity_type>/<int:entity_id>')
+def snapshot(entity_type, entity_id):
+    """
+    Configuration d'une entité à une date : ?at=<date ISO 8601> (défaut : maintenant),
+    ?include_archive=1 pour les dates antérieures à l'archivage
+    """
+    try:
+        at = parse_timestamp(request.args['at']) if request.args.get('at') else datetime.now(timezone.utc)
+        snapshot = configuration_at(
+            entity_type, entity_id, at,
+            include_archive=request.args.get('include_archive', type=int, default=0) == 1
+        )
+        return jsonify({'status': 'success', **snapshot.to_dict()})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
+@additional_params_bp.route('/history/<string:entity_type>/<int:entity_id>')
+def history(entity_type, entity_id):
+    """
+    Valeurs successives des paramètres d'une entité avec leur période de validité.
+    Filtres optionnels : ?definition_id=, ?since=, ?until= (dates ISO 8601),
+    ?include_archive=1 pour inclure les valeurs archivées
+    """
+    try:
+        rows = parameter_history(
+            entity_type,
+            entity_id,
+            definition_id=request.args.get('definition_id', type=int),
+            since=parse_timestamp(request.args['since']) if request.args.get('since') else None,
+            until=parse_timestamp(request.args['until']) if request.args.get('until') else None,
+            include_archive=request.args.get('include_archive', type=int, default=0) == 1
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    for row in rows:
+        row['valid_from'] = row['valid_from'].isoformat() if row['valid_from'] else None
+        row['valid_to'] = row['valid_to'].isoformat() if row['valid_to'] else None
+    return jsonify({'status': 'success', 'entity_type': entity_type, 'entity_id': entity_id, 'history': rows})
+
+
 def get_additional_params_data(entity):
     """Récupère les données des paramètres additionnels pour une entité donnée"""
     parameter_definitions = ParameterDefinition.query.filter_by(target_entity=entity.entity_type).all()
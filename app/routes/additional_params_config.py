@@ -1,12 +1,15 @@
 # /app/routes/additional_params_config.py
 
-from flask import Blueprint, request, render_template, redirect, url_for, flash, abort, session
+import re
+from flask import Blueprint, request, render_template, redirect, url_for, flash, abort, session, jsonify
 from urllib.parse import urlparse
 from app.models.entities import RobotModel, Client, Software
 from app.models.parameters.definitions import ParameterDefinition
 from app.models.parameters.values import ParameterValue
 from app.models.enums import EntityType
 from app.extensions import db
+from app.utils.parameter_validation import CompiledDefinition
+from app.utils.pagination import KeysetPaginator, wants_json
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import or_
 from flask_login import current_user
@@ -49,6 +52,20 @@ def handle_config_form(definition, form_data):
     else:
         _handle_text_type(definition, form_data)
 
+    _check_default_value(definition)
+
+def _check_default_value(definition):
+    """
+    La valeur par défaut doit respecter les règles saisies. Les règles sont compilées
+    depuis le formulaire (la version en cache est évincée à l'enregistrement).
+    """
+    default_value = getattr(definition, 'default_value', None)
+    if default_value in (None, ''):
+        return
+    problems = CompiledDefinition.from_definition(definition).check(default_value)
+    if problems:
+        raise ValueError(f"Valeur par défaut invalide : {problems[0][1]}")
+
 def save_config(definition, is_new=False):
     """Sauvegarde commune pour add/edit"""
     try:
@@ -85,22 +102,33 @@ def _handle_enum_type(definition, form_data):
 
 
 
+# Tri et recherche côté serveur de la liste des définitions
+DEFINITIONS_PAGINATION = KeysetPaginator(
+    sorts={'name': ParameterDefinition.name, 'created_at': ParameterDefinition.created_at},
+    default_sort='name',
+    id_column=ParameterDefinition.id,
+    search_columns=(ParameterDefinition.name,),
+    per_page=20
+)
+
 @additional_params_config_bp.route('/list')
 def list():
-    page = request.args.get('page', 1, type=int)
-    items_per_page = 20
-    search_query = request.args.get('q', '')
+    page = DEFINITIONS_PAGINATION.paginate(ParameterDefinition.query)
+    if wants_json():
+        return jsonify(page.to_dict(lambda definition: {
+            'id': definition.id,
+            'name': definition.name,
+            'description': definition.description,
+            'type': definition.definition_type,
+            'target_entity': definition.target_entity.value if definition.target_entity else None
+        }))
     
     query = ParameterDefinition.query
-    
-    if search_query:
-        query = query.filter(ParameterDefinition.name.ilike(f'%{search_query}%'))
-    
+    if page.q:
+        query = query.filter(ParameterDefinition.name.ilike(f'%{page.q}%'))
     total_items = query.count()
     
-    paginated = query.paginate(page=page, per_page=items_per_page, error_out=False)
-    
-    for config in paginated.items:
+    for config in page.items:
         try:
             if config.target_entity == EntityType.ROBOT_MODEL:
                 entity = RobotModel.query.filter(RobotModel.id == config.entity_id).first()
@@ -112,12 +140,10 @@ def list():
     
     return render_template(
         'list/additional_params_config.html', 
-        items=paginated.items,
+        items=page.items,
         total_items=total_items,
-        total_pages=paginated.pages,
         page=page,
-        items_per_page=items_per_page,
-        offset=(page - 1) * items_per_page
+        items_per_page=page.per_page
     )
 
 
@@ -138,8 +164,12 @@ def add(entity_type=None, entity_slug=None):
             created_by_user_id=current_user.id if current_user.is_authenticated else None
         )
         
-        handle_config_form(new_definition, request.form)
-        
+        try:
+            handle_config_form(new_definition, request.form)
+        except ValueError as e:
+            flash(str(e), "error")
+            return redirect(request.url)
+
         try:
             db.session.add(new_definition)
             db.session.commit()
@@ -169,8 +199,13 @@ def edit(config_id):
     return_url = get_redirect_url(entity_type, entity_slug)
 
     if request.method == 'POST':
-        handle_config_form(definition, request.form)
-        
+        try:
+            handle_config_form(definition, request.form)
+        except ValueError as e:
+            db.session.rollback()
+            flash(str(e), "error")
+            return redirect(request.url)
+
         if save_config(definition):
             flash("Configuration updated successfully", "success")
             return redirect(return_url)
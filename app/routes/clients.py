@@ -3,7 +3,7 @@
 Routes pour la gestion des clients.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app.models.entities.client import Client
 from app.models.basic.postal_code import PostalCode
 from app.models.entities.robot_instance import RobotInstance
@@ -13,12 +13,15 @@ from app.models.parameters.definitions import ParameterDefinition
 from app.models.parameters.values import ParameterValue
 from app.models.enums import EntityType
 from app.extensions import db
-from sqlalchemy import or_, and_
+from datetime import datetime
+from sqlalchemy import or_, and_, case, func, select
 from sqlalchemy.orm import joinedload
 from sqlalchemy.dialects.postgresql import ARRAY
-from app.utils.param_helpers import get_applicable_params_configs, get_unconfigured_params
+from app.utils.param_helpers import get_params_status, count_missing_params
 from app.utils.countries import get_countries_list
 from app.utils.validators import validate_client_form, get_or_create_postal_code
+from app.utils.parameter_validation import validate_form_values
+from app.utils.pagination import KeysetPaginator, wants_json
 
 # Définition du blueprint avec un préfixe explicite
 clients_bp = Blueprint('clients', __name__, url_prefix='/clients')
@@ -30,18 +33,8 @@ def view(slug):
         joinedload(Client.postal_code_relation)
     ).first_or_404()
 
-    # Le reste du code reste inchangé
-    applicable_configs = ParameterDefinition.query.filter(
-        ParameterDefinition.target_entity == EntityType.CLIENT
-    ).all()
-    
-    configured_params = ParameterValue.query.filter(
-        ParameterValue.entity_id == client.id,
-        ParameterValue.entity_type == EntityType.CLIENT
-    ).all()
-    
-    unconfigured_params = [c for c in applicable_configs if c.id not in [p.parameter_definition_id for p in configured_params]]
-    
+    configured_params, unconfigured_params = get_params_status(EntityType.CLIENT, client.id)
+
     return render_template(
         'view/client.html',
         client=client,
@@ -52,18 +45,82 @@ def view(slug):
     )
 
 
+# Tri et recherche côté serveur de la liste des clients
+CLIENTS_PAGINATION = KeysetPaginator(
+    sorts={'name': Client.name, 'created_at': Client.created_at},
+    default_sort='name',
+    id_column=Client.id,
+    search_columns=(Client.name,)
+)
+
+def clients_page(args=None):
+    """
+    Page de clients de la liste, avec leur code postal (jointure) et leurs robots
+    (selectin : une seule requête IN pour toute la page).
+
+    Args:
+        args (dict): Paramètres de pagination (défaut : request.args)
+    """
+    return CLIENTS_PAGINATION.paginate(
+        Client.query.options(
+            db.joinedload(Client.postal_code_relation),
+            db.selectinload(Client.robots)
+        ),
+        args
+    )
+
+def clients_stats():
+    """
+    Statistiques de la liste sur l'ensemble des clients, en une requête : total,
+    nouveaux clients du mois, total des robots et unicité du pays.
+
+    Returns:
+        dict: total_clients, new_clients, total_robots, same_country, country_code
+    """
+    now = datetime.now()
+    current_month_start = datetime(now.year, now.month, 1)
+    total_robots = select(func.count(RobotInstance.id)).correlate(None).scalar_subquery()
+
+    total_clients, new_clients, countries, without_country, country_code, total_robots = db.session.query(
+        func.count(Client.id),
+        func.count(case((Client.created_at >= current_month_start, Client.id))),
+        func.count(func.distinct(PostalCode.country_code)),
+        func.count(Client.id) - func.count(PostalCode.country_code),
+        func.min(PostalCode.country_code),
+        total_robots
+    ).select_from(Client).outerjoin(PostalCode, PostalCode.id == Client.postal_code_id).one()
+
+    return {
+        'total_clients': total_clients,
+        'new_clients': new_clients,
+        'total_robots': total_robots,
+        # Tous les clients ont-ils le même code pays ? (un seul pays, aucun client sans code postal)
+        'same_country': countries <= 1 and not without_country,
+        'country_code': country_code if total_clients else None
+    }
+
 @clients_bp.route('/list')
 def list():
-    """Liste tous les clients."""
-    # Charger explicitement la relation postal_code
-    clients_query = Client.query.options(
-        db.joinedload(Client.postal_code_relation)
-    ).all()
+    """Liste les clients, page par page (?format=json pour le défilement infini)."""
+    page = clients_page()
+    if wants_json():
+        return jsonify(page.to_dict(lambda client: {
+            'id': client.id,
+            'slug': client.slug,
+            'name': client.name,
+            'postal_code': client.postal_code_relation.code if client.postal_code_relation else None,
+            'city': client.postal_code_relation.city if client.postal_code_relation else None,
+            'url': url_for('clients.view', slug=client.slug)
+        }))
+    clients_query = page.items
     
+    # Nombre de paramètres applicables non renseignés, pour toute la page (une requête)
+    missing_params = count_missing_params(EntityType.CLIENT, [client.id for client in clients_query])
+
     # Préparer les données formatées pour le tableau
     formatted_clients = []
     for client in clients_query:
-        # Formatter les données des robots
+        # Formatter les données des robots (déjà chargés avec la page)
         robots_data = []
         for robot in client.robots:
             robots_data.append({
@@ -79,33 +136,13 @@ def list():
             'name': client.name,
             'postal_code_relation.code': client.postal_code_relation.code if client.postal_code_relation else '-',
             'postal_code_relation.city': client.postal_code_relation.city if client.postal_code_relation else '-',
-            'robots': robots_data
+            'robots': robots_data,
+            'missing_params': missing_params[client.id]
         }
         formatted_clients.append(client_data)
     
-    # Calcul des statistiques
-    from datetime import datetime, timedelta
-    from sqlalchemy import func
-    
-    # Date du début du mois courant
-    current_month_start = datetime(datetime.now().year, datetime.now().month, 1)
-    
-    # Nouveaux clients ce mois-ci
-    new_clients = Client.query.filter(Client.created_at >= current_month_start).count()
-    
-    # Total des robots pour tous les clients
-    total_robots = db.session.query(func.count(RobotInstance.id)).scalar()
-    
-    # Vérifier si tous les clients ont le même code pays
-    same_country = True
-    country_code = None
-    
-    if clients_query:
-        country_code = clients_query[0].postal_code_relation.country_code if clients_query[0].postal_code_relation else None
-        for client in clients_query:
-            if not client.postal_code_relation or client.postal_code_relation.country_code != country_code:
-                same_country = False
-                break
+    # Calcul des statistiques (sur tous les clients, pas seulement la page)
+    stats = clients_stats()
     
     # Obtenir la liste des pays pour le formulaire d'ajout rapide
     countries = get_countries_list()
@@ -119,6 +156,8 @@ def list():
         'list/clients.html', 
         params_configs=params_configs,
         clients=formatted_clients,
+        page=page,
+        total_clients=stats['total_clients'],
         countries=countries,
         name_error=None,
         postal_code_error=None,
@@ -129,11 +168,11 @@ def list():
         columns=['name', 'postal_code_relation.code', 'postal_code_relation.city', 'robots'],
         headers=['Nom', 'Code Postal', 'Ville', 'Robots', 'Actions'],
         # Statistiques
-        new_clients=new_clients,
-        total_robots=total_robots,
+        new_clients=stats['new_clients'],
+        total_robots=stats['total_robots'],
         # Info pays
-        same_country=same_country,
-        country_code=country_code
+        same_country=stats['same_country'],
+        country_code=stats['country_code']
     )
 
 @clients_bp.route('/add', methods=['GET', 'POST'])
@@ -186,9 +225,7 @@ def edit(slug):
     countries = get_countries_list()
     
     # Récupérer les configurations existantes pour la vue
-    applicable_configs = get_applicable_params_configs('client', client.id)
-    unconfigured_params = get_unconfigured_params(client.id, applicable_configs)
-    configured_params = [p for p in applicable_configs if p not in unconfigured_params]
+    configured_params, unconfigured_params = get_params_status(EntityType.CLIENT, client.id)
     
     if request.method == 'POST':
         name = request.form.get('name')
@@ -213,6 +250,21 @@ def edit(slug):
         )
         if not is_valid:
             return response
+
+        # Valeurs des paramètres supplémentaires : format, bornes et choix (règles en cache)
+        param_errors = validate_form_values({
+            int(key.split('_')[1]): value.strip()
+            for key, value in request.form.items() if key.startswith('param_')
+        })
+        if param_errors:
+            for message in param_errors.values():
+                flash(message, "error")
+            return render_template('edit/client.html',
+                                  client=client,
+                                  form_data=form_data,
+                                  countries=countries,
+                                  configured_params=configured_params,
+                                  unconfigured_params=unconfigured_params)
         
         # Mettre à jour le nom du client
         client.name = name
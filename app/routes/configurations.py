@@ -1,17 +1,45 @@
 # app/routes/configurations.py
-from flask import Blueprint, render_template, redirect, url_for, flash, request
-from app.models.configuration import ConfigurationInstance, ConfigSchema, ConfigFileParser
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
+from app.models.configuration import ConfigurationInstance, ConfigSchema
 from app.models.entities import Client, Software, SoftwareVersion
-from app.models.parameters import ParameterDefinition, ParameterValue
 from app.models.enums import EntityType
 from app.extensions import db
+from app.utils.upload_helpers import StreamingUpload
+from app.utils.parse_cache import parse_cache
+from app.utils.parser_registry import parser_registry
+from app.utils.param_helpers import insert_records
+from app.utils.pagination import KeysetPaginator, wants_json
+from app.models.associations import ClientConfiguration
+from sqlalchemy import func, distinct
 from sqlalchemy.exc import SQLAlchemyError
 
 configurations_bp = Blueprint('configurations', __name__, url_prefix='/configurations')
 
+# Tri et recherche côté serveur de la liste des configurations
+CONFIGURATIONS_PAGINATION = KeysetPaginator(
+    sorts={'created_at': ConfigurationInstance.created_at, 'file_name': ConfigurationInstance.file_name},
+    default_sort='-created_at',
+    id_column=ConfigurationInstance.id,
+    search_columns=(ConfigurationInstance.file_name,)
+)
+
 @configurations_bp.route('/list')
 def list():
-    configurations = ConfigurationInstance.query.all()
+    # Une page de configurations (?format=json pour le défilement infini)
+    page = CONFIGURATIONS_PAGINATION.paginate(ConfigurationInstance.query)
+    configurations = page.items
+    # Entités liées de la page : une requête par type d'entité
+    linked_entities = ConfigurationInstance.load_linked_entities(configurations)
+    if wants_json():
+        return jsonify(page.to_dict(lambda config: {
+            'id': config.id,
+            'file_name': config.file_name,
+            'entity_type': config.entity_type.value,
+            'entity_id': config.entity_id,
+            'linked_entities': [entity.name for entity in linked_entities.get(config.id, [])],
+            'created_at': config.created_at.isoformat() if config.created_at else None
+        }))
+    total_configurations = db.session.query(func.count(ConfigurationInstance.id)).scalar()
     
     # Calcul des statistiques
     
@@ -31,6 +59,9 @@ def list():
     
     return render_template('list/configuration_instances.html', 
                           configurations=configurations,
+                          page=page,
+                          total_configurations=total_configurations,
+                          linked_entities=linked_entities,
                           total_softwares=total_softwares,
                           total_clients=total_clients)
 
@@ -42,39 +73,61 @@ def add():
             entity_type = request.form['entity_type']
             entity_id = request.form['entity_id']
             
-            # Créer une nouvelle instance de configuration
+            # Format déterminé par le ConfigSchema dont le motif correspond au nom du fichier
+            schema_id, parser = parser_registry.parser_for(file.filename)
+            
+            # Créer une nouvelle instance de configuration (le contenu est lu en streaming)
             new_config = ConfigurationInstance(
                 entity_type=EntityType[entity_type.upper()],
                 entity_id=entity_id,
                 file_name=file.filename,
-                raw_content=file.read().decode('utf-8')
+                schema_id=schema_id
             )
             
             db.session.add(new_config)
             db.session.flush()  # Pour obtenir l'ID de la nouvelle configuration
             
-            # Parser le fichier et extraire les paramètres
-            parser = ConfigFileParser(new_config)
-            for name, value in parser.parse():
-                definition = ParameterDefinition.query.filter_by(name=name).first()
-                if not definition:
-                    definition = new_config._create_definition(name, value)
-                    db.session.add(definition)
+            # Lecture par blocs : décodage, sha256 et parsing en une seule passe
+            with StreamingUpload(
+                file.stream,
+                current_app.config['CONFIG_UPLOAD_FOLDER'],
+                chunk_size=current_app.config['CONFIG_UPLOAD_CHUNK_SIZE']
+            ) as upload:
+                inline_max_size = current_app.config['CONFIG_INLINE_MAX_SIZE']
+                
+                # Fichier identique déjà parsé : simple recherche dans le cache
+                file_hash = upload.compute_hash()
+                cached_records = parse_cache.get(parser.cache_key(file_hash))
+                if cached_records is not None and upload.store_existing(new_config, file_hash, inline_max_size):
+                    records = cached_records
+                else:
+                    records = parse_cache.collect(
+                        parser.cache_key(file_hash),
+                        parser.iter_records(upload.iter_lines())
+                    )
+                
+                # Définitions résolues et valeurs insérées par tranches, au fil du parsing
+                insert_records(new_config, ((record.key, record.value) for record in records))
                 
-                param_value = ParameterValue(
-                    definition=definition,
-                    value=value,
-                    configuration_instance=new_config
-                )
-                db.session.add(param_value)
+                if not new_config.file_path:
+                    upload.save_to(new_config, inline_max_size)
+                
+                # Index des sections enregistré avec la configuration (édition section par section)
+                new_config.index_sections()
+                
+                # Dans le bloc : un commit refusé supprime aussi le fichier tout juste rangé
+                db.session.commit()
             
-            db.session.commit()
             flash("Configuration ajoutée avec succès", "success")
-            return redirect(url_for('configurations.list_configurations'))
+            return redirect(url_for('configurations.list'))
         
         except SQLAlchemyError as e:
             db.session.rollback()
             flash(f"Erreur lors de l'ajout de la configuration : {str(e)}", "error")
+        except ValueError as e:
+            # Contenu illisible ou valeur incompatible avec sa définition (ex. choix d'enum)
+            db.session.rollback()
+            flash(f"Fichier de configuration invalide : {str(e)}", "error")
     
     entities = {
         'client': Client.query.all(),
@@ -119,4 +172,4 @@ def delete(config_id):
     except SQLAlchemyError as e:
         db.session.rollback()
         flash(f"Erreur lors de la suppression : {str(e)}", "error")
-    return redirect(url_for('configurations.list_configurations'))
+    return redirect(url_for('configurations.list'))
@@ -5,7 +5,8 @@ from app.models.configuration import ConfigurationInstance, ConfigSchema
 from app.models.entities import Software, SoftwareVersion
 from app.models.parameters import ParameterDefinition, ParameterValue
 from app.extensions import db
-from app.utils.custom_config_parser import CustomConfigParser
+from app.utils.parse_cache import parse_cache
+from app.utils.param_helpers import get_definitions_by_name
 from sqlalchemy import select, func
 from datetime import datetime
 import uuid
@@ -20,7 +21,7 @@ def edit_parsed_content(config_id):
     config = ConfigurationInstance.query.get_or_404(config_id)
     
     # Récupérer l'entité associée (Software ou SoftwareVersion)
-    entity = config.linked_entities[0] if config.linked_entities else None
+    entity = config.first_linked_entity()
     
     # Récupérer les paramètres actifs pour cette configuration
     active_parameters = ParameterValue.query.filter_by(
@@ -28,21 +29,42 @@ def edit_parsed_content(config_id):
         is_active=True
     ).all()
     
-    # Parser le contenu du fichier
-    parser = CustomConfigParser()
-    parsed_data = parser.parse(config.raw_content)
+    # Index des sections enregistré à l'import (construit à la volée pour les anciens fichiers)
+    section_index = config.get_section_index()
+    current_section = request.args.get('section')
+
+    if current_section and section_index is not None:
+        # Une seule section : lecture directe de son bloc grâce aux positions de l'index
+        records = config.iter_section_records(current_section)
+    else:
+        # Parser le contenu du fichier en streaming (ou le rejouer depuis le cache par sha256),
+        # avec le même parser qu'à l'import
+        parser = config.get_parser()
+        records = parse_cache.iter_records(
+            parser.cache_key(config.content_hash),
+            lambda: config.iter_records(parser)
+        )
+
+    # Résolution des clés en une seule requête, puis recherches en mémoire
+    records = list(records)
+    definitions = get_definitions_by_name(record.key for record in records)
+    active_by_definition = {}
+    for p in active_parameters:
+        active_by_definition.setdefault(p.parameter_definition_id, p)
 
     table_data = []
-    for key, value in parsed_data.items():
-        param_def = ParameterDefinition.query.filter_by(name=key).first()
+    for section, key, value, line_no in records:
+        param_def = definitions.get(key)
         if param_def:
-            param_value = next((p for p in active_parameters if p.parameter_definition_id == param_def.id), None)
+            param_value = active_by_definition.get(param_def.id)
             if param_value:
                 table_data.append({
                     'name': param_def.name,
                     'value': param_value.value,
                     'type': param_def.type,
                     'id': param_value.id,
+                    'section': section,
+                    'line_no': line_no,
                     'status': 'À jour'
                 })
             else:
@@ -50,6 +72,8 @@ def edit_parsed_content(config_id):
                     'name': param_def.name,
                     'value': value,
                     'type': param_def.type,
+                    'section': section,
+                    'line_no': line_no,
                     'status': 'Non configuré'
                 })
         else:
@@ -57,6 +81,8 @@ def edit_parsed_content(config_id):
                 'name': key,
                 'value': value,
                 'type': 'unknown',
+                'section': section,
+                'line_no': line_no,
                 'status': 'Nouveau'
             })
 
@@ -65,7 +91,9 @@ def edit_parsed_content(config_id):
         table_data=table_data,
         config=config,
         entity=entity,
-        parameter_count=len(active_parameters)
+        parameter_count=len(active_parameters),
+        sections=section_index.section_names if section_index else [],
+        current_section=current_section
     )
 
 @parsed_files_bp.route('/create_parameter', methods=['POST'])
@@ -1,28 +1,93 @@
 # config_analyzer/app/routes/robot_instances.py
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app.models.entities.client import Client
 from app.models.entities.robot_model import RobotModel
 from app.models.entities.robot_instance import RobotInstance
+from app.models.entities.software_version import SoftwareVersion
+from app.models.associations.robot_instance_software_version import RobotInstanceSoftwareVersion
 from app.extensions import db
+from app.models.enums import EntityType
+from app.utils.config_history import configuration_at, parse_timestamp
+from app.utils.effective_config import EffectiveConfigResolver
+from app.utils.impact_analysis import analyze_change
+from app.utils.pagination import KeysetPaginator, wants_json
+from sqlalchemy import func, select
 from sqlalchemy.exc import SQLAlchemyError  # Ajout de l'import manquant
 
 robot_instances_bp = Blueprint('robot_instances', __name__, url_prefix='/robot-instances')
 
+# Tri et recherche côté serveur de la liste des robots
+ROBOT_INSTANCES_PAGINATION = KeysetPaginator(
+    sorts={'serial_number': RobotInstance.serial_number, 'created_at': RobotInstance.created_at},
+    default_sort='serial_number',
+    id_column=RobotInstance.id,
+    search_columns=(RobotInstance.serial_number,)
+)
+
+def robot_instances_page(args=None):
+    """
+    Page de robots de la liste. Client et modèle (plusieurs-à-un) sont joints ; les
+    logiciels installés sont chargés pour la page seule, par une requête IN (selectin),
+    avec leur version et leur logiciel, sans multiplier les lignes de la page.
+
+    Args:
+        args (dict): Paramètres de pagination (défaut : request.args)
+    """
+    return ROBOT_INSTANCES_PAGINATION.paginate(
+        RobotInstance.query.options(
+            db.joinedload(RobotInstance.client),
+            db.joinedload(RobotInstance.model),
+            db.selectinload(RobotInstance.software_versions)
+                .joinedload(RobotInstanceSoftwareVersion.software_version)
+                .joinedload(SoftwareVersion.software)
+        ),
+        args
+    )
+
+def robot_instances_stats():
+    """
+    Statistiques de la liste sur l'ensemble des robots, en une requête.
+
+    Returns:
+        dict: total_robots, robots_with_software, unique_clients
+    """
+    robots_with_software = select(
+        func.count(func.distinct(RobotInstanceSoftwareVersion.robot_instance_id))
+    ).scalar_subquery()
+    total_robots, unique_clients, robots_with_software = db.session.execute(
+        select(
+            func.count(RobotInstance.__table__.c.id),
+            func.count(func.distinct(RobotInstance.__table__.c.client_id)),
+            robots_with_software
+        )
+    ).one()
+    return {
+        'total_robots': total_robots,
+        'robots_with_software': robots_with_software,
+        'unique_clients': unique_clients
+    }
+
 @robot_instances_bp.route('/list')
 def list():
-    # Récupérer tous les robots
-    robot_instances = RobotInstance.query.options(
-        db.joinedload(RobotInstance.client),
-        db.joinedload(RobotInstance.model),
-        db.joinedload(RobotInstance.software_versions)
-    ).all()
-    
-    # Calculer les statistiques
-    robots_with_software = sum(1 for ri in robot_instances if ri.software_versions)
+    # Récupérer une page de robots (?format=json pour le défilement infini)
+    page = robot_instances_page()
+    if wants_json():
+        return jsonify(page.to_dict(lambda ri: {
+            'id': ri.id,
+            'slug': ri.slug,
+            'serial_number': ri.serial_number,
+            'client': ri.client.name if ri.client else None,
+            'model': ri.model.name if ri.model else None,
+            'software_versions': [
+                {'software': assoc.software_version.software.name, 'version': assoc.software_version.version}
+                for assoc in ri.software_versions
+            ],
+            'url': url_for('robot_instances.view', slug=ri.slug)
+        }))
+    robot_instances = page.items
     
-    # Obtenir le nombre de clients uniques
-    client_ids = set(ri.client_id for ri in robot_instances)
-    unique_clients = len(client_ids)
+    # Calculer les statistiques (sur tous les robots, pas seulement la page)
+    stats = robot_instances_stats()
     
     # Récupérer les configurations de paramètres pour les robots
     from app.models.parameters.definitions import ParameterDefinition
@@ -42,11 +107,14 @@ def list():
     
     return render_template('list/robot_instances.html', 
                           robot_instances=robot_instances,
-                          robots_with_software=robots_with_software,
-                          unique_clients=unique_clients,
+                          page=page,
+                          total_robots=stats['total_robots'],
+                          robots_with_software=stats['robots_with_software'],
+                          unique_clients=stats['unique_clients'],
                           configs_json=configs_json,
-                          clients=Client.query.all(),
-                          robot_models=RobotModel.query.all(),
+                          # Formulaire d'ajout : seuls id et nom sont affichés
+                          clients=db.session.query(Client.id, Client.name).order_by(Client.name).all(),
+                          robot_models=db.session.query(RobotModel.id, RobotModel.name).order_by(RobotModel.name).all(),
                           form_data={},
                           preselected_model_id=None,
                           serial_number_error=None,
@@ -162,24 +230,54 @@ def view(slug):
         db.joinedload(RobotInstance.software_versions)
     ).filter_by(slug=slug).first_or_404()
     
-    # Récupérer les configurations de paramètres applicables pour ce robot
-    from app.models.parameters.definitions import ParameterDefinition
-    from app.models.parameters.values import ParameterValue
+    # Définitions applicables pour ce robot, configurées ou non
     from app.models.enums import EntityType
-    from app.utils.param_helpers import get_unconfigured_params
-    
-    applicable_configs = ParameterDefinition.query.filter(
-        ParameterDefinition.target_entity == EntityType.ROBOT_INSTANCE
-    ).all()
-    
-    configured_params = ParameterValue.query.filter(
-        ParameterValue.entity_id == robot.id,
-        ParameterValue.entity_type == EntityType.ROBOT_INSTANCE
-    ).all()
-    
-    unconfigured_params = get_unconfigured_params(robot.id, applicable_configs)
-    
+    from app.utils.param_helpers import get_params_status
+
+    configured_params, unconfigured_params = get_params_status(EntityType.ROBOT_INSTANCE, robot.id)
+
     return render_template('view/robot_instance.html', 
                           robot_instance=robot,
                           configured_params=configured_params,
-                          unconfigured_params=unconfigured_params)
\ No newline at end of file
+                          unconfigured_params=unconfigured_params)
+
+@robot_instances_bp.route('/effective_config/<string:slug>')
+def effective_config(slug):
+    """
+    Paramètres effectivement appliqués au robot, avec le niveau d'où vient chaque valeur.
+    ?at=<date ISO 8601> : configuration telle qu'elle était à cette date
+    (?include_archive=1 pour lire aussi les valeurs archivées).
+    """
+    robot = RobotInstance.query.filter_by(slug=slug).first_or_404()
+    if request.args.get('at'):
+        try:
+            at = parse_timestamp(request.args['at'])
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        snapshot = configuration_at(
+            EntityType.ROBOT_INSTANCE, robot.id, at,
+            include_archive=request.args.get('include_archive', type=int, default=0) == 1
+        )
+        return jsonify(snapshot.to_dict())
+    config = EffectiveConfigResolver().resolve(robot)
+    return jsonify(config.to_dict())
+
+@robot_instances_bp.route('/impact', methods=['POST'])
+def impact():
+    """
+    Simulation d'une modification de paramètre (rien n'est écrit) : robots atteints,
+    robots où une surcharge masque la modification, dépendances basculées.
+    Corps JSON : entity_type, entity_id, definition_id, value, sample_size (optionnel)
+    """
+    try:
+        data = request.get_json()
+        report = analyze_change(
+            data['entity_type'],
+            int(data['entity_id']),
+            int(data['definition_id']),
+            data['value'],
+            sample_size=int(data.get('sample_size', 20))
+        )
+        return jsonify({'status': 'success', **report.to_dict()})
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
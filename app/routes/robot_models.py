@@ -1,5 +1,5 @@
 # app/routes/robot_models.py
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app.models.entities.robot_model import RobotModel
 from app.models.entities.software import Software
 from app.models.associations.robot_model_software import RobotModelSoftware
@@ -8,18 +8,37 @@ from app.models.parameters.definitions import ParameterDefinition
 from app.models.parameters.values import ParameterValue
 from app.models.enums import EntityType
 from app.extensions import db
-from app.utils.param_helpers import get_unconfigured_params
+from app.utils.param_helpers import get_params_status, count_missing_params
+from app.utils.pagination import KeysetPaginator, wants_json
 import traceback
 from sqlalchemy import func, distinct
 
 robot_models_bp = Blueprint('robot_models', __name__, url_prefix='/robot-models')
 
+# Tri et recherche côté serveur de la liste des modèles
+ROBOT_MODELS_PAGINATION = KeysetPaginator(
+    sorts={'name': RobotModel.name, 'created_at': RobotModel.created_at},
+    default_sort='name',
+    id_column=RobotModel.id,
+    search_columns=(RobotModel.name,)
+)
+
 @robot_models_bp.route('/list')
 def list():
-    """Liste tous les modèles de robots avec statistiques."""
-    robot_models = RobotModel.query.options(
+    """Liste les modèles de robots, page par page, avec statistiques."""
+    page = ROBOT_MODELS_PAGINATION.paginate(RobotModel.query.options(
         db.joinedload(RobotModel.software_associations).joinedload(RobotModelSoftware.software)
-    ).all()
+    ))
+    robot_models = page.items
+    if wants_json():
+        return jsonify(page.to_dict(lambda model: {
+            'id': model.id,
+            'slug': model.slug,
+            'name': model.name,
+            'softwares': [assoc.software.name for assoc in model.software_associations if assoc.software],
+            'url': url_for('robot_models.view', slug=model.slug)
+        }))
+    total_models = db.session.query(func.count(RobotModel.id)).scalar()
     
     # Calcul des statistiques
     
@@ -33,8 +52,14 @@ def list():
         .filter(ConfigurationInstance.entity_type == EntityType.ROBOT_MODEL)\
         .scalar()
     
+    # Nombre de paramètres applicables non renseignés par modèle de la page (une requête)
+    missing_params = count_missing_params(EntityType.ROBOT_MODEL, [model.id for model in robot_models])
+
     return render_template('list/robot_models.html', 
                           robot_models=robot_models,
+                          page=page,
+                          total_models=total_models,
+                          missing_params=missing_params,
                           softwares=Software.query.all(),
                           total_softwares=total_softwares,
                           total_configs=total_configs)
@@ -50,21 +75,14 @@ def view(slug):
     instances = robot_model.instances.all()
 
     # Récupération des paramètres
-    applicable_configs = ParameterDefinition.query.filter(
-        ParameterDefinition.target_entity == EntityType.ROBOT_MODEL
-    ).all()
-    
-    configured_params = ParameterValue.query.filter(
-        ParameterValue.entity_id == robot_model.id,
-        ParameterValue.entity_type == EntityType.ROBOT_MODEL
-    ).all()
-    
+    configured_params, unconfigured_params = get_params_status(EntityType.ROBOT_MODEL, robot_model.id)
+
     return render_template(
         'view/robot_model.html',
         robot_model=robot_model,
         instances=instances,  # Passer les instances chargées séparément
         configured_params=configured_params,
-        unconfigured_params=get_unconfigured_params(robot_model.id, applicable_configs)
+        unconfigured_params=unconfigured_params
     )
 
 @robot_models_bp.route('/add', methods=['GET', 'POST'])
@@ -1,30 +1,55 @@
 # app/routes/software_version.py
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app.models.entities.software import Software
 from app.models.entities.software_version import SoftwareVersion
 from app.extensions import db
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
+from app.utils.pagination import KeysetPaginator, wants_json
 
 software_versions_bp = Blueprint('software_versions', __name__, url_prefix='/software-versions')
 
+# Tri et recherche côté serveur de la liste des versions
+SOFTWARE_VERSIONS_PAGINATION = KeysetPaginator(
+    sorts={'version': SoftwareVersion.version, 'created_at': SoftwareVersion.created_at},
+    default_sort='version',
+    id_column=SoftwareVersion.id,
+    search_columns=(SoftwareVersion.version,)
+)
+
 @software_versions_bp.route('/list')
 def list():
-    versions = []
     software = None
+    extra_args = {}
+    query = SoftwareVersion.query.options(db.joinedload(SoftwareVersion.software))
     
     if request.args.get('software_slug'):
         software = Software.query.filter_by(slug=request.args.get('software_slug')).first()
-        if software:
-            versions = software.versions.all()
-    else:
-        versions = SoftwareVersion.query.all()
+        # Logiciel inconnu : liste vide, comme auparavant
+        query = query.filter(SoftwareVersion.software_id == (software.id if software else None))
+        extra_args['software_slug'] = request.args.get('software_slug')
+    
+    # Une page de versions (?format=json pour le défilement infini)
+    page = SOFTWARE_VERSIONS_PAGINATION.paginate(query)
+    if wants_json():
+        return jsonify(page.to_dict(lambda version: {
+            'id': version.id,
+            'slug': version.slug,
+            'version': version.version,
+            'software': version.software.name if version.software else None,
+            'url': url_for('software_versions.view', software_slug=version.software.slug, version_slug=version.slug) if version.software else None
+        }))
+    total_versions = query.order_by(None).with_entities(func.count(SoftwareVersion.id)).scalar()
     
     all_softwares = Software.query.all()
     
     return render_template('list/software_versions.html',
                           software=software,
-                          versions=versions,
+                          versions=page.items,
+                          page=page,
+                          extra_args=extra_args,
+                          total_versions=total_versions,
                           all_softwares=all_softwares)
 
 @software_versions_bp.route('/software/<string:software_slug>')
@@ -1,6 +1,6 @@
 # app/routes/softwares.py
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app.models.entities.software import Software
 from app.models.entities.robot_model import RobotModel
 from app.models.parameters.definitions import ParameterDefinition
@@ -8,15 +8,33 @@ from app.models.parameters.values import ParameterValue
 from app.models.enums import EntityType
 from app.extensions import db
 from sqlalchemy.exc import IntegrityError
+from app.utils.pagination import KeysetPaginator, wants_json
 
 softwares_bp = Blueprint('softwares', __name__, url_prefix='/softwares')
 
+# Tri et recherche côté serveur de la liste des logiciels
+SOFTWARES_PAGINATION = KeysetPaginator(
+    sorts={'name': Software.name, 'created_at': Software.created_at},
+    default_sort='name',
+    id_column=Software.id,
+    search_columns=(Software.name,)
+)
+
 @softwares_bp.route('/list')
 def list():
-    softwares = Software.query.all()
+    # Une page de logiciels (?format=json pour le défilement infini)
+    page = SOFTWARES_PAGINATION.paginate(Software.query)
+    if wants_json():
+        return jsonify(page.to_dict(lambda software: {
+            'id': software.id,
+            'slug': software.slug,
+            'name': software.name,
+            'url': url_for('softwares.view_software', slug=software.slug)
+        }))
     robot_models = RobotModel.query.all()
     return render_template('list/softwares.html', 
-                           softwares=softwares,
+                           softwares=page.items,
+                           page=page,
                            robot_models=robot_models)
 
 @softwares_bp.route('/add', methods=['GET', 'POST'])
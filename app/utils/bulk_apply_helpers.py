@@ -0,0 +1,252 @@
+# app/utils/bulk_apply_helpers.py
+"""
+Application en masse d'un paramètre : "mettre P = V sur toutes les entités où X = Y".
+
+Les entités ciblées sont désignées par un prédicat SQL sur parameter_values (valeur
+active de X égale à Y) ; les écritures sont faites par inserts groupés (identifiants
+réservés à l'avance) et UPDATE en masse, par tranches d'entités (une transaction par
+tranche), sans charger de lignes dans l'ORM.
+"""
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import Text, and_, cast, exists, func, select, update
+
+from app.extensions import db
+from app.models.enums import EntityType
+from app.models.parameters.definitions import ParameterDefinition
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
+from app.utils.bulk_helpers import allocate_ids, bulk_insert
+from app.utils.effective_config import queue_effective_refresh
+from app.utils.parameter_validation import validator_cache
+
+DEFAULT_BATCH_SIZE = 5000
+MODES = ('set', 'deactivate')
+
+def value_matches(values, definition_id, value_type, value):
+    """
+    Condition "la ligne `values` (alias de parameter_values) est la valeur active
+    `value` de la définition" : sous-requête EXISTS sur la table concrète.
+    Les valeurs JSON (enum, json) sont comparées sur leur sérialisation.
+    """
+    table = VALUE_CLASSES[value_type].__table__
+    if value_type in ('float', 'string'):
+        equals = table.c.value == value
+    else:
+        equals = cast(table.c.value, Text) == json.dumps(value)
+    return and_(
+        values.c.parameter_definition_id == definition_id,
+        values.c.value_type == value_type,
+        values.c.is_active == True,
+        exists().where(table.c.id == values.c.id, equals)
+    )
+
+class BulkParameterApply:
+    """
+    Pose (mode 'set') ou désactive (mode 'deactivate') la valeur d'une définition sur
+    toutes les entités dont la définition `match_definition` vaut `match_value`.
+
+    En mode 'set', les entités ayant déjà la bonne valeur active sont laissées telles
+    quelles ; pour les autres, la nouvelle valeur est insérée puis les anciennes valeurs
+    actives de la définition sont désactivées (historique conservé).
+    """
+
+    def __init__(self, match_definition_id, match_value, definition_id, value=None, mode='set',
+                 entity_type=None, batch_size=DEFAULT_BATCH_SIZE, notes=None):
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu : {mode} (attendu : {', '.join(MODES)})")
+        self.match_definition = self._get_definition(match_definition_id)
+        self.definition = self._get_definition(definition_id)
+        self.match_type, self.match_value = self._coerce(self.match_definition, match_value)
+        self.value = value
+        self.mode = mode
+        self.entity_type = EntityType(entity_type) if entity_type else self.definition.target_entity
+        self.batch_size = batch_size
+        self.notes = notes
+        self.stats = {'entities': 0, 'deactivated': 0, 'created': 0, 'unchanged': 0, 'batches': 0}
+
+        if mode == 'set':
+            self.value_type, self.value = self._coerce(self.definition, value)
+            problems = validator_cache.get(self.definition).check(self.value, self.value_type)
+            if problems:
+                raise ValueError(f"{self.definition.name} : {problems[0][1]}")
+
+    @staticmethod
+    def _get_definition(definition_id):
+        definition = db.session.get(ParameterDefinition, definition_id)
+        if definition is None:
+            raise ValueError(f"Définition de paramètre {definition_id} introuvable")
+        return definition
+
+    @staticmethod
+    def _coerce(definition, value):
+        try:
+            return ParameterValue.coerce(definition, value)
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    # --- Prédicats ---------------------------------------------------------------------
+
+    def _matched(self, values):
+        """Lignes `values` désignant une entité sélectionnée (valeur active X = Y)"""
+        condition = value_matches(values, self.match_definition.id, self.match_type, self.match_value)
+        if self.entity_type is not None:
+            condition = and_(condition, values.c.entity_type == self.entity_type)
+        return condition
+
+    def _selects(self, target, low=None, high=None):
+        """EXISTS : l'entité de la ligne `target` est sélectionnée (et dans la tranche [low, high])"""
+        source = ParameterValue.__table__.alias('source')
+        condition = and_(
+            self._matched(source),
+            source.c.entity_type == target.c.entity_type,
+            source.c.entity_id == target.c.entity_id
+        )
+        if low is None:
+            return exists().where(condition)
+        # Bornes posées sur la ligne cible : l'index (entity_type, entity_id) reste utilisé en égalité
+        return and_(target.c.entity_id.between(low, high), exists().where(condition))
+
+    def _already_set(self, entity_type, entity_id):
+        """EXISTS : l'entité a déjà la valeur demandée, active"""
+        current = ParameterValue.__table__.alias('current')
+        return exists().where(
+            value_matches(current, self.definition.id, self.value_type, self.value),
+            current.c.entity_type == entity_type,
+            current.c.entity_id == entity_id
+        )
+
+    # --- Exécution ---------------------------------------------------------------------
+
+    def entities(self):
+        """(entity_type, entity_id) sélectionnées, triées par id (une requête)"""
+        source = ParameterValue.__table__.alias('source')
+        return db.session.execute(
+            select(source.c.entity_type, source.c.entity_id)
+            .where(self._matched(source))
+            .distinct()
+            .order_by(source.c.entity_id)
+        ).all()
+
+    def dry_run(self):
+        """
+        Compte ce que ferait run(), sans rien écrire.
+
+        Returns:
+            dict: entities / deactivated / created / unchanged
+        """
+        values = ParameterValue.__table__
+        source = values.alias('source')
+        entities = self.entities()
+        active = values.c.parameter_definition_id == self.definition.id
+        active = and_(active, values.c.is_active == True, self._selects(values))
+        stats = {'entities': len(entities), 'deactivated': 0, 'created': 0, 'unchanged': 0}
+
+        if self.mode == 'deactivate':
+            stats['deactivated'] = db.session.execute(select(func.count()).where(active)).scalar()
+            return stats
+
+        unchanged = db.session.execute(
+            select(func.count(func.distinct(source.c.entity_id)))
+            .where(self._matched(source), self._already_set(source.c.entity_type, source.c.entity_id))
+        ).scalar()
+        stats['unchanged'] = unchanged
+        stats['created'] = len(entities) - unchanged
+        stats['deactivated'] = db.session.execute(
+            select(func.count()).where(active, ~value_matches(values, self.definition.id, self.value_type, self.value))
+        ).scalar()
+        return stats
+
+    def run(self, progress=None):
+        """
+        Applique l'opération par tranches de `batch_size` entités, un commit par tranche.
+
+        Args:
+            progress (callable): Reçoit un message texte après chaque tranche (optionnel)
+
+        Returns:
+            dict: Compteurs entities / deactivated / created / unchanged / batches
+        """
+        entities = self.entities()
+        self.stats['entities'] = len(entities)
+        stamp = datetime.now(timezone.utc)
+
+        for start in range(0, len(entities), self.batch_size):
+            batch = entities[start:start + self.batch_size]
+            low, high = batch[0][1], batch[-1][1]
+            try:
+                deactivated, created = self._apply_batch(low, high, stamp)
+                for entity_type, entity_id in batch:
+                    queue_effective_refresh(db.session, entity_type, entity_id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            self.stats['batches'] += 1
+            self.stats['deactivated'] += deactivated
+            self.stats['created'] += created
+            if self.mode == 'set':
+                self.stats['unchanged'] += len(batch) - created
+            if progress:
+                progress(
+                    f"📦 Tranche {self.stats['batches']} : {start + len(batch)}/{len(entities)} entités, "
+                    f"{created} valeurs créées, {deactivated} désactivées"
+                )
+        return self.stats
+
+    def _apply_batch(self, low, high, stamp):
+        values = ParameterValue.__table__
+        target_rows = and_(
+            values.c.parameter_definition_id == self.definition.id,
+            values.c.is_active == True,
+            self._selects(values, low, high)
+        )
+
+        if self.mode == 'deactivate':
+            result = db.session.execute(
+                update(values).where(target_rows)
+                .values(is_active=False, updated_at=stamp, deactivated_at=stamp)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount, 0
+
+        # Entités sélectionnées de la tranche n'ayant pas déjà la valeur : une nouvelle ligne chacune
+        source = values.alias('source')
+        entities = db.session.execute(
+            select(source.c.entity_type, source.c.entity_id).where(
+                self._matched(source),
+                source.c.entity_id.between(low, high),
+                ~self._already_set(source.c.entity_type, source.c.entity_id)
+            ).distinct()
+        ).all()
+
+        # Identifiants réservés à l'avance : lignes parentes et concrètes insérées avec les mêmes ids
+        value_ids = allocate_ids(values, len(entities))
+        bulk_insert(values, [
+            {
+                'id': value_id,
+                'value_type': self.value_type,
+                'parameter_definition_id': self.definition.id,
+                'entity_id': entity_id,
+                'entity_type': entity_type,
+                'is_active': True,
+                'created_at': stamp,
+                'notes': self.notes
+            }
+            for value_id, (entity_type, entity_id) in zip(value_ids, entities)
+        ])
+        bulk_insert(VALUE_CLASSES[self.value_type].__table__, [
+            {'id': value_id, 'value': self.value} for value_id in value_ids
+        ])
+        created = len(value_ids)
+
+        # Puis anciennes valeurs différentes de la nouvelle : désactivées (historique conservé).
+        # Après l'insertion, pour que X = P reste sélectionnable quand X est P lui-même
+        deactivated = db.session.execute(
+            update(values)
+            .where(target_rows, ~value_matches(values, self.definition.id, self.value_type, self.value))
+            .values(is_active=False, updated_at=stamp, deactivated_at=stamp)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return deactivated, created
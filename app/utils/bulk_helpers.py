@@ -0,0 +1,87 @@
+# app/utils/bulk_helpers.py
+"""
+Écritures en masse hors unit of work de l'ORM.
+
+Les identifiants sont réservés à l'avance (une requête), ce qui permet d'insérer les lignes
+d'une table parente puis celles des tables filles sans RETURNING ligne par ligne :
+executemany en général, COPY ... FROM STDIN sur PostgreSQL pour les gros volumes.
+"""
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+
+from sqlalchemy import func, insert, select, text
+
+from app.extensions import db
+
+COPY_MIN_ROWS = 1000  # En dessous, un executemany est aussi rapide qu'un COPY
+
+def allocate_ids(table, count):
+    """
+    Réserve `count` identifiants pour `table` (clé primaire entière auto-incrémentée).
+
+    PostgreSQL : valeurs tirées de la séquence de la colonne, en une seule requête.
+    Autres bases (SQLite en développement) : suite du maximum courant, la transaction
+    d'écriture étant alors exclusive.
+
+    Returns:
+        list: Identifiants réservés, dans l'ordre
+    """
+    if count <= 0:
+        return []
+    pk = table.primary_key.columns.values()[0]
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return db.session.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, :column)) FROM generate_series(1, :count)"),
+            {'table': table.name, 'column': pk.name, 'count': count}
+        ).scalars().all()
+    start = db.session.execute(select(func.coalesce(func.max(pk), 0))).scalar() + 1
+    return list(range(start, start + count))
+
+def bulk_insert(table, rows):
+    """
+    Insère des lignes (dicts aux clés identiques) dans `table` : COPY sur PostgreSQL
+    au-delà de COPY_MIN_ROWS lignes, executemany sinon. S'exécute dans la transaction
+    de la session courante.
+    """
+    if not rows:
+        return
+    if len(rows) >= COPY_MIN_ROWS and db.session.get_bind().dialect.name == 'postgresql':
+        _copy_rows(table, rows)
+    else:
+        db.session.execute(insert(table), rows)
+
+def _copy_rows(table, rows):
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(table.c[column], row[column]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN', buffer)
+    finally:
+        cursor.close()
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def _copy_value(column, value):
+    """Valeur au format texte de COPY (NULL = \\N), conversions faites par SQLAlchemy sinon"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, Enum):
+        # db.Enum(EntityType) stocke le nom du membre, comme en passant par l'ORM
+        value = value.name
+    elif isinstance(column.type, db.JSON):
+        value = json.dumps(value)
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, float):
+        value = repr(value)
+    return str(value).translate(_COPY_ESCAPES)
@@ -0,0 +1,144 @@
+# app/utils/config_history.py
+"""
+Historique des valeurs de paramètres et configurations à une date donnée.
+
+Chaque ligne de parameter_values est en vigueur de created_at (valid_from) jusqu'à sa
+désactivation (valid_to, deactivated_at), ou sans fin tant qu'elle est active. Les
+requêtes s'appuient sur l'index (entity_type, entity_id, created_at, deactivated_at) :
+seules les lignes de l'entité demandée sont lues, quelle que soit la taille de
+l'historique global. Les valeurs anciennes déplacées dans parameter_values_archive
+(app.utils.value_archive) ne sont lues qu'avec include_archive=True.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, select
+
+from app.extensions import db
+from app.models.entities.software_version import SoftwareVersion
+from app.models.enums import EntityType
+from app.models.parameters.definitions import ParameterDefinition
+from app.models.parameters.values import VALUE_CLASSES
+from app.utils.effective_config import EffectiveConfig, EffectiveConfigResolver
+from app.utils.value_archive import typed_values
+
+def parse_timestamp(value):
+    """
+    Date ISO 8601 ('2024-05-01', '2024-05-01T08:30:00+02:00'...) ; sans fuseau : UTC.
+
+    Raises:
+        ValueError: Date illisible
+    """
+    try:
+        at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Date invalide : {value!r} (format ISO 8601 attendu)")
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+class ConfigurationSnapshot(EffectiveConfig):
+    """Configuration d'une entité quelconque telle qu'elle était à la date `at`"""
+
+    def __init__(self, entity_type, entity_id, at, parameters):
+        super().__init__(entity_id if entity_type == EntityType.ROBOT_INSTANCE else None, parameters)
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.at = at
+
+    def to_dict(self):
+        data = super().to_dict()
+        del data['robot_id']
+        return {
+            'entity_type': self.entity_type.value,
+            'entity_id': self.entity_id,
+            'at': self.at.isoformat(),
+            **data
+        }
+
+def configuration_at(entity_type, entity_id, at, include_archive=False):
+    """
+    Configuration d'une entité à une date.
+
+    Pour un robot, configuration effective complète (héritage modèle -> logiciels ->
+    versions -> client -> robot) ; pour une version de logiciel, valeurs du logiciel
+    surchargées par celles de la version ; pour les autres entités, leurs propres valeurs.
+
+    Args:
+        entity_type (EntityType | str): Type de l'entité
+        entity_id (int): Id de l'entité
+        at (datetime): Date d'observation
+        include_archive (bool): Inclure les valeurs archivées (dates anciennes)
+
+    Returns:
+        ConfigurationSnapshot
+    """
+    entity_type = EntityType(entity_type)
+    resolver = EffectiveConfigResolver(as_of=at, include_archive=include_archive)
+
+    if entity_type == EntityType.ROBOT_INSTANCE:
+        config = resolver.resolve(entity_id)
+        parameters = config.parameters if config is not None else {}
+    elif entity_type == EntityType.SOFTWARE_VERSION:
+        software_id = db.session.execute(
+            select(SoftwareVersion.software_id).where(SoftwareVersion.id == entity_id)
+        ).scalar()
+        parameters = {
+            **resolver.layer(EntityType.SOFTWARE, software_id),
+            **resolver.layer(EntityType.SOFTWARE_VERSION, entity_id)
+        }
+    else:
+        parameters = dict(resolver.layer(entity_type, entity_id))
+    return ConfigurationSnapshot(entity_type, entity_id, at, parameters)
+
+def parameter_history(entity_type, entity_id, definition_id=None, since=None, until=None,
+                      include_archive=False):
+    """
+    Valeurs successives des paramètres d'une entité, avec leur période de validité
+    (une requête).
+
+    Args:
+        definition_id (int): Restreindre à une définition (optionnel)
+        since, until (datetime): Ne garder que les valeurs en vigueur sur cette période
+        include_archive (bool): Inclure les valeurs archivées (parameter_values_archive)
+
+    Returns:
+        list[dict]: value_id, definition_id, name, value, value_type, valid_from,
+        valid_to (None : toujours en vigueur), triées par définition puis valid_from
+    """
+    entity_type = EntityType(entity_type)
+    values = typed_values(include_archive)
+    valid_to = case(
+        (values.c.is_active == True, None),
+        else_=func.coalesce(values.c.deactivated_at, values.c.updated_at)
+    )
+    columns = [values.c.id, values.c.parameter_definition_id, ParameterDefinition.name,
+               values.c.value_type, values.c.created_at, valid_to]
+    value_columns = {}
+    for value_type in VALUE_CLASSES:
+        value_columns[value_type] = len(columns)
+        columns.append(values.c[f'{value_type}_value'])
+    joined = values.join(ParameterDefinition, ParameterDefinition.id == values.c.parameter_definition_id)
+
+    query = select(*columns).select_from(joined).where(
+        values.c.entity_type == entity_type,
+        values.c.entity_id == entity_id
+    )
+    if definition_id is not None:
+        query = query.where(values.c.parameter_definition_id == definition_id)
+    if until is not None:
+        query = query.where(values.c.created_at <= until)
+    if since is not None:
+        query = query.where((values.c.is_active == True) | (valid_to > since))
+    query = query.order_by(values.c.parameter_definition_id, values.c.created_at, values.c.id)
+
+    history = []
+    for row in db.session.execute(query):
+        value_id, row_definition_id, name, value_type, valid_from, row_valid_to = row[:6]
+        history.append({
+            'value_id': value_id,
+            'definition_id': row_definition_id,
+            'name': name,
+            'value': row[value_columns[value_type]] if value_type in value_columns else None,
+            'value_type': value_type,
+            'valid_from': valid_from,
+            'valid_to': row_valid_to
+        })
+    return history
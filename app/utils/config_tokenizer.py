@@ -0,0 +1,337 @@
+# app/utils/config_tokenizer.py
+"""
+Tokenizer compilé pour les fichiers de configuration clé/valeur.
+
+Une seule expression régulière précompilée par combinaison (séparateur, lignes ignorées)
+remplace les strip/startswith/split/rstrip successifs, et type les valeurs (int, float, str)
+dans le même passage, sans try/except int()/float().
+
+Les fins de ligne suivent les règles d'un fichier lu en mode texte (newlines universels) :
+'\r\n', '\r' seul et '\n'. Texte et octets (mmap) appliquent les mêmes règles, y compris
+pour les blancs Unicode en début de ligne.
+"""
+import re
+from functools import lru_cache
+
+# Marqueurs de section du type <nom> (ou </nom> pour fermer la section)
+SECTION_PATTERN = re.compile(r'^<\s*(/?)\s*([^<>/]+?)\s*>$')
+
+# Littéraux numériques acceptés par int() / float() (underscores et chiffres Unicode compris)
+_DIGITS = r'\d(?:_?\d)*'
+_INT = r'[+-]?' + _DIGITS
+_FLOAT = (
+    r'[+-]?(?:(?:' + _DIGITS + r')?\.' + _DIGITS + r'|' + _DIGITS + r'\.?)(?:[eE][+-]?' + _DIGITS + r')?'
+    r'|[+-]?(?i:inf(?:inity)?|nan)'
+)
+_BLANK = r'[^\S\r\n]*'
+# Début de ligne : début du contenu ou après un saut de ligne ('\r' seul compris)
+_LINE_START = r'(?:^|(?<=\r)(?!\n))'
+_LINE_END = r'(?=[\r\n]|\Z)'
+
+@lru_cache(maxsize=4)
+def _bytes_blank(encoding='utf-8'):
+    """
+    Équivalent octets de _BLANK : tous les blancs Unicode (hors sauts de ligne) encodés,
+    pour que le balayage mmap ignore les mêmes retraits que le mode texte
+    """
+    single, multi = [], []
+    for char in map(chr, range(0x3001)):  # Aucun blanc Unicode au-delà de U+3000
+        if not char.isspace() or char in '\r\n':
+            continue
+        try:
+            encoded = char.encode(encoding)
+        except UnicodeEncodeError:
+            continue
+        (single if len(encoded) == 1 else multi).append(encoded)
+    single = b'[' + b''.join(map(re.escape, single)) + b']*'
+    if not multi:
+        return single
+    # Premier octet testé d'abord : une ligne sans blanc multi-octets n'essaie aucune alternative
+    leads = b'[' + b''.join(sorted({re.escape(sequence[:1]) for sequence in multi})) + b']'
+    return single + b'(?:(?=' + leads + b')(?:' + b'|'.join(map(re.escape, multi)) + b')' + single + b')*'
+
+NUMBER_PATTERN = re.compile(r'\s*(?:(?P<int>' + _INT + r')|(?P<float>' + _FLOAT + r'))\s*\Z')
+
+# Premiers caractères possibles d'un littéral numérique (hors chiffres Unicode)
+_NUMERIC_START = frozenset('+-.0123456789iInN')
+
+def classify_value(value):
+    """Convertit une valeur brute en int, float ou str sans exception de contrôle"""
+    if value.isdecimal():
+        return int(value)
+    if not value or (value[0] not in _NUMERIC_START and not value[0].isdecimal()):
+        return value
+    match = NUMBER_PATTERN.match(value)
+    if match is None:
+        return value
+    if match.group('int') is not None:
+        return int(value)
+    return float(value)
+
+class ConfigTokenizer:
+    """
+    Découpe un contenu en (section, clé, valeur typée, n° de ligne).
+
+    Reproduit exactement les règles historiques de CustomConfigParser :
+    ligne strippée, ignorée si elle commence par un des préfixes de `ignore_lines`,
+    coupée au premier séparateur, clé strippée, valeur strippée puis débarrassée des
+    `terminator` finaux, et enfin convertie en int, sinon en float, sinon laissée en str.
+    Avec typed=False et terminator=None, on obtient les règles de ConfigFileParser
+    (valeurs conservées telles quelles, en texte).
+    """
+
+    def __init__(self, separator, ignore_lines, typed=True, terminator=';'):
+        self.separator = separator
+        self.ignore_lines = tuple(ignore_lines)
+        self.typed = typed
+        self.terminator = terminator
+
+        # Groupes : 1 ligne ignorée, 2 clé, 3 valeur entière, 4 valeur flottante, 5 autre valeur.
+        # La clé est lue jusqu'à la première occurrence du séparateur, sans backtracking.
+        if self.ignore_lines:
+            ignored = r'((?:' + '|'.join(re.escape(prefix) for prefix in self.ignore_lines) + r')[^\r\n]*)'
+        else:
+            ignored = r'((?!))'
+        first, rest = re.escape(separator[0]), separator[1:]
+        if rest:
+            key = r'([^\r\n' + first + r']*(?:' + first + r'(?!' + re.escape(rest) + r')[^\r\n' + first + r']*)*)'
+        else:
+            key = r'([^\r\n' + first + r']*)'
+        if typed:
+            number_end = _BLANK + (re.escape(terminator) + r'*' if terminator else '') + _BLANK + _LINE_END
+            value = (
+                r'(?:(' + _INT + r')' + number_end +
+                r'|(' + _FLOAT + r')' + number_end +
+                r'|([^\r\n]*))'
+            )
+        else:
+            value = r'(?:((?!))|((?!))|([^\r\n]*))'
+        self.pattern = re.compile(
+            _LINE_START + _BLANK + r'(?:' + ignored + r'|' + key + re.escape(separator) + _BLANK + value + r')',
+            re.MULTILINE
+        )
+        self._bytes_pattern = None
+
+    def parse_text(self, text, config):
+        """
+        Remplit `config` (dict) depuis un contenu complet en un seul findall,
+        sans suivi des sections ni des numéros de ligne (chemin le plus rapide)
+        """
+        for ignored, key, int_value, float_value, value in self.pattern.findall(text):
+            if ignored:
+                continue
+            config[key.rstrip()] = (
+                int(int_value) if int_value
+                else float(float_value) if float_value
+                else self._clean(value)
+            )
+        return config
+
+    def iter_text(self, text):
+        """Balayage unique d'un contenu complet (chaîne) avec finditer"""
+        section = None
+        line_no = 1
+        last_pos = 0
+        count = _line_break_counter(text)
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            line_no += count(last_pos, start)
+            last_pos = start
+
+            token = self._token(match.groups(), section, line_no)
+            if token is None:
+                section = self._section_change(match.group(1), section)
+                continue
+            yield token
+
+    def iter_lines(self, lines):
+        """Tokenisation ligne à ligne (fichiers, flux)"""
+        section = None
+        match_line = self.pattern.match
+        for line_no, line in enumerate(lines, start=1):
+            match = match_line(line)
+            if match is None:
+                continue
+
+            token = self._token(match.groups(), section, line_no)
+            if token is None:
+                section = self._section_change(match.group(1), section)
+                continue
+            yield token
+
+    def iter_text_offsets(self, text, encoding='utf-8'):
+        """
+        Comme iter_text, en ajoutant à chaque token les positions (en octets encodés)
+        de début et de fin de sa ligne : (section, clé, valeur, n° de ligne, début, fin)
+        """
+        ascii_only = text.isascii()
+        section = None
+        line_no = 1
+        last_pos = 0
+        byte_pos = 0
+        count = _line_break_counter(text)
+        for match in self.pattern.finditer(text):
+            start, end = match.span()
+            line_no += count(last_pos, start)
+            if not ascii_only:
+                byte_pos += len(text[last_pos:start].encode(encoding))
+            last_pos = start
+
+            token = self._token(match.groups(), section, line_no)
+            if token is None:
+                section = self._section_change(match.group(1), section)
+                continue
+            if ascii_only:
+                yield token + (start, end)
+            else:
+                yield token + (byte_pos, byte_pos + len(text[start:end].encode(encoding)))
+
+    def iter_lines_offsets(self, lines, encoding='utf-8'):
+        """
+        Comme iter_lines avec les positions en octets ; `lines` peut produire des bytes
+        (fichier ouvert en binaire, positions exactes) ou des str (réencodées)
+        """
+        section = None
+        match_line = self.pattern.match
+        byte_pos = 0
+        for line_no, raw_line in enumerate(lines, start=1):
+            if isinstance(raw_line, bytes):
+                line, line_size = raw_line.decode(encoding), len(raw_line)
+            else:
+                line, line_size = raw_line, len(raw_line.encode(encoding))
+            start = byte_pos
+            byte_pos += line_size
+
+            match = match_line(line)
+            if match is None:
+                continue
+
+            token = self._token(match.groups(), section, line_no)
+            if token is None:
+                section = self._section_change(match.group(1), section)
+                continue
+            end = byte_pos - (len(line) - len(line.rstrip('\r\n')))
+            yield token + (start, end)
+
+    def iter_buffer(self, buffer, encoding='utf-8'):
+        """
+        Balayage direct d'un tampon d'octets (mmap d'un fichier) : les fins de ligne et
+        séparateurs sont repérés dans les octets bruts, seules les tranches clé/valeur
+        retenues sont décodées. Le contenu n'est jamais chargé en entier en mémoire.
+        """
+        return self._iter_buffer(buffer, encoding, offsets=False)
+
+    def iter_buffer_offsets(self, buffer, encoding='utf-8'):
+        """Comme iter_buffer, avec les positions en octets : (section, clé, valeur, ligne, début, fin)"""
+        return self._iter_buffer(buffer, encoding, offsets=True)
+
+    def _iter_buffer(self, buffer, encoding, offsets):
+        section = None
+        line_no = 1
+        last_end = 0
+        clean = self._clean
+        typed = self.typed
+        for match in self.bytes_pattern.finditer(buffer):
+            start, end = match.span()
+            # Les correspondances ne contiennent jamais de saut de ligne : seul l'intervalle
+            # depuis la fin de la précédente est à compter (en général un unique b'\n')
+            gap = start - last_end
+            if gap == 1:
+                line_no += 1
+            elif gap:
+                between = buffer[last_end:start]
+                line_no += between.count(b'\n') + between.count(b'\r') - between.count(b'\r\n')
+            last_end = end
+
+            ignored, key, int_value, float_value, value = match.groups()
+            if ignored is not None:
+                section = self._section_change(ignored.decode(encoding), section)
+                continue
+            if int_value is not None:
+                value = int(int_value)
+            elif float_value is not None:
+                value = float(float_value)
+            else:
+                value = clean(value.decode(encoding).strip())
+                if typed:
+                    # Littéraux numériques non ASCII (chiffres Unicode, blancs spéciaux)
+                    value = classify_value(value)
+            if offsets:
+                yield section, key.decode(encoding).strip(), value, line_no, start, end
+            else:
+                yield section, key.decode(encoding).strip(), value, line_no
+
+    @property
+    def bytes_pattern(self):
+        """
+        Version octets du motif (compilée à la première utilisation), en UTF-8. Sauts de
+        ligne et blancs (Unicode compris) suivent les mêmes règles que le motif texte ;
+        seul \\d reste limité à l'ASCII : les chiffres non ASCII retombent dans le groupe
+        texte et sont typés après décodage par classify_value
+        """
+        if self._bytes_pattern is None:
+            blank = _bytes_blank('utf-8')
+            separator = self.separator.encode('utf-8')
+            if self.ignore_lines:
+                ignored = rb'((?:' + b'|'.join(re.escape(prefix.encode('utf-8')) for prefix in self.ignore_lines) + rb')[^\r\n]*)'
+            else:
+                ignored = rb'((?!))'
+            first, rest = re.escape(separator[:1]), separator[1:]
+            if rest:
+                key = rb'([^\r\n' + first + rb']*(?:' + first + rb'(?!' + re.escape(rest) + rb')[^\r\n' + first + rb']*)*)'
+            else:
+                key = rb'([^\r\n' + first + rb']*)'
+            if self.typed:
+                number_end = blank + (re.escape(self.terminator.encode('utf-8')) + rb'*' if self.terminator else b'') + blank + _LINE_END.encode()
+                value = (
+                    rb'(?:(' + _INT.encode() + rb')' + number_end +
+                    rb'|(' + _FLOAT.encode() + rb')' + number_end +
+                    rb'|([^\r\n]*))'
+                )
+            else:
+                value = rb'(?:((?!))|((?!))|([^\r\n]*))'
+            self._bytes_pattern = re.compile(
+                _LINE_START.encode() + blank + rb'(?:' + ignored + rb'|' + key + re.escape(separator) + blank + value + rb')',
+                re.MULTILINE
+            )
+        return self._bytes_pattern
+
+    def _token(self, groups, section, line_no):
+        ignored, key, int_value, float_value, value = groups
+        if ignored is not None:
+            return None
+        if int_value is not None:
+            typed_value = int(int_value)
+        elif float_value is not None:
+            typed_value = float(float_value)
+        else:
+            typed_value = self._clean(value)
+        return section, key.rstrip(), typed_value, line_no
+
+    def _clean(self, value):
+        """Retire les blancs puis les terminateurs finaux d'une valeur texte"""
+        if self.terminator:
+            return value.rstrip().rstrip(self.terminator)
+        return value.rstrip()
+
+    @staticmethod
+    def _section_change(ignored_line, section):
+        match = SECTION_PATTERN.match(ignored_line.rstrip())
+        if match is None:
+            return section
+        return None if match.group(1) else match.group(2)
+
+def _line_break_counter(text):
+    """Compteur de sauts de ligne ('\r\n', '\r', '\n') entre deux positions de `text`"""
+    count = text.count
+    if '\r' not in text:
+        return lambda start, end: count('\n', start, end)
+    return lambda start, end: count('\n', start, end) + count('\r', start, end) - count('\r\n', start, end)
+
+@lru_cache(maxsize=32)
+def _get_tokenizer(separator, ignore_lines, typed, terminator):
+    return ConfigTokenizer(separator, ignore_lines, typed, terminator)
+
+def get_tokenizer(separator, ignore_lines, typed=True, terminator=';'):
+    """Retourne le tokenizer compilé (mis en cache) pour cette configuration de parser"""
+    return _get_tokenizer(separator, tuple(ignore_lines), typed, terminator)
@@ -1,47 +1,188 @@
-import re
-from io import StringIO
+import mmap
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from app.utils.config_tokenizer import get_tokenizer
+from app.utils.parse_cache import parse_cache
+from app.utils.section_index import SectionIndex
+
+# Enregistrement produit par le mode streaming (une ligne clé/valeur du fichier)
+ConfigRecord = namedtuple('ConfigRecord', ['section', 'key', 'value', 'line_no'])
+
+def iter_lines(text):
+    """
+    Itère sur les lignes d'une chaîne sans en créer de copie complète
+    (contrairement à StringIO ou split('\\n')).
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+@contextmanager
+def map_file(path):
+    """
+    Projette un fichier en mémoire en lecture seule (mmap). Les pages sont chargées
+    à la demande par le système : un fichier de plusieurs Go n'est jamais copié en entier.
+    Produit b'' pour un fichier vide (non projetable).
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
 
 class CustomConfigParser:
-    def __init__(self, separator: str = ":=", ignore_lines: list = ["<"]):
+    def __init__(self, separator: str = ":=", ignore_lines: list = ["<"],
+                 typed_values: bool = True, terminator: str = ";"):
         self.config = {}
         self.separator = separator
         self.ignore_lines = ignore_lines
-        
+        self.typed_values = typed_values
+        self.terminator = terminator
+        # Motif compilé une seule fois par combinaison séparateur / lignes ignorées
+        self.tokenizer = get_tokenizer(separator, ignore_lines, typed_values, terminator)
+
     def parse(self, source):
         """Parse depuis un fichier ou une chaîne de caractères"""
         if isinstance(source, str) and '\n' in source:
-            return self._parse(StringIO(source))
-        with open(source, 'r') as f:
-            return self._parse(f)
-    
-    def _parse(self, file_like):
-        for line in file_like:
-            line = line.strip()
-            if self._should_ignore(line):
-                continue
-                
-            # Séparation clé/valeur avec le séparateur personnalisé
-            key_value = line.split(self.separator, 1)
-            if len(key_value) != 2:
-                continue
-                
-            key = key_value[0].strip()
-            value = key_value[1].strip().rstrip(';')
-            
-            self._handle_value(key, value)
-                
+            return self.tokenizer.parse_text(source, self.config)
+        for record in self.iter_records(source):
+            self.config[record.key] = record.value
         return self.config
-    
-    def _should_ignore(self, line: str) -> bool:
-        """Vérifie si la ligne doit être ignorée"""
-        return any(line.startswith(pattern) for pattern in self.ignore_lines)
-    
-    def _handle_value(self, key, value):
-        """Gestion unique des valeurs (plus de tableau)"""
-        try:
-            self.config[key] = int(value)
-        except ValueError:
-            try:
-                self.config[key] = float(value)
-            except ValueError:
-                self.config[key] = value
\ No newline at end of file
+
+    def iter_records(self, source):
+        """
+        Mode streaming : produit les enregistrements (section, clé, valeur typée, n° de ligne)
+        un par un, sans construire de dictionnaire ni copier le contenu.
+
+        Args:
+            source: Contenu brut (str multi-lignes), chemin de fichier, objet fichier texte
+                ou itérable de lignes (upload en cours de lecture)
+
+        Yields:
+            ConfigRecord: Un enregistrement par ligne clé/valeur
+        """
+        if isinstance(source, str) and '\n' in source:
+            return self.iter_text_records(source)
+        if hasattr(source, 'read') or not isinstance(source, (str, bytes, os.PathLike)):
+            return self._iter_records(source)
+        return self.iter_file_records(source)
+
+    def iter_text_records(self, text):
+        """Enregistrements d'un contenu texte en mémoire, quelle que soit sa longueur (une ligne, vide...)"""
+        return self._build_records(self.tokenizer.iter_text(text))
+
+    def iter_file_records(self, path):
+        """Enregistrements d'un fichier sur disque : balayage des octets bruts via mmap"""
+        with map_file(path) as buffer:
+            yield from self.iter_buffer_records(buffer)
+
+    def iter_buffer_records(self, buffer, encoding='utf-8'):
+        """Enregistrements d'un contenu en octets (fichier projeté, membre d'archive...)"""
+        return self._build_records(self.tokenizer.iter_buffer(buffer, encoding))
+
+    def build_section_index(self, source, encoding='utf-8'):
+        """
+        Construit l'index des sections (section, ligne et position en octets de chaque clé).
+
+        Args:
+            source: Contenu brut (str multi-lignes) ou chemin de fichier
+
+        Returns:
+            SectionIndex: Index sérialisable via to_dict()
+        """
+        if isinstance(source, str) and '\n' in source:
+            return self.build_text_section_index(source, encoding)
+        return self.build_file_section_index(source, encoding)
+
+    def build_text_section_index(self, text, encoding='utf-8'):
+        """Index des sections d'un contenu texte (positions en octets encodés)"""
+        return SectionIndex.from_tokens(self.tokenizer.iter_text_offsets(text, encoding))
+
+    def build_file_section_index(self, path, encoding='utf-8'):
+        """Index des sections d'un fichier sur disque (balayage mmap)"""
+        with map_file(path) as buffer:
+            return self.build_buffer_section_index(buffer, encoding)
+
+    def build_buffer_section_index(self, buffer, encoding='utf-8'):
+        """Index des sections d'un contenu en octets (fichier projeté, membre d'archive...)"""
+        return SectionIndex.from_tokens(self.tokenizer.iter_buffer_offsets(buffer, encoding))
+
+    def iter_section_records(self, source, section_entry, encoding='utf-8'):
+        """
+        Relit uniquement le bloc d'une section (entrée de SectionIndex) à partir de ses positions,
+        sans parcourir le reste du fichier.
+        """
+        if isinstance(source, str) and '\n' in source:
+            return self.iter_text_section_records(source, section_entry, encoding)
+        return self.iter_file_section_records(source, section_entry, encoding)
+
+    def iter_text_section_records(self, text, section_entry, encoding='utf-8'):
+        """Bloc d'une section relu dans un contenu texte"""
+        start, end = section_entry['start'], section_entry['end']
+        if text.isascii():
+            chunk = text[start:end]
+        else:
+            chunk = text.encode(encoding)[start:end].decode(encoding)
+        return self._section_block_records(chunk, section_entry)
+
+    def iter_file_section_records(self, path, section_entry, encoding='utf-8'):
+        """Bloc d'une section relu dans un fichier sur disque"""
+        start, end = section_entry['start'], section_entry['end']
+        with open(path, 'rb') as f:
+            f.seek(start)
+            chunk = f.read(end - start).decode(encoding)
+        return self._section_block_records(chunk, section_entry)
+
+    def _section_block_records(self, chunk, section_entry):
+        # Les numéros de ligne sont relatifs au bloc : on les recale sur le fichier
+        line_offset = section_entry['line_start'] - 1
+        section = section_entry['name']
+        for _section, key, value, line_no in self.tokenizer.iter_text(chunk):
+            yield ConfigRecord(section, key, value, line_no + line_offset)
+
+    def cache_key(self, content_hash):
+        """Clé du cache de parsing : empreinte du contenu + règles de ce parser"""
+        if not content_hash:
+            return None
+        return (
+            content_hash,
+            self.__class__.__name__,
+            self.separator,
+            tuple(self.ignore_lines),
+            self.typed_values,
+            self.terminator
+        )
+
+    def iter_cached_records(self, source, content_hash):
+        """
+        Comme iter_records, mais passe par le cache partagé : un contenu déjà parsé
+        (même sha256) ne coûte qu'une recherche dans le cache.
+        """
+        return parse_cache.iter_records(
+            self.cache_key(content_hash),
+            lambda: self.iter_records(source)
+        )
+
+    def _iter_records(self, lines):
+        return self._build_records(self.tokenizer.iter_lines(lines))
+
+    def _build_records(self, tokens):
+        # Les valeurs sont déjà typées par le tokenizer
+        return map(ConfigRecord._make, tokens)
+
+class ConfigFileParser(CustomConfigParser):
+    """
+    Format « nom = valeur » : aucune ligne ignorée, valeurs conservées en texte
+    et sans retrait des ';' finaux.
+    """
+
+    def __init__(self):
+        super().__init__(separator="=", ignore_lines=[], typed_values=False, terminator=None)
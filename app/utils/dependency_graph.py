@@ -0,0 +1,386 @@
+# app/utils/dependency_graph.py
+"""
+Graphe des dépendances entre définitions de paramètres (table parameter_dependencies).
+
+Le graphe est construit en une requête puis gardé en mémoire sous forme compacte :
+les définitions sont numérotées et les arcs rangés dans des tableaux d'adjacence
+(offsets + cibles, dans les deux sens). L'ordre topologique et les cycles sont
+calculés à la construction, et chaque condition (condition_type / condition_value)
+est compilée une seule fois en prédicat Python.
+
+Sémantique : un arc source -> cible signifie que la cible n'est applicable que si la
+valeur de la source satisfait la condition. Plusieurs lignes pour le même couple
+(une par valeur source) forment une alternative : il suffit qu'une condition soit vraie.
+Une cible est active si toutes ses sources sont actives et satisfont leur condition.
+"""
+import logging
+import re
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from sqlalchemy import select
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300  # Secondes avant relecture (dépendances modifiées par un autre processus)
+
+# Résultat de la réévaluation d'une définition
+DependencyState = namedtuple('DependencyState', ['definition_id', 'active', 'unmet_sources'])
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _compare(operator):
+    def compile_(expected):
+        bound = _as_number(expected)
+        if bound is None:
+            raise ValueError(f"Valeur numérique attendue, reçu {expected!r}")
+        def predicate(value):
+            number = _as_number(value)
+            return number is not None and operator(number, bound)
+        return predicate
+    return compile_
+
+def _members(expected):
+    values = expected if isinstance(expected, (list, tuple, set)) else [expected]
+    return frozenset(str(value) for value in values)
+
+def _compile_in(expected):
+    members = _members(expected)
+    return lambda value: value is not None and str(value) in members
+
+def _compile_not_in(expected):
+    members = _members(expected)
+    return lambda value: value is None or str(value) not in members
+
+def _compile_between(expected):
+    try:
+        low, high = (float(bound) for bound in expected)
+    except (TypeError, ValueError):
+        raise ValueError(f"Intervalle [min, max] attendu, reçu {expected!r}")
+    def predicate(value):
+        number = _as_number(value)
+        return number is not None and low <= number <= high
+    return predicate
+
+def _compile_regex(expected):
+    pattern = re.compile(str(expected))
+    return lambda value: value is not None and pattern.search(str(value)) is not None
+
+# condition_type -> fabrique de prédicat (reçoit condition_value)
+CONDITION_COMPILERS = {
+    'always': lambda expected: lambda value: True,
+    'is_set': lambda expected: lambda value: value is not None and value != '',
+    'equals': lambda expected: _compile_in([expected]),
+    'not_equals': lambda expected: _compile_not_in([expected]),
+    'in': _compile_in,
+    'not_in': _compile_not_in,
+    'gt': _compare(float.__gt__),
+    'gte': _compare(float.__ge__),
+    'lt': _compare(float.__lt__),
+    'lte': _compare(float.__le__),
+    'between': _compile_between,
+    'regex': _compile_regex,
+}
+
+def compile_condition(condition_type, condition_value):
+    """
+    Compile une condition de dépendance en prédicat `value -> bool`.
+    Sans condition_type, la dépendance est toujours satisfaite.
+
+    Raises:
+        ValueError: Type de condition inconnu ou valeur incompatible
+    """
+    compiler = CONDITION_COMPILERS.get(condition_type or 'always')
+    if compiler is None:
+        raise ValueError(f"Type de condition inconnu : '{condition_type}'")
+    try:
+        return compiler(condition_value)
+    except re.error as e:
+        raise ValueError(f"Expression régulière invalide : {e}")
+
+def _never(value):
+    return False
+
+class DependencyGraph:
+    """
+    Graphe compilé, en lecture seule.
+
+    Args:
+        rows (iterable): (source_parameter_id, target_parameter_id, condition_type, condition_value)
+    """
+
+    def __init__(self, rows):
+        edges = {}  # (source, cible) -> [prédicats]
+        node_ids = set()
+        for source_id, target_id, condition_type, condition_value in rows:
+            try:
+                predicate = compile_condition(condition_type, condition_value)
+            except ValueError as e:
+                logger.warning("Dépendance %s -> %s ignorée : %s", source_id, target_id, e)
+                predicate = _never
+            edges.setdefault((source_id, target_id), []).append(predicate)
+            node_ids.update((source_id, target_id))
+
+        self.node_ids = sorted(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.edge_count = len(edges)
+
+        # Arcs sortants et entrants (offsets + voisins), avec l'indice du prédicat de chaque arc
+        pairs = sorted((self.index[s], self.index[t]) for s, t in edges)
+        self._predicates = []
+        self._out_offsets, self._out_targets, _ = self._adjacency(pairs, 0, 1)
+        self._in_offsets, self._in_sources, self._in_edges = self._adjacency(pairs, 1, 0)
+        for source, target in pairs:
+            predicates = edges[(self.node_ids[source], self.node_ids[target])]
+            self._predicates.append(
+                predicates[0] if len(predicates) == 1
+                else (lambda value, predicates=tuple(predicates): any(p(value) for p in predicates))
+            )
+
+        self.order, self.cycles = self._sort()
+        self.rank = {self.node_ids[i]: position for position, i in enumerate(self.order)}
+        self._cycle_of = {definition_id: n for n, cycle in enumerate(self.cycles) for definition_id in cycle}
+
+    def _adjacency(self, pairs, key, other):
+        """Tableaux offsets / voisins / indices d'arcs (indices d'arcs = position dans `pairs`)"""
+        n = len(self.node_ids)
+        counts = [0] * (n + 1)
+        for pair in pairs:
+            counts[pair[key] + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        offsets = array('l', counts)
+        neighbours = array('l', [0]) * len(pairs)
+        edge_ids = array('l', [0]) * len(pairs)
+        cursor = list(counts)
+        for edge_id, pair in enumerate(pairs):
+            position = cursor[pair[key]]
+            neighbours[position] = pair[other]
+            edge_ids[position] = edge_id
+            cursor[pair[key]] += 1
+        return offsets, neighbours, edge_ids
+
+    def _sort(self):
+        """
+        Ordre topologique (Kahn) ; les nœuds restants sont dans un cycle ou en aval d'un cycle.
+
+        Returns:
+            tuple: (indices dans l'ordre topologique, liste des cycles en ids de définitions)
+        """
+        n = len(self.node_ids)
+        in_degree = [self._in_offsets[i + 1] - self._in_offsets[i] for i in range(n)]
+        ready = [i for i in range(n) if not in_degree[i]]
+        order = array('l')
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for position in range(self._out_offsets[node], self._out_offsets[node + 1]):
+                target = self._out_targets[position]
+                in_degree[target] -= 1
+                if not in_degree[target]:
+                    ready.append(target)
+
+        cycles = []
+        if len(order) < n:
+            remaining = set(range(n)) - set(order)
+            cycles = [
+                sorted(self.node_ids[i] for i in component)
+                for component in self._components(remaining)
+            ]
+            # Nœuds bloqués par un cycle : placés à la fin, pour rester réévaluables
+            order.extend(sorted(remaining))
+        return order, cycles
+
+    def _components(self, nodes):
+        """Composantes fortement connexes (Tarjan itératif) formant un cycle, parmi `nodes`"""
+        index_of, low, stack, on_stack = {}, {}, [], set()
+        components = []
+        counter = 0
+        for root in sorted(nodes):
+            if root in index_of:
+                continue
+            work = [(root, self._out_offsets[root])]
+            index_of[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, position = work[-1]
+                if position < self._out_offsets[node + 1]:
+                    work[-1] = (node, position + 1)
+                    target = self._out_targets[position]
+                    if target not in nodes:
+                        continue
+                    if target not in index_of:
+                        index_of[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, self._out_offsets[target]))
+                    elif target in on_stack:
+                        low[node] = min(low[node], index_of[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or self._has_self_loop(node):
+                        components.append(component)
+        return components
+
+    def _has_self_loop(self, node):
+        return any(
+            self._out_targets[position] == node
+            for position in range(self._out_offsets[node], self._out_offsets[node + 1])
+        )
+
+    @property
+    def has_cycles(self):
+        return bool(self.cycles)
+
+    def __contains__(self, definition_id):
+        return definition_id in self.index
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def dependents_of(self, definition_id):
+        """Cibles directes d'une définition (ids)"""
+        i = self.index.get(definition_id)
+        if i is None:
+            return []
+        return [self.node_ids[t] for t in self._out_targets[self._out_offsets[i]:self._out_offsets[i + 1]]]
+
+    def sources_of(self, definition_id):
+        """Sources directes d'une définition (ids)"""
+        i = self.index.get(definition_id)
+        if i is None:
+            return []
+        return [self.node_ids[s] for s in self._in_sources[self._in_offsets[i]:self._in_offsets[i + 1]]]
+
+    def affected(self, definition_ids):
+        """
+        Définitions atteintes transitivement depuis une ou plusieurs définitions modifiées
+        (celles-ci exclues, sauf si elles sont dans un cycle), dans l'ordre topologique.
+
+        Args:
+            definition_ids (int | iterable): Id(s) des définitions modifiées
+        """
+        if isinstance(definition_ids, int):
+            definition_ids = [definition_ids]
+        pending = [self.index[d] for d in definition_ids if d in self.index]
+        seen = set()
+        while pending:
+            node = pending.pop()
+            for target in self._out_targets[self._out_offsets[node]:self._out_offsets[node + 1]]:
+                if target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+        return sorted((self.node_ids[i] for i in seen), key=self.rank.__getitem__)
+
+    def evaluate(self, values, changed=None, active=None):
+        """
+        Réévalue les définitions dans l'ordre topologique.
+
+        Args:
+            values (dict): {definition_id: valeur courante}
+            changed (int | iterable): Définitions modifiées ; seules celles qu'elles atteignent
+                sont réévaluées (tout le graphe si None)
+            active (dict): {definition_id: bool} état connu des sources non réévaluées
+                (actives par défaut)
+
+        Returns:
+            dict: {definition_id: DependencyState}, dans l'ordre d'évaluation
+        """
+        if changed is None:
+            targets = [self.node_ids[i] for i in self.order]
+        else:
+            targets = self.affected(changed)
+        states = dict(active or {})
+        results = {}
+        for definition_id in targets:
+            i = self.index[definition_id]
+            unmet = []
+            for position in range(self._in_offsets[i], self._in_offsets[i + 1]):
+                source_id = self.node_ids[self._in_sources[position]]
+                predicate = self._predicates[self._in_edges[position]]
+                cycle = self._cycle_of.get(definition_id)
+                if cycle is not None and self._cycle_of.get(source_id) == cycle:
+                    unmet.append(source_id)  # Dépendance circulaire : jamais satisfaite
+                elif not states.get(source_id, True) or not predicate(values.get(source_id)):
+                    unmet.append(source_id)
+            states[definition_id] = not unmet
+            results[definition_id] = DependencyState(definition_id, not unmet, unmet)
+        return results
+
+class DependencyGraphCache:
+    """
+    Graphe partagé par le processus, reconstruit après modification de parameter_dependencies
+    (événements ORM) ou au plus tard après `ttl` secondes (écritures hors ORM / autre processus).
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._graph = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def configure(self, ttl=None):
+        """Ajuste la durée de validité (appelé depuis create_app)"""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            self._loaded_at = None
+
+    def invalidate(self):
+        """Force la reconstruction au prochain accès"""
+        self._loaded_at = None
+
+    def graph(self):
+        """
+        Returns:
+            DependencyGraph: Graphe courant (construit si nécessaire, une requête)
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is None or (self.ttl and time.monotonic() - loaded_at >= self.ttl):
+            with self._lock:
+                if self._loaded_at is loaded_at:
+                    self._load()
+        return self._graph
+
+    def _load(self):
+        # Import local : le modèle importe lui-même ce module pour l'invalidation
+        from app.models.parameters.dependencies import ParameterDependency
+
+        rows = db.session.execute(select(
+            ParameterDependency.source_parameter_id,
+            ParameterDependency.target_parameter_id,
+            ParameterDependency.condition_type,
+            ParameterDependency.condition_value
+        )).all()
+        graph = DependencyGraph(rows)
+        if graph.has_cycles:
+            logger.warning("Dépendances circulaires entre paramètres : %s", graph.cycles)
+        self._graph = graph
+        self._loaded_at = time.monotonic()
+
+# Instance partagée par tout le processus
+dependency_graph = DependencyGraphCache()
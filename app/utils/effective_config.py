@@ -0,0 +1,401 @@
+# app/utils/effective_config.py
+"""
+Configuration effective d'un robot : fusion des paramètres de chaque niveau
+d'héritage, du plus général au plus spécifique :
+
+    RobotModel -> Software -> SoftwareVersion -> Client -> RobotInstance
+
+Un niveau plus spécifique remplace la valeur d'un niveau plus général pour la même
+définition. Chaque couche (valeurs actives d'une entité) est chargée une seule fois,
+et les fusions intermédiaires (modèle + logiciels, puis + client) sont mémorisées :
+tous les robots partageant le même modèle, les mêmes versions et le même client
+réutilisent le même résultat.
+
+Le résultat est matérialisé dans effective_parameter_values : chaque commit qui touche
+une valeur, une installation de logiciel ou le client / modèle d'un robot ne recalcule
+que les robots concernés (file de changements tenue dans session.info).
+"""
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, inspect, select
+
+from app.extensions import db
+from app.models.associations.robot_instance_software_version import RobotInstanceSoftwareVersion
+from app.models.entities.robot_instance import RobotInstance
+from app.models.entities.software_version import SoftwareVersion
+from app.models.enums import EntityType
+from app.models.parameters.definitions import ParameterDefinition
+from app.models.parameters.effective import EffectiveParameterValue
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
+from app.utils.bulk_helpers import bulk_insert
+from app.utils.value_archive import typed_values
+
+# Niveaux d'héritage, du plus général au plus spécifique
+LAYER_ORDER = (
+    EntityType.ROBOT_MODEL,
+    EntityType.SOFTWARE,
+    EntityType.SOFTWARE_VERSION,
+    EntityType.CLIENT,
+    EntityType.ROBOT_INSTANCE,
+)
+
+# Valeur retenue pour une définition, avec sa provenance
+EffectiveParameter = namedtuple(
+    'EffectiveParameter',
+    ['definition_id', 'name', 'value', 'value_type', 'source_type', 'source_id', 'value_id']
+)
+
+# Ce dont dépend la configuration d'un robot (clé des fusions mémorisées)
+RobotLayers = namedtuple('RobotLayers', ['robot_id', 'model_id', 'software_ids', 'version_ids', 'client_id'])
+
+class EffectiveConfig:
+    """Paramètres effectifs d'un robot, indexés par id de définition"""
+
+    def __init__(self, robot_id, parameters):
+        self.robot_id = robot_id
+        self.parameters = parameters
+
+    def __getitem__(self, definition_id):
+        return self.parameters[definition_id]
+
+    def __contains__(self, definition_id):
+        return definition_id in self.parameters
+
+    def __iter__(self):
+        return iter(self.parameters.values())
+
+    def __len__(self):
+        return len(self.parameters)
+
+    def values_by_name(self):
+        """{nom: valeur} (pratique pour les exports)"""
+        return {parameter.name: parameter.value for parameter in self.parameters.values()}
+
+    def to_dict(self):
+        """Sérialisation JSON avec provenance"""
+        return {
+            'robot_id': self.robot_id,
+            'parameters': [
+                {
+                    'definition_id': parameter.definition_id,
+                    'name': parameter.name,
+                    'value': parameter.value,
+                    'value_type': parameter.value_type,
+                    'source': {
+                        'entity_type': parameter.source_type.value,
+                        'entity_id': parameter.source_id,
+                        'value_id': parameter.value_id
+                    }
+                }
+                for parameter in sorted(self.parameters.values(), key=lambda p: p.name)
+            ]
+        }
+
+class EffectiveConfigResolver:
+    """
+    Résolution de la configuration effective d'un ou plusieurs robots.
+
+    Les couches et fusions sont mémorisées pour la durée de vie du resolver :
+    en créer un par requête / commande, ou appeler clear() après des écritures.
+
+    Avec `as_of`, la configuration est reconstituée à cette date : valeurs en vigueur
+    à ce moment (ParameterValue.valid_at) et logiciels installés avant. Le modèle et le
+    client du robot, non historisés, restent ceux d'aujourd'hui. `include_archive` y
+    ajoute les valeurs archivées (parameter_values_archive).
+    """
+
+    def __init__(self, as_of=None, include_archive=False):
+        self.as_of = as_of
+        self.include_archive = include_archive
+        self._layers = {}  # (EntityType, entity_id) -> {definition_id: EffectiveParameter}
+        self._merged = {}  # clé de préfixe -> fusion mémorisée
+
+    def resolve(self, robot):
+        """
+        Args:
+            robot (RobotInstance | int): Robot ou son id
+
+        Returns:
+            EffectiveConfig: ou None si le robot n'existe pas
+        """
+        robot_id = robot if isinstance(robot, int) else robot.id
+        return self.resolve_many([robot_id]).get(robot_id)
+
+    def resolve_many(self, robot_ids=None):
+        """
+        Configurations effectives d'un ensemble de robots (toute la flotte si None) :
+        deux requêtes pour la structure, puis une requête par niveau d'héritage.
+
+        Returns:
+            dict: {robot_id: EffectiveConfig}
+        """
+        return self.resolve_layers(self.load_robot_layers(robot_ids))
+
+    def resolve_layers(self, robots):
+        """Comme resolve_many, à partir de structures déjà chargées (load_robot_layers)"""
+        self._prefetch(robots)
+        return {robot.robot_id: self._resolve_robot(robot) for robot in robots}
+
+    def override(self, entity_type, entity_id, parameter):
+        """
+        Remplace, pour ce resolver uniquement, la valeur d'une définition dans une couche
+        (simulation : rien n'est écrit en base). Les fusions mémorisées sont oubliées.
+
+        Args:
+            parameter (EffectiveParameter): Valeur simulée (value_id None)
+        """
+        layer = dict(self._layer(entity_type, entity_id))
+        layer[parameter.definition_id] = parameter
+        self._layers[(entity_type, entity_id)] = layer
+        self._merged.clear()
+
+    def layer(self, entity_type, entity_id):
+        """Valeurs propres d'une entité : {definition_id: EffectiveParameter}"""
+        return self._layer(entity_type, entity_id)
+
+    def clear(self):
+        self._layers.clear()
+        self._merged.clear()
+
+    def load_robot_layers(self, robot_ids=None):
+        """Modèle, client et logiciels installés de chaque robot (2 requêtes)"""
+        query = select(RobotInstance.id, RobotInstance.robot_model_id, RobotInstance.client_id)
+        if robot_ids is not None:
+            robot_ids = list(robot_ids)
+            if not robot_ids:
+                return []
+            query = query.where(RobotInstance.id.in_(robot_ids))
+        rows = db.session.execute(query).all()
+
+        installed = {}
+        links = select(
+            RobotInstanceSoftwareVersion.robot_instance_id,
+            RobotInstanceSoftwareVersion.software_version_id,
+            SoftwareVersion.software_id
+        ).join(
+            SoftwareVersion, SoftwareVersion.id == RobotInstanceSoftwareVersion.software_version_id
+        ).order_by(
+            # Installation la plus récente appliquée en dernier (prioritaire)
+            RobotInstanceSoftwareVersion.installation_date,
+            RobotInstanceSoftwareVersion.software_version_id
+        )
+        if robot_ids is not None:
+            links = links.where(RobotInstanceSoftwareVersion.robot_instance_id.in_(robot_ids))
+        if self.as_of is not None:
+            links = links.where(RobotInstanceSoftwareVersion.installation_date <= self.as_of)
+        for robot_id, version_id, software_id in db.session.execute(links):
+            installed.setdefault(robot_id, []).append((software_id, version_id))
+
+        robots = []
+        for robot_id, model_id, client_id in rows:
+            versions = installed.get(robot_id, [])
+            software_ids = tuple(dict.fromkeys(software_id for software_id, _version_id in versions))
+            version_ids = tuple(version_id for _software_id, version_id in versions)
+            robots.append(RobotLayers(robot_id, model_id, software_ids, version_ids, client_id))
+        return robots
+
+    def _prefetch(self, robots):
+        """Charge en une requête par niveau toutes les couches pas encore en mémoire"""
+        wanted = {entity_type: set() for entity_type in LAYER_ORDER}
+        for robot in robots:
+            wanted[EntityType.ROBOT_MODEL].add(robot.model_id)
+            wanted[EntityType.SOFTWARE].update(robot.software_ids)
+            wanted[EntityType.SOFTWARE_VERSION].update(robot.version_ids)
+            wanted[EntityType.CLIENT].add(robot.client_id)
+            wanted[EntityType.ROBOT_INSTANCE].add(robot.robot_id)
+        for entity_type, entity_ids in wanted.items():
+            missing = {entity_id for entity_id in entity_ids if (entity_type, entity_id) not in self._layers}
+            if missing:
+                self._load_layers(entity_type, missing)
+
+    def _load_layers(self, entity_type, entity_ids):
+        values = typed_values(self.include_archive)
+        columns = [values.c.id, values.c.entity_id, values.c.parameter_definition_id,
+                   ParameterDefinition.name, values.c.value_type]
+        value_columns = {}
+        for value_type in VALUE_CLASSES:
+            value_columns[value_type] = len(columns)
+            columns.append(values.c[f'{value_type}_value'])
+        joined = values.join(ParameterDefinition, ParameterDefinition.id == values.c.parameter_definition_id)
+
+        if self.as_of is None:
+            current = values.c.is_active == True
+        else:
+            current = ParameterValue.valid_at(self.as_of, values)
+        query = select(*columns).select_from(joined).where(
+            values.c.entity_type == entity_type,
+            values.c.entity_id.in_(entity_ids),
+            current
+        ).order_by(values.c.entity_id, values.c.created_at, values.c.id)
+
+        for entity_id in entity_ids:
+            self._layers[(entity_type, entity_id)] = {}
+        for row in db.session.execute(query):
+            value_id, entity_id, definition_id, name, value_type = row[:5]
+            value = row[value_columns[value_type]] if value_type in value_columns else None
+            # Plusieurs valeurs en vigueur pour une même définition : la plus récente l'emporte
+            self._layers[(entity_type, entity_id)][definition_id] = EffectiveParameter(
+                definition_id, name, value, value_type, entity_type, entity_id, value_id
+            )
+
+    def _layer(self, entity_type, entity_id):
+        if entity_id is None:
+            return {}
+        layer = self._layers.get((entity_type, entity_id))
+        if layer is None:
+            self._load_layers(entity_type, {entity_id})
+            layer = self._layers[(entity_type, entity_id)]
+        return layer
+
+    def _software_prefix(self, robot):
+        """Modèle + logiciels + versions installées (partagé par les robots identiques)"""
+        key = (robot.model_id, robot.version_ids)
+        merged = self._merged.get(key)
+        if merged is None:
+            merged = dict(self._layer(EntityType.ROBOT_MODEL, robot.model_id))
+            for software_id in robot.software_ids:
+                merged.update(self._layer(EntityType.SOFTWARE, software_id))
+            for version_id in robot.version_ids:
+                merged.update(self._layer(EntityType.SOFTWARE_VERSION, version_id))
+            self._merged[key] = merged
+        return merged
+
+    def _client_prefix(self, robot):
+        """Préfixe logiciel + couche client"""
+        key = (robot.model_id, robot.version_ids, robot.client_id)
+        merged = self._merged.get(key)
+        if merged is None:
+            client_layer = self._layer(EntityType.CLIENT, robot.client_id)
+            software_prefix = self._software_prefix(robot)
+            merged = {**software_prefix, **client_layer} if client_layer else software_prefix
+            self._merged[key] = merged
+        return merged
+
+    def _resolve_robot(self, robot):
+        prefix = self._client_prefix(robot)
+        own = self._layer(EntityType.ROBOT_INSTANCE, robot.robot_id)
+        return EffectiveConfig(robot.robot_id, {**prefix, **own} if own else dict(prefix))
+
+# --- Matérialisation -------------------------------------------------------------------
+
+_CHANGES_KEY = 'effective_config_changes'
+
+def refresh_effective_values(robot_ids=None, resolver=None):
+    """
+    Recalcule les lignes de effective_parameter_values (toute la flotte si robot_ids est None),
+    dans la transaction courante.
+
+    Returns:
+        int: Nombre de lignes écrites
+    """
+    resolver = resolver or EffectiveConfigResolver()
+    table = EffectiveParameterValue.__table__
+    if robot_ids is not None:
+        robot_ids = list(robot_ids)
+        if not robot_ids:
+            return 0
+        db.session.execute(delete(table).where(table.c.robot_instance_id.in_(robot_ids)))
+    else:
+        db.session.execute(delete(table))
+
+    rows = [
+        {
+            'robot_instance_id': robot_id,
+            'parameter_definition_id': parameter.definition_id,
+            'value_type': parameter.value_type,
+            'value': parameter.value,
+            'source_entity_type': parameter.source_type,
+            'source_entity_id': parameter.source_id,
+            'source_value_id': parameter.value_id
+        }
+        for robot_id, config in resolver.resolve_many(robot_ids).items()
+        for parameter in config
+    ]
+    bulk_insert(table, rows)
+    return len(rows)
+
+def affected_robot_ids(entities):
+    """
+    Robots dont la configuration effective dépend d'au moins une des entités
+    (une requête par type d'entité).
+
+    Args:
+        entities (iterable): Couples (EntityType, entity_id)
+    """
+    ids_by_type = {}
+    for entity_type, entity_id in entities:
+        ids_by_type.setdefault(entity_type, set()).add(entity_id)
+
+    robot_ids = set(ids_by_type.pop(EntityType.ROBOT_INSTANCE, ()))
+    queries = {
+        EntityType.CLIENT: lambda ids: select(RobotInstance.id).where(RobotInstance.client_id.in_(ids)),
+        EntityType.ROBOT_MODEL: lambda ids: select(RobotInstance.id).where(RobotInstance.robot_model_id.in_(ids)),
+        EntityType.SOFTWARE_VERSION: lambda ids: select(RobotInstanceSoftwareVersion.robot_instance_id).where(
+            RobotInstanceSoftwareVersion.software_version_id.in_(ids)
+        ),
+        EntityType.SOFTWARE: lambda ids: select(RobotInstanceSoftwareVersion.robot_instance_id).join(
+            SoftwareVersion, SoftwareVersion.id == RobotInstanceSoftwareVersion.software_version_id
+        ).where(SoftwareVersion.software_id.in_(ids)),
+    }
+    for entity_type, entity_ids in ids_by_type.items():
+        query = queries.get(entity_type)
+        if query is not None:
+            robot_ids.update(db.session.execute(query(entity_ids)).scalars())
+    return robot_ids
+
+def queue_effective_refresh(session, entity_type, entity_id):
+    """
+    Signale une modification faite hors ORM (insertions en masse) : les robots
+    concernés seront recalculés au prochain commit de la session.
+    """
+    if entity_type is not None and entity_id is not None:
+        session.info.setdefault(_CHANGES_KEY, set()).add((EntityType(entity_type), entity_id))
+
+def _auto_refresh_enabled():
+    return not has_app_context() or current_app.config.get('EFFECTIVE_CONFIG_AUTO_REFRESH', True)
+
+def _queue_history(session, obj, type_attr, id_attr, fixed_type=None):
+    """Ajoute l'entité courante et, en cas de modification, l'ancienne"""
+    state = inspect(obj)
+    types = [fixed_type] if fixed_type else [getattr(obj, type_attr)]
+    ids = [getattr(obj, id_attr)]
+    if state.persistent or state.deleted:
+        if not fixed_type:
+            types += state.attrs[type_attr].history.deleted or []
+        ids += state.attrs[id_attr].history.deleted or []
+    for entity_type in types:
+        for entity_id in ids:
+            queue_effective_refresh(session, entity_type, entity_id)
+
+@event.listens_for(db.session, 'after_flush')
+def collect_effective_changes(session, flush_context):
+    """Repère les écritures ORM qui changent la configuration effective d'un robot"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ParameterValue):
+            _queue_history(session, obj, 'entity_type', 'entity_id')
+        elif isinstance(obj, RobotInstanceSoftwareVersion):
+            _queue_history(session, obj, None, 'robot_instance_id', EntityType.ROBOT_INSTANCE)
+        elif isinstance(obj, RobotInstance):
+            state = inspect(obj)
+            if obj in session.new or any(
+                state.attrs[attr].history.has_changes() for attr in ('client_id', 'robot_model_id')
+            ):
+                queue_effective_refresh(session, EntityType.ROBOT_INSTANCE, obj.id)
+
+@event.listens_for(db.session, 'before_commit')
+def refresh_effective_changes(session):
+    """Recalcule, dans la transaction qui se termine, les seuls robots concernés"""
+    if not _auto_refresh_enabled():
+        return
+    session.flush()  # Les écritures encore en attente alimentent la file (after_flush)
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    robot_ids = affected_robot_ids(changes)
+    if robot_ids:
+        refresh_effective_values(robot_ids)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_effective_changes(session):
+    session.info.pop(_CHANGES_KEY, None)
@@ -0,0 +1,177 @@
+# app/utils/impact_analysis.py
+"""
+Analyse d'impact ("what-if") d'une modification de paramètre, sans rien écrire.
+
+La valeur proposée est injectée dans la couche de l'entité modifiée d'un
+EffectiveConfigResolver, puis la configuration effective de tous les robots concernés
+est calculée avant / après en une passe : une requête par niveau d'héritage pour toute
+la flotte, les fusions étant partagées entre robots de même modèle, versions et client.
+Les robots où une surcharge plus spécifique (client, instance...) masque la
+modification sont comptés à part, et les chaînes de ParameterDependency sont
+réévaluées pour les robots dont la valeur change.
+"""
+from collections import Counter
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.entities.robot_instance import RobotInstance
+from app.models.enums import EntityType
+from app.models.parameters.definitions import ParameterDefinition
+from app.models.parameters.values import ParameterValue
+from app.utils.dependency_graph import dependency_graph
+from app.utils.effective_config import EffectiveConfigResolver, EffectiveParameter, affected_robot_ids
+
+DEFAULT_SAMPLE_SIZE = 20
+
+class ImpactReport:
+    """Résultat d'une analyse d'impact"""
+
+    def __init__(self, entity_type, entity_id, definition, value, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.definition = definition
+        self.value = value
+        self.sample_size = sample_size
+        self.candidates = 0      # Robots qui héritent de l'entité modifiée
+        self.reached = []        # Robots dont la valeur effective viendrait de l'entité modifiée
+        self.changed = []        # ... et dont la valeur effective change
+        self.overridden = Counter()  # Niveau de la surcharge qui masque la modification -> robots
+        self.overridden_samples = []
+        self.dependencies = {}   # definition_id -> Counter(activated / deactivated)
+        self.samples = {}        # robot_id -> (slug, serial_number)
+
+    def to_dict(self):
+        def sample(robot_ids):
+            return [
+                {'id': robot_id, 'slug': self.samples.get(robot_id, (None, None))[0],
+                 'serial_number': self.samples.get(robot_id, (None, None))[1]}
+                for robot_id in robot_ids[:self.sample_size]
+            ]
+
+        names = dict(
+            db.session.execute(
+                select(ParameterDefinition.id, ParameterDefinition.name)
+                .where(ParameterDefinition.id.in_(self.dependencies))
+            ).all()
+        ) if self.dependencies else {}
+        return {
+            'change': {
+                'entity_type': self.entity_type.value,
+                'entity_id': self.entity_id,
+                'definition_id': self.definition.id,
+                'name': self.definition.name,
+                'value': self.value
+            },
+            'robots': {
+                'candidates': self.candidates,
+                'reached': len(self.reached),
+                'changed': len(self.changed),
+                'overridden': sum(self.overridden.values())
+            },
+            'overridden_by': {entity_type.value: count for entity_type, count in self.overridden.items()},
+            'dependencies': [
+                {
+                    'definition_id': definition_id,
+                    'name': names.get(definition_id),
+                    'activated': counts['activated'],
+                    'deactivated': counts['deactivated']
+                }
+                for definition_id, counts in self.dependencies.items()
+            ],
+            'samples': {
+                'changed': sample(self.changed),
+                'overridden': sample(self.overridden_samples)
+            }
+        }
+
+def analyze_change(entity_type, entity_id, definition_id, value, sample_size=DEFAULT_SAMPLE_SIZE):
+    """
+    Évalue l'effet d'une nouvelle valeur de paramètre sur une entité (modèle, logiciel,
+    version, client ou robot) pour toute la flotte.
+
+    Args:
+        entity_type (EntityType): Type de l'entité modifiée
+        entity_id (int): Id de l'entité modifiée
+        definition_id (int): Définition du paramètre
+        value: Valeur proposée
+        sample_size (int): Nombre de robots conservés en exemple par catégorie
+
+    Returns:
+        ImpactReport
+
+    Raises:
+        ValueError: Définition introuvable ou valeur d'un type non pris en charge
+    """
+    entity_type = EntityType(entity_type)
+    definition = db.session.get(ParameterDefinition, definition_id)
+    if definition is None:
+        raise ValueError(f"Définition de paramètre {definition_id} introuvable")
+    try:
+        value_type, value = ParameterValue.coerce(definition, value)
+    except TypeError as e:
+        raise ValueError(str(e))
+
+    report = ImpactReport(entity_type, entity_id, definition, value, sample_size)
+    resolver = EffectiveConfigResolver()
+    robots = resolver.load_robot_layers(affected_robot_ids({(entity_type, entity_id)}))
+    report.candidates = len(robots)
+    if not robots:
+        return report
+
+    # Seules la valeur modifiée et les sources des dépendances atteintes sont comparées
+    graph = dependency_graph.graph()
+    dependents = graph.affected(definition_id)
+    watched = {definition_id}
+    for dependent_id in dependents:
+        watched.update(graph.sources_of(dependent_id))
+
+    before = {
+        robot_id: {d: config.parameters[d] for d in watched if d in config}
+        for robot_id, config in resolver.resolve_layers(robots).items()
+    }
+    resolver.override(entity_type, entity_id, EffectiveParameter(
+        definition_id, definition.name, value, value_type, entity_type, entity_id, None
+    ))
+    after = resolver.resolve_layers(robots)
+
+    for robot in robots:
+        robot_id = robot.robot_id
+        parameter = after[robot_id].parameters[definition_id]
+        if parameter.source_type != entity_type or parameter.source_id != entity_id:
+            report.overridden[parameter.source_type] += 1
+            if len(report.overridden_samples) < sample_size:
+                report.overridden_samples.append(robot_id)
+            continue
+
+        report.reached.append(robot_id)
+        previous = before[robot_id].get(definition_id)
+        if previous is not None and previous.value == value:
+            continue
+        report.changed.append(robot_id)
+        if dependents:
+            _compare_dependencies(report, graph, definition_id, before[robot_id], after[robot_id])
+
+    _load_samples(report, report.changed[:sample_size] + report.overridden_samples)
+    return report
+
+def _compare_dependencies(report, graph, definition_id, before, after):
+    """Compte, pour un robot, les définitions dont l'activation bascule"""
+    old_values = {d: parameter.value for d, parameter in before.items()}
+    new_values = dict(old_values)
+    new_values[definition_id] = after.parameters[definition_id].value
+    old_states = graph.evaluate(old_values, changed=definition_id)
+    new_states = graph.evaluate(new_values, changed=definition_id)
+    for dependent_id, state in new_states.items():
+        if state.active != old_states[dependent_id].active:
+            counts = report.dependencies.setdefault(dependent_id, Counter())
+            counts['activated' if state.active else 'deactivated'] += 1
+
+def _load_samples(report, robot_ids):
+    if not robot_ids:
+        return
+    rows = db.session.execute(
+        select(RobotInstance.id, RobotInstance.slug, RobotInstance.serial_number)
+        .where(RobotInstance.id.in_(robot_ids))
+    )
+    report.samples = {robot_id: (slug, serial_number) for robot_id, slug, serial_number in rows}
@@ -0,0 +1,325 @@
+# app/utils/ingest_helpers.py
+"""
+Import en masse de fichiers de configuration (commande `flask ingest-configs`).
+
+Les fichiers sont lus depuis un dossier ou directement depuis une archive .zip / .tar.gz
+(sans extraction de l'archive : chaque membre est recopié par blocs dans un fichier
+temporaire, dont seul le chemin est transmis), parsés en parallèle dans un pool de
+processus, puis écrits en base par lots : une transaction par lot de `batch_size` fichiers.
+
+Les paramètres parsés ne transitent pas sous forme de liste entre processus : chaque
+processus les écrit par tranches dans un fichier temporaire, relu tranche par tranche
+au moment de l'insertion.
+"""
+import hashlib
+import os
+import pickle
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models.base import Entity
+from app.models.configuration import ConfigurationInstance
+from app.utils.custom_config_parser import map_file
+from app.utils.param_helpers import DEFAULT_RECORD_CHUNK_SIZE, insert_records, iter_chunks
+from app.utils.parser_registry import PARSER_CLASSES, parser_registry
+from app.utils.slug_helpers import slugify
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar.gz', '.tgz', '.tar')
+DEFAULT_BATCH_SIZE = 100
+MEMBER_CHUNK_SIZE = 1024 * 1024  # Recopie des membres d'archive par blocs
+
+# Fichier à parser : chemin sur disque, copie temporaire (supprimée après parsing) pour un membre d'archive
+IngestJob = namedtuple('IngestJob', ['name', 'schema_id', 'parser_class', 'path', 'temporary'])
+
+# Résultat renvoyé par un processus de parsing
+IngestResult = namedtuple(
+    'IngestResult',
+    ['name', 'schema_id', 'file_hash', 'file_path', 'size', 'raw_content', 'section_index',
+     'records_path', 'error']
+)
+
+def iter_sources(path, spool_folder):
+    """
+    Parcourt un dossier (récursivement) ou une archive. Les membres d'archive sont
+    recopiés par blocs de MEMBER_CHUNK_SIZE dans `spool_folder` : aucun n'est lu en entier
+    en mémoire, et le fichier temporaire revient à l'appelant (cf. parse_job).
+
+    Yields:
+        tuple: (nom relatif, chemin du fichier, True s'il s'agit d'une copie temporaire)
+    """
+    if os.path.isdir(path):
+        yield from _iter_directory(path)
+    elif path.endswith('.zip'):
+        yield from _iter_zip(path, spool_folder)
+    elif path.endswith(ARCHIVE_SUFFIXES):
+        yield from _iter_tar(path, spool_folder)
+    else:
+        yield os.path.basename(path), path, False
+
+def _iter_directory(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.startswith('.'):
+                continue
+            file_path = os.path.join(dirpath, filename)
+            yield os.path.relpath(file_path, root), file_path, False
+
+def _iter_zip(path, spool_folder):
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or os.path.basename(info.filename).startswith('.'):
+                continue
+            with archive.open(info) as member:
+                yield info.filename, _spool_member(member, spool_folder), True
+
+def _iter_tar(path, spool_folder):
+    # Mode flux ('r|*') : les membres sont lus dans l'ordre, sans accès aléatoire ni extraction
+    with tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            if not member.isfile() or os.path.basename(member.name).startswith('.'):
+                continue
+            yield member.name, _spool_member(archive.extractfile(member), spool_folder), True
+
+def _spool_member(stream, folder):
+    with tempfile.NamedTemporaryFile('wb', dir=folder, suffix='.member', delete=False) as f:
+        try:
+            shutil.copyfileobj(stream, f, MEMBER_CHUNK_SIZE)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    return f.name
+
+_worker_parsers = {}
+
+def parse_job(job, upload_folder, inline_max_size, encoding='utf-8'):
+    """
+    Exécuté dans un processus du pool : parse un fichier et le range dans le dossier
+    d'upload sous son sha256 (comme un upload via le formulaire). N'accède pas à la base.
+    La copie temporaire d'un membre d'archive est supprimée une fois parsée.
+
+    Returns:
+        IngestResult
+    """
+    parser = _worker_parsers.get(job.parser_class)
+    if parser is None:
+        parser = _worker_parsers[job.parser_class] = PARSER_CLASSES[job.parser_class]()
+
+    try:
+        with map_file(job.path) as buffer:
+            return _parse_buffer(job, parser, buffer, upload_folder, inline_max_size, encoding)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return IngestResult(job.name, job.schema_id, None, None, 0, None, None, None, str(e))
+    finally:
+        if job.temporary:
+            os.remove(job.path)
+
+def _parse_buffer(job, parser, buffer, upload_folder, inline_max_size, encoding):
+    file_hash = hashlib.sha256(buffer).hexdigest()
+
+    file_path = os.path.join(upload_folder, f"{file_hash}.cfg")
+    if not os.path.exists(file_path):
+        # Écriture dans un fichier temporaire puis renommage : jamais de fichier partiel visible
+        with tempfile.NamedTemporaryFile('wb', dir=upload_folder, suffix='.part', delete=False) as f:
+            f.write(buffer)
+        os.replace(f.name, file_path)
+
+    size = len(buffer)
+    raw_content = bytes(buffer).decode(encoding) if size <= inline_max_size else None
+    records = ((record.key, record.value) for record in parser.iter_buffer_records(buffer, encoding))
+    section_index = parser.build_buffer_section_index(buffer, encoding).to_dict()
+    records_path = spool_records(records, upload_folder)
+    return IngestResult(
+        job.name, job.schema_id, file_hash, file_path, size, raw_content, section_index, records_path, None
+    )
+
+def spool_records(records, folder, chunk_size=DEFAULT_RECORD_CHUNK_SIZE):
+    """
+    Écrit des couples (nom, valeur) dans un fichier temporaire, une tranche picklée
+    de `chunk_size` couples à la fois.
+
+    Returns:
+        str: Chemin du fichier, à relire avec iter_spooled_records
+    """
+    with tempfile.NamedTemporaryFile('wb', dir=folder, suffix='.records', delete=False) as f:
+        try:
+            for chunk in iter_chunks(records, chunk_size):
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    return f.name
+
+def iter_spooled_records(path):
+    """Relit un fichier écrit par spool_records, une tranche en mémoire à la fois"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+def _discard_spool(results):
+    for result in results:
+        if result.records_path:
+            try:
+                os.remove(result.records_path)
+            except FileNotFoundError:
+                pass
+
+def bounded_map(executor, fn, iterable, window):
+    """
+    Comme executor.map, mais avec au plus `window` tâches en attente : les contenus
+    d'archive ne sont lus qu'au rythme où les processus les consomment.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class ConfigIngestor:
+    """
+    Import d'un dossier ou d'une archive de fichiers de configuration.
+
+    Chaque fichier est rattaché à une entité du type `entity_type` : soit `entity_id`
+    pour tous les fichiers, soit l'entité dont la colonne `match_by` (slug par défaut,
+    ou par exemple serial_number pour les robots) correspond au premier dossier du
+    chemin relatif (ou au nom du fichier sans extension s'il est à la racine).
+    """
+
+    def __init__(self, entity_type, upload_folder, inline_max_size, entity_id=None,
+                 match_by='slug', batch_size=DEFAULT_BATCH_SIZE, workers=None):
+        self.entity_type = entity_type
+        self.entity_class = Entity.__mapper__.polymorphic_map[entity_type].class_
+        self.upload_folder = upload_folder
+        self.inline_max_size = inline_max_size
+        self.entity_id = entity_id
+        self.match_by = match_by
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stats = {'files': 0, 'parameters': 0, 'skipped': 0, 'errors': 0, 'batches': 0}
+        self._entity_ids = None
+
+    def run(self, path, progress=None):
+        """
+        Lance l'import.
+
+        Args:
+            path (str): Dossier, archive .zip / .tar.gz ou fichier isolé
+            progress (callable): Reçoit un message texte après chaque lot (optionnel)
+
+        Returns:
+            dict: Compteurs files / parameters / skipped / errors / batches
+        """
+        os.makedirs(self.upload_folder, exist_ok=True)
+        if self.entity_id is None:
+            self._load_entity_ids()
+
+        jobs = self._iter_jobs(path)
+        worker = partial(parse_job, upload_folder=self.upload_folder, inline_max_size=self.inline_max_size)
+
+        if self.workers == 1:
+            self._write_results(map(worker, jobs), progress)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                window = 4 * (self.workers or os.cpu_count() or 1)
+                self._write_results(bounded_map(executor, worker, jobs, window), progress)
+        return self.stats
+
+    def _iter_jobs(self, path):
+        for name, file_path, temporary in iter_sources(path, self.upload_folder):
+            schema_id, parser = parser_registry.parser_for(name)
+            yield IngestJob(name, schema_id, parser.__class__.__name__, file_path, temporary)
+
+    def _write_results(self, results, progress):
+        batch = []
+        for result in results:
+            if result.error:
+                self.stats['errors'] += 1
+                if progress:
+                    progress(f"⚠️ {result.name} : {result.error}")
+                continue
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch, progress)
+                batch = []
+        if batch:
+            self._write_batch(batch, progress)
+
+    def _write_batch(self, results, progress):
+        """Écrit un lot de fichiers parsés dans une seule transaction"""
+        try:
+            configs = []
+            for result in results:
+                entity_id = self._resolve_entity(result.name)
+                if entity_id is None:
+                    self.stats['skipped'] += 1
+                    if progress:
+                        progress(f"⚠️ {result.name} : aucune entité {self.entity_type.value} correspondante")
+                    continue
+
+                config = ConfigurationInstance(
+                    entity_type=self.entity_type,
+                    entity_id=entity_id,
+                    file_name=os.path.basename(result.name)[:100],
+                    file_hash=result.file_hash,
+                    file_path=result.file_path,
+                    raw_content=result.raw_content,
+                    schema_id=result.schema_id
+                )
+                # Après raw_content / file_path, dont l'affectation remet l'index à zéro
+                config.section_index = result.section_index
+                db.session.add(config)
+                configs.append((config, result))
+
+            db.session.flush()  # Identifiants des configurations
+            # Définitions résolues et valeurs insérées par tranches, relues depuis le disque
+            nb_parameters = sum(
+                insert_records(config, iter_spooled_records(result.records_path))
+                for config, result in configs
+            )
+            db.session.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            db.session.rollback()
+            self.stats['errors'] += len(results)
+            if progress:
+                progress(f"❌ Lot {self.stats['batches'] + 1} annulé : {str(e)}")
+            return
+        finally:
+            _discard_spool(results)
+
+        self.stats['batches'] += 1
+        self.stats['files'] += len(configs)
+        self.stats['parameters'] += nb_parameters
+        if progress:
+            progress(f"📦 Lot {self.stats['batches']} : {len(configs)} fichiers, {nb_parameters} paramètres")
+
+    def _load_entity_ids(self):
+        column = getattr(self.entity_class, self.match_by)
+        rows = db.session.query(column, self.entity_class.id).all()
+        self._entity_ids = {self._normalize(str(key)): entity_id for key, entity_id in rows if key is not None}
+
+    def _resolve_entity(self, name):
+        if self.entity_id is not None:
+            return self.entity_id
+        parts = posixpath.normpath(name.replace('\\', '/')).split('/')
+        key = parts[0] if len(parts) > 1 else os.path.splitext(parts[0])[0]
+        return self._entity_ids.get(self._normalize(key))
+
+    def _normalize(self, key):
+        return slugify(key) if self.match_by == 'slug' else key.strip().upper()
@@ -0,0 +1,197 @@
+# app/utils/pagination.py
+"""
+Pagination par clé (keyset / seek) pour les pages de liste.
+
+Au lieu d'un OFFSET, qui relit toutes les lignes précédentes, chaque page repart de la
+dernière ligne affichée : WHERE (tri, id) > (valeur, id) ORDER BY tri, id LIMIT n.
+Le coût d'une page ne dépend pas de sa position ni de la taille de la table.
+
+Paramètres de requête communs à toutes les listes :
+    sort      colonne de tri autorisée, préfixée de '-' pour un tri décroissant
+    q         recherche (ILIKE sur les colonnes déclarées)
+    after     curseur : page suivant cette ligne
+    before    curseur : page précédant cette ligne
+    per_page  taille de page (bornée par MAX_PER_PAGE)
+    format    'json' : variante JSON (défilement infini)
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from flask import abort, request
+from sqlalchemy import or_, tuple_
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+def encode_cursor(values):
+    """Curseur opaque (base64 url) des valeurs de tri d'une ligne"""
+    def default(value):
+        if isinstance(value, (datetime, date)):
+            return {'dt': value.isoformat()}
+        if hasattr(value, 'value'):  # Enum
+            return value.value
+        raise TypeError(f"Valeur de tri non sérialisable : {value!r}")
+    raw = json.dumps(list(values), default=default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """
+    Raises:
+        ValueError: Curseur illisible
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError(f"Curseur invalide : {token!r}")
+    if not isinstance(values, list):
+        raise ValueError(f"Curseur invalide : {token!r}")
+    return [datetime.fromisoformat(v['dt']) if isinstance(v, dict) and 'dt' in v else v for v in values]
+
+def wants_json():
+    """Variante JSON demandée (?format=json)"""
+    return request.args.get('format') == 'json'
+
+class KeysetPage:
+    """Une page de résultats et les curseurs des pages voisines"""
+
+    def __init__(self, items, sort, per_page, q, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.sort = sort
+        self.per_page = per_page
+        self.q = q
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def url_args(self, **overrides):
+        """Arguments url_for conservant tri, recherche et taille de page"""
+        args = {'sort': self.sort, 'per_page': self.per_page}
+        if self.q:
+            args['q'] = self.q
+        args.update(overrides)
+        return {key: value for key, value in args.items() if value is not None}
+
+    def to_dict(self, serialize):
+        """
+        Args:
+            serialize (callable): Transforme un élément en dict JSON
+        """
+        return {
+            'items': [serialize(item) for item in self.items],
+            'sort': self.sort,
+            'per_page': self.per_page,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor
+        }
+
+class KeysetPaginator:
+    """
+    Pagination par clé d'une requête ORM.
+
+    Args:
+        sorts (dict): Nom public -> colonne (ou expression) de tri, non nulle
+        default_sort (str): Tri par défaut ('name', '-created_at'...)
+        id_column: Colonne unique départageant les égalités (clé primaire)
+        search_columns (tuple): Colonnes filtrées par ?q= (ILIKE)
+        per_page (int): Taille de page par défaut
+    """
+
+    def __init__(self, sorts, default_sort, id_column, search_columns=(), per_page=DEFAULT_PER_PAGE):
+        self.sorts = sorts
+        self.default_sort = default_sort
+        self.id_column = id_column
+        self.search_columns = search_columns
+        self.per_page = per_page
+
+    def paginate(self, query, args=None):
+        """
+        Applique recherche, tri et curseur à `query` et charge une page.
+
+        Args:
+            args (dict): Paramètres (défaut : request.args ; une erreur de paramètre
+                donne alors une réponse 400)
+
+        Returns:
+            KeysetPage
+
+        Raises:
+            ValueError: Tri inconnu ou curseur invalide (si `args` est fourni)
+        """
+        if args is not None:
+            return self._paginate(query, args)
+        try:
+            return self._paginate(query, request.args)
+        except ValueError as e:
+            abort(400, description=str(e))
+
+    def _paginate(self, query, args):
+        sort = args.get('sort') or self.default_sort
+        descending = sort.startswith('-')
+        sort_column = self.sorts.get(sort.lstrip('-'))
+        if sort_column is None:
+            raise ValueError(f"Tri inconnu : {sort} (attendu : {', '.join(self.sorts)})")
+        try:
+            per_page = int(args.get('per_page') or self.per_page)
+        except ValueError:
+            raise ValueError(f"Taille de page invalide : {args.get('per_page')!r}")
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+
+        q = (args.get('q') or '').strip()
+        if q and self.search_columns:
+            query = query.filter(or_(*(column.ilike(f'%{q}%') for column in self.search_columns)))
+
+        after, before = args.get('after'), args.get('before')
+        # En remontant (before), l'ordre est inversé puis la page remise à l'endroit
+        backward = bool(before) and not after
+        forward_order = not descending
+        ascending = forward_order != backward
+
+        key = tuple_(sort_column, self.id_column)
+        cursor = after or before
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2:
+                raise ValueError(f"Curseur invalide : {cursor!r}")
+            query = query.filter(key > tuple_(*values) if ascending else key < tuple_(*values))
+
+        if ascending:
+            query = query.order_by(sort_column.asc(), self.id_column.asc())
+        else:
+            query = query.order_by(sort_column.desc(), self.id_column.desc())
+
+        rows = query.limit(per_page + 1).all()
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backward:
+            rows.reverse()
+
+        cursor_of = lambda item: encode_cursor(self._key_values(item, sort.lstrip('-')))
+        next_cursor = prev_cursor = None
+        if rows:
+            if backward:
+                next_cursor = cursor_of(rows[-1])
+                prev_cursor = cursor_of(rows[0]) if more else None
+            else:
+                next_cursor = cursor_of(rows[-1]) if more else None
+                prev_cursor = cursor_of(rows[0]) if cursor else None
+        return KeysetPage(rows, sort, per_page, q, next_cursor, prev_cursor)
+
+    def _key_values(self, item, sort_key):
+        """Valeurs (tri, id) d'un élément chargé, lues par le nom des attributs"""
+        sort_column = self.sorts[sort_key]
+        return (getattr(item, sort_column.key), getattr(item, self.id_column.key))
@@ -1,9 +1,19 @@
 # app/utils/param_helpers.py
 
+from collections import namedtuple
+from itertools import islice
+
+from app.models.base import Entity
 from app.models.parameters.definitions import ParameterDefinition
-from app.models.parameters.values import ParameterValue
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
 from app.models.enums import EntityType
-from sqlalchemy import or_
+from app.extensions import db
+from app.utils.bulk_helpers import allocate_ids, bulk_insert
+from app.utils.effective_config import queue_effective_refresh
+
+from sqlalchemy import and_, exists, func, insert, or_, select
+
+DEFAULT_RECORD_CHUNK_SIZE = 5000
 
 def get_applicable_params_configs(entity_type_str, entity_id):
     """
@@ -25,31 +35,72 @@ def get_applicable_params_configs(entity_type_str, entity_id):
         ParameterDefinition.is_active == True
     ).all()
 
-def get_unconfigured_params(entity_id, applicable_configs):
+# Définitions applicables à une entité, réparties selon qu'elle a une valeur active ou non
+ParamsStatus = namedtuple('ParamsStatus', ['configured', 'unconfigured'])
+
+def _has_active_value(entity_type, entity_id_column):
+    """EXISTS : valeur active de la définition courante pour l'entité (anti-jointure si négé)"""
+    values = ParameterValue.__table__
+    return exists().where(
+        values.c.parameter_definition_id == ParameterDefinition.id,
+        values.c.entity_type == entity_type,
+        values.c.entity_id == entity_id_column,
+        values.c.is_active == True
+    )
+
+def get_params_status(entity_type, entity_id):
     """
-    Identifie quels paramètres applicables ne sont pas encore configurés
-    pour une entité donnée.
-    
+    Définitions actives applicables à une entité, configurées ou non (une requête).
+
     Args:
+        entity_type (EntityType | str): Type de l'entité ('client', EntityType.CLIENT...)
         entity_id (int): L'ID de l'entité
-        applicable_configs (list): Liste des ParameterDefinition applicables
-        
+
     Returns:
-        list: Liste des ParameterDefinition non configurées
-    """
-    # Récupérer les IDs des définitions déjà configurées pour cette entité
-    configured_param_ids = [
-        p.parameter_definition_id for p in ParameterValue.query.filter(
-            ParameterValue.entity_id == entity_id,
-            ParameterValue.is_active == True
-        ).all()
-    ]
-    
-    # Filtrer les définitions qui ne sont pas déjà configurées
-    return [
-        config for config in applicable_configs 
-        if config.id not in configured_param_ids
-    ]
+        ParamsStatus: (configured, unconfigured), listes de ParameterDefinition triées par nom
+    """
+    entity_type = _as_entity_type(entity_type)
+    configured = _has_active_value(entity_type, entity_id).label('configured')
+    rows = db.session.query(ParameterDefinition, configured).filter(
+        ParameterDefinition.target_entity == entity_type,
+        ParameterDefinition.is_active == True
+    ).order_by(ParameterDefinition.name).all()
+    return ParamsStatus(
+        [definition for definition, is_configured in rows if is_configured],
+        [definition for definition, is_configured in rows if not is_configured]
+    )
+
+def count_missing_params(entity_type, entity_ids):
+    """
+    Nombre de définitions applicables sans valeur active, pour une page d'entités
+    (une requête : produit entités x définitions filtré par NOT EXISTS, puis GROUP BY).
+
+    Returns:
+        dict: {entity_id: nombre manquant} (0 pour les entités complètes)
+    """
+    entity_type = _as_entity_type(entity_type)
+    entity_ids = list(entity_ids)
+    if not entity_ids:
+        return {}
+    entities = Entity.__table__
+    rows = db.session.execute(
+        select(entities.c.id, func.count(ParameterDefinition.id))
+        .select_from(entities)
+        .join(ParameterDefinition, and_(
+            ParameterDefinition.target_entity == entity_type,
+            ParameterDefinition.is_active == True
+        ))
+        .where(entities.c.id.in_(entity_ids), ~_has_active_value(entity_type, entities.c.id))
+        .group_by(entities.c.id)
+    )
+    missing = dict.fromkeys(entity_ids, 0)
+    missing.update(rows.all())
+    return missing
+
+def _as_entity_type(entity_type):
+    if isinstance(entity_type, EntityType):
+        return entity_type
+    return EntityType[entity_type.upper()]
 
 def get_entity_params(entity_type, entity_id):
     """
@@ -66,4 +117,184 @@ def get_entity_params(entity_type, entity_id):
         ParameterValue.entity_type == entity_type,
         ParameterValue.entity_id == entity_id,
         ParameterValue.is_active == True
-    ).all()
\ No newline at end of file
+    ).all()
+
+def get_definitions_by_name(names):
+    """
+    Index nom -> ParameterDefinition pour un ensemble de noms, en une seule requête.
+    Si plusieurs définitions portent le même nom, la plus ancienne est retenue
+    (comme filter_by(name=...).first()).
+    
+    Args:
+        names (iterable): Noms de paramètres (les doublons sont ignorés)
+        
+    Returns:
+        dict: {nom: ParameterDefinition} pour les noms existants
+    """
+    names = set(names)
+    if not names:
+        return {}
+    definitions = {}
+    query = ParameterDefinition.query.filter(ParameterDefinition.name.in_(names)).order_by(ParameterDefinition.id)
+    for definition in query:
+        definitions.setdefault(definition.name, definition)
+    return definitions
+
+def resolve_definitions(records, config_instance, definitions=None):
+    """
+    Associe chaque clé parsée à sa définition : une requête pour les définitions existantes,
+    puis création de toutes les définitions manquantes par inserts groupés.
+    
+    Args:
+        records (list): Couples (nom, valeur) issus du parsing
+        config_instance (ConfigurationInstance): Fournit le type des nouvelles définitions
+        definitions (dict): Index déjà chargé à compléter (optionnel, ex. entre deux lots)
+        
+    Returns:
+        dict: {nom: ParameterDefinition} couvrant tous les noms de `records`
+    """
+    if definitions is None:
+        definitions = {}
+    missing_names = {name for name, _value in records if name not in definitions}
+    definitions.update(get_definitions_by_name(missing_names))
+
+    new_definitions = {}
+    for name, value in records:
+        if name not in definitions and name not in new_definitions:
+            new_definitions[name] = config_instance._create_definition(name, value)
+    if new_definitions:
+        definitions.update(bulk_create_definitions(new_definitions.values()))
+    return definitions
+
+def bulk_create_definitions(new_definitions):
+    """
+    Insère des définitions (instances non persistées, de types polymorphes variés) en requêtes
+    groupées : un executemany sur parameter_definitions, une lecture des identifiants par nom,
+    puis un executemany par table de sous-type. Le nombre de requêtes ne dépend pas du
+    nombre de définitions (contrairement à un flush, qui insère ligne par ligne pour
+    récupérer chaque identifiant).
+    
+    Args:
+        new_definitions (iterable): Instances de sous-classes de ParameterDefinition, noms uniques
+        
+    Returns:
+        dict: {nom: ParameterDefinition} rechargées depuis la base
+    """
+    new_definitions = list(new_definitions)
+    if not new_definitions:
+        return {}
+
+    db.session.execute(insert(ParameterDefinition.__table__), [
+        {
+            'name': definition.name,
+            'description': definition.description,
+            'is_active': True if definition.is_active is None else definition.is_active,
+            'target_entity': definition.target_entity,
+            'definition_type': definition.__mapper__.polymorphic_identity
+        }
+        for definition in new_definitions
+    ])
+
+    names = [definition.name for definition in new_definitions]
+    ids = dict(db.session.query(ParameterDefinition.name, ParameterDefinition.id).filter(
+        ParameterDefinition.name.in_(names)
+    ))
+
+    rows_by_table = {}
+    for definition in new_definitions:
+        table = definition.__table__
+        if table is ParameterDefinition.__table__:
+            continue
+        row = {column.key: getattr(definition, column.key) for column in table.columns if column.key != 'id'}
+        row['id'] = ids[definition.name]
+        rows_by_table.setdefault(table, []).append(row)
+    for table, rows in rows_by_table.items():
+        db.session.execute(insert(table), rows)
+
+    return get_definitions_by_name(names)
+
+def bulk_insert_values(configurations, definitions):
+    """
+    Écrit les valeurs parsées de configurations sans passer par l'unit of work :
+    identifiants réservés en une requête, lignes communes (parameter_values) en un seul
+    executemany / COPY, puis un executemany / COPY par table de type concret.
+    Produit les mêmes lignes que ParameterValue.create_value(...) + db.session.add().
+    
+    Args:
+        configurations (list): Couples (ConfigurationInstance déjà flushée, liste de (nom, valeur))
+        definitions (dict): {nom: ParameterDefinition}, cf. resolve_definitions
+        
+    Returns:
+        int: Nombre de valeurs insérées
+    """
+    count = sum(len(records) for _config, records in configurations)
+    if not count:
+        return 0
+    value_ids = iter(allocate_ids(ParameterValue.__table__, count))
+
+    base_rows = []
+    rows_by_type = {}
+    for config_instance, records in configurations:
+        for name, value in records:
+            value_id = next(value_ids)
+            definition = definitions[name]
+            value_type, value = ParameterValue.coerce(definition, value)
+            if value_type == 'enum':
+                _check_enum_value(definition, value)
+            base_rows.append({
+                'id': value_id,
+                'value_type': value_type,
+                'parameter_definition_id': definition.id,
+                'entity_id': config_instance.entity_id,
+                'entity_type': config_instance.entity_type,
+                'config_instance_id': config_instance.id,
+                'is_active': True
+            })
+            rows_by_type.setdefault(value_type, []).append({'id': value_id, 'value': value})
+
+    bulk_insert(ParameterValue.__table__, base_rows)
+    for value_type, rows in rows_by_type.items():
+        bulk_insert(VALUE_CLASSES[value_type].__table__, rows)
+
+    # Écriture hors ORM : signaler les entités touchées pour la configuration effective
+    for config_instance, _records in configurations:
+        queue_effective_refresh(db.session, config_instance.entity_type, config_instance.entity_id)
+    return count
+
+def iter_chunks(iterable, size):
+    """Découpe un itérable en listes d'au plus `size` éléments, au fil de la lecture"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def insert_records(config_instance, records, chunk_size=DEFAULT_RECORD_CHUNK_SIZE):
+    """
+    Résout les définitions et écrit les valeurs d'une configuration par tranches de
+    `chunk_size`, directement depuis l'itérateur de parsing : la mémoire utilisée est
+    bornée par une tranche, quelle que soit la taille du fichier.
+    
+    Args:
+        config_instance (ConfigurationInstance): Configuration déjà flushée
+        records (iterable): Couples (nom, valeur), lus au fur et à mesure
+        chunk_size (int): Nombre de valeurs par tranche
+        
+    Returns:
+        int: Nombre de valeurs insérées
+    """
+    count = 0
+    for chunk in iter_chunks(records, chunk_size):
+        definitions = resolve_definitions(chunk, config_instance)
+        count += bulk_insert_values([(config_instance, chunk)], definitions)
+    return count
+
+def _check_enum_value(definition, value):
+    """Mêmes contrôles que EnumParameterValue.validate_enum_value"""
+    allowed_values = definition.enum_values
+    if definition.allow_multiple:
+        if not all(v in allowed_values for v in value):
+            raise ValueError("Certaines valeurs ne sont pas autorisées")
+    elif value not in allowed_values:
+        raise ValueError(f"Valeur {value} non autorisée")
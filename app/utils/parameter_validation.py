@@ -0,0 +1,418 @@
+# app/utils/parameter_validation.py
+"""
+Validation en masse des valeurs de paramètres contre leur définition typée :
+
+- float : bornes min_value / max_value (comparaison vectorisée avec NumPy si disponible)
+- string : regex_pattern (compilée une seule fois par définition) et max_length
+- enum : appartenance à enum_values (frozenset), une ou plusieurs valeurs selon allow_multiple
+
+Les définitions sont chargées en une requête et compilées une fois ; les valeurs actives
+sont lues par paquets (toute la flotte, une entité ou une configuration) et regroupées
+par définition. Le résultat est un rapport structuré de violations.
+"""
+import math
+import re
+import threading
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+
+from app.extensions import db
+from app.models.enums import EntityType
+from app.models.parameters.definitions import (
+    ParameterDefinition,
+    FloatParameterDefinition,
+    StringParameterDefinition,
+    EnumParameterDefinition
+)
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
+
+try:
+    import numpy as np
+except ImportError:  # Repli en Python pur (même résultat, plus lent)
+    np = None
+
+CHUNK_SIZE = 50000  # Valeurs lues et vérifiées par paquet
+
+# Une valeur non conforme
+Violation = namedtuple(
+    'Violation',
+    ['value_id', 'definition_id', 'name', 'entity_type', 'entity_id', 'code', 'message', 'value']
+)
+
+class InvalidParameterError(ValueError):
+    """Valeur de paramètre non conforme à sa définition"""
+
+    def __init__(self, message, violations=None):
+        super().__init__(message)
+        self.violations = violations or []
+
+# Types de valeur acceptés pour chaque type de définition
+ACCEPTED_VALUE_TYPES = {
+    'float': frozenset({'float'}),
+    'string': frozenset({'string'}),
+    'enum': frozenset({'enum', 'string'}),
+}
+
+class CompiledDefinition:
+    """Règles d'une définition, prêtes à être appliquées (regex compilée, frozenset...)"""
+
+    __slots__ = ('id', 'name', 'definition_type', 'min_value', 'max_value',
+                 'pattern', 'max_length', 'choices', 'allow_multiple')
+
+    def __init__(self, definition_id, name, definition_type, min_value=None, max_value=None,
+                 regex_pattern=None, max_length=None, enum_values=None, allow_multiple=False):
+        self.id = definition_id
+        self.name = name
+        self.definition_type = definition_type
+        self.min_value = -math.inf if min_value in (None, '') else float(min_value)
+        self.max_value = math.inf if max_value in (None, '') else float(max_value)
+        try:
+            self.pattern = re.compile(regex_pattern) if regex_pattern else None
+        except re.error:
+            self.pattern = None
+        self.max_length = max_length
+        self.choices = frozenset(str(choice) for choice in enum_values) if enum_values is not None else None
+        self.allow_multiple = bool(allow_multiple)
+
+    @classmethod
+    def from_definition(cls, definition):
+        """Compilation depuis une instance ORM (sous-classe typée)"""
+        return cls(
+            definition.id, definition.name, definition.definition_type,
+            min_value=getattr(definition, 'min_value', None),
+            max_value=getattr(definition, 'max_value', None),
+            regex_pattern=getattr(definition, 'regex_pattern', None),
+            max_length=getattr(definition, 'max_length', None),
+            enum_values=getattr(definition, 'enum_values', None),
+            allow_multiple=getattr(definition, 'allow_multiple', False)
+        )
+
+    def check(self, value, value_type=None):
+        """
+        Vérifie une valeur isolée (formulaires).
+
+        Returns:
+            list: [(code, message)] vide si la valeur est conforme
+        """
+        if value_type is not None and self.definition_type in ACCEPTED_VALUE_TYPES \
+                and value_type not in ACCEPTED_VALUE_TYPES[self.definition_type]:
+            return [('type', f"Type {value_type} inattendu pour un paramètre {self.definition_type}")]
+        if self.definition_type == 'float':
+            return self.check_number(value)
+        if self.definition_type == 'string':
+            return self.check_string(value)
+        if self.definition_type == 'enum':
+            return self.check_choice(value)
+        return []
+
+    def check_number(self, value):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return [('type', f"Nombre attendu, reçu {value!r}")]
+        if math.isnan(number) or not self.min_value <= number <= self.max_value:
+            return [('range', self.range_message(number))]
+        return []
+
+    def range_message(self, number):
+        return f"{number} hors de l'intervalle [{self.min_value}, {self.max_value}]"
+
+    def check_string(self, value):
+        if value is None:
+            return []
+        text = str(value)
+        errors = []
+        if self.max_length and len(text) > self.max_length:
+            errors.append(('max_length', f"{len(text)} caractères (maximum {self.max_length})"))
+        if self.pattern is not None and self.pattern.fullmatch(text) is None:
+            errors.append(('pattern', f"'{text}' ne respecte pas le format {self.pattern.pattern}"))
+        return errors
+
+    def check_choice(self, value):
+        if self.choices is None or value is None:
+            return []
+        if isinstance(value, list):
+            if not self.allow_multiple:
+                return [('choice', "Une seule valeur autorisée")]
+            rejected = [item for item in value if str(item) not in self.choices]
+        else:
+            rejected = [value] if str(value) not in self.choices else []
+        if rejected:
+            return [('choice', f"Valeur(s) non autorisée(s) : {', '.join(map(str, rejected))}")]
+        return []
+
+def load_compiled_definitions(definition_ids=None):
+    """
+    Toutes les définitions (ou celles demandées), compilées, en une requête.
+
+    Returns:
+        dict: {definition_id: CompiledDefinition}
+    """
+    base = ParameterDefinition.__table__
+    floats = FloatParameterDefinition.__table__
+    strings = StringParameterDefinition.__table__
+    enums = EnumParameterDefinition.__table__
+    query = select(
+        base.c.id, base.c.name, base.c.definition_type,
+        floats.c.min_value, floats.c.max_value,
+        strings.c.regex_pattern, strings.c.max_length,
+        enums.c.enum_values, enums.c.allow_multiple
+    ).select_from(
+        base.outerjoin(floats, floats.c.id == base.c.id)
+            .outerjoin(strings, strings.c.id == base.c.id)
+            .outerjoin(enums, enums.c.id == base.c.id)
+    )
+    if definition_ids is not None:
+        query = query.where(base.c.id.in_(list(definition_ids)))
+    return {row[0]: CompiledDefinition(*row) for row in db.session.execute(query)}
+
+class ValidatorCache:
+    """
+    Règles compilées partagées par le processus (formulaires), indexées par
+    ParameterDefinition.id et valables tant que updated_at n'a pas changé.
+
+    updated_at est mis à jour à chaque modification d'une définition (y compris des seules
+    colonnes de la sous-classe) : les autres processus détectent ainsi le changement,
+    le processus qui écrit évince en plus l'entrée dès le flush.
+    """
+
+    def __init__(self):
+        self._entries = {}  # definition_id -> (updated_at, CompiledDefinition)
+        self._lock = threading.Lock()
+
+    def get(self, definition):
+        """Règles d'une définition déjà chargée (instance ORM à jour)"""
+        entry = self._entries.get(definition.id)
+        if entry is not None and entry[0] == definition.updated_at:
+            return entry[1]
+        compiled = CompiledDefinition.from_definition(definition)
+        with self._lock:
+            self._entries[definition.id] = (definition.updated_at, compiled)
+        return compiled
+
+    def get_many(self, definition_ids):
+        """
+        Règles de plusieurs définitions : une requête légère (id, updated_at), plus une
+        requête pour compiler celles absentes du cache ou modifiées depuis.
+
+        Returns:
+            dict: {definition_id: CompiledDefinition} (ids inexistants absents)
+        """
+        definition_ids = set(definition_ids)
+        if not definition_ids:
+            return {}
+        versions = dict(db.session.execute(
+            select(ParameterDefinition.id, ParameterDefinition.updated_at)
+            .where(ParameterDefinition.id.in_(definition_ids))
+        ).all())
+
+        entries = self._entries
+        stale = [
+            definition_id for definition_id, updated_at in versions.items()
+            if definition_id not in entries or entries[definition_id][0] != updated_at
+        ]
+        if stale:
+            compiled = load_compiled_definitions(stale)
+            with self._lock:
+                for definition_id, rules in compiled.items():
+                    entries[definition_id] = (versions[definition_id], rules)
+        return {
+            definition_id: entries[definition_id][1]
+            for definition_id in versions if definition_id in entries
+        }
+
+    def evict(self, definition_id):
+        with self._lock:
+            self._entries.pop(definition_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# Instance partagée par tout le processus
+validator_cache = ValidatorCache()
+
+def validate_form_values(values):
+    """
+    Vérifie des valeurs saisies dans un formulaire avant enregistrement.
+
+    Args:
+        values (dict): {definition_id: valeur saisie} (les valeurs vides sont ignorées)
+
+    Returns:
+        dict: {definition_id: message d'erreur} vide si tout est conforme
+    """
+    rows = list(values.items())
+    return {rows[index][0]: message for index, message in validate_form_rows(rows)}
+
+def validate_form_rows(rows):
+    """
+    Comme validate_form_values, pour des lignes saisies où une même définition peut
+    apparaître plusieurs fois : chaque ligne est contrôlée.
+
+    Args:
+        rows (list): Couples (definition_id, valeur saisie) (les valeurs vides sont ignorées)
+
+    Returns:
+        list: Couples (index de la ligne, message d'erreur), vide si tout est conforme
+    """
+    rules = validator_cache.get_many({definition_id for definition_id, _value in rows})
+    errors = []
+    for index, (definition_id, value) in enumerate(rows):
+        definition = rules.get(definition_id)
+        if definition is None or value in (None, ''):
+            continue
+        problems = definition.check(value)
+        if problems:
+            errors.append((index, f"{definition.name} : {problems[0][1]}"))
+    return errors
+
+@event.listens_for(ParameterDefinition, 'before_update', propagate=True)
+def touch_definition(mapper, connection, target):
+    """Toute modification (bornes, regex, choix...) change la clé du cache"""
+    if object_session(target).is_modified(target, include_collections=False):
+        target.updated_at = datetime.now(timezone.utc)
+
+@event.listens_for(ParameterDefinition, 'after_update', propagate=True)
+@event.listens_for(ParameterDefinition, 'after_delete', propagate=True)
+def evict_compiled_validator(mapper, connection, target):
+    validator_cache.evict(target.id)
+
+class ValidationReport:
+    """Violations trouvées, avec agrégats par code et par définition"""
+
+    def __init__(self):
+        self.checked = 0
+        self.violations = []
+
+    def add(self, definition, row, code, message, value):
+        self.violations.append(Violation(
+            row.id, definition.id, definition.name, row.entity_type, row.entity_id, code, message, value
+        ))
+
+    @property
+    def is_valid(self):
+        return not self.violations
+
+    def by_code(self):
+        return Counter(violation.code for violation in self.violations)
+
+    def by_definition(self):
+        return Counter(violation.name for violation in self.violations)
+
+    def to_dict(self, limit=None):
+        violations = self.violations if limit is None else self.violations[:limit]
+        return {
+            'checked': self.checked,
+            'violations_count': len(self.violations),
+            'by_code': dict(self.by_code()),
+            'by_definition': dict(self.by_definition().most_common()),
+            'violations': [
+                {
+                    'value_id': violation.value_id,
+                    'definition_id': violation.definition_id,
+                    'name': violation.name,
+                    'entity_type': violation.entity_type.value if violation.entity_type else None,
+                    'entity_id': violation.entity_id,
+                    'code': violation.code,
+                    'message': violation.message,
+                    'value': violation.value
+                }
+                for violation in violations
+            ]
+        }
+
+class ParameterValidator:
+    """
+    Valide les valeurs actives en une passe.
+
+    Usage:
+        report = ParameterValidator().validate()                      # toute la flotte
+        report = ParameterValidator().validate(config_instance_id=12)
+        report = ParameterValidator().validate(entity_type=EntityType.CLIENT, entity_ids=[3, 4])
+    """
+
+    def __init__(self, definitions=None, chunk_size=CHUNK_SIZE):
+        self.definitions = definitions
+        self.chunk_size = chunk_size
+
+    def validate(self, entity_type=None, entity_ids=None, config_instance_id=None):
+        if self.definitions is None:
+            self.definitions = load_compiled_definitions()
+        report = ValidationReport()
+        result = db.session.execute(
+            self._values_query(entity_type, entity_ids, config_instance_id).execution_options(
+                yield_per=self.chunk_size
+            )
+        )
+        for rows in result.partitions():
+            report.checked += len(rows)
+            self._validate_chunk(rows, report)
+        return report
+
+    def _values_query(self, entity_type, entity_ids, config_instance_id):
+        values = ParameterValue.__table__
+        joined = values
+        columns = [values.c.id, values.c.parameter_definition_id, values.c.entity_type,
+                   values.c.entity_id, values.c.value_type]
+        for value_type, value_class in VALUE_CLASSES.items():
+            table = value_class.__table__
+            joined = joined.outerjoin(table, table.c.id == values.c.id)
+            columns.append(table.c.value.label(f'{value_type}_value'))
+
+        query = select(*columns).select_from(joined).where(values.c.is_active == True)
+        if entity_type is not None:
+            query = query.where(values.c.entity_type == EntityType(entity_type))
+        if entity_ids is not None:
+            query = query.where(values.c.entity_id.in_(list(entity_ids)))
+        if config_instance_id is not None:
+            query = query.where(values.c.config_instance_id == config_instance_id)
+        return query.order_by(values.c.id)
+
+    def _validate_chunk(self, rows, report):
+        numbers = []  # (ligne, définition, valeur) à vérifier en bloc
+        for row in rows:
+            definition = self.definitions.get(row.parameter_definition_id)
+            if definition is None:
+                continue
+            value = getattr(row, f'{row.value_type}_value', None)
+            accepted = ACCEPTED_VALUE_TYPES.get(definition.definition_type)
+            if accepted is not None and row.value_type not in accepted:
+                report.add(definition, row, 'type',
+                           f"Type {row.value_type} inattendu pour un paramètre {definition.definition_type}", value)
+            elif definition.definition_type == 'float':
+                if value is None:
+                    report.add(definition, row, 'type', "Nombre attendu, valeur absente", value)
+                else:
+                    numbers.append((row, definition, value))
+            elif definition.definition_type == 'string':
+                for code, message in definition.check_string(value):
+                    report.add(definition, row, code, message, value)
+            elif definition.definition_type == 'enum':
+                for code, message in definition.check_choice(value):
+                    report.add(definition, row, code, message, value)
+        if numbers:
+            self._check_bounds(numbers, report)
+
+    def _check_bounds(self, numbers, report):
+        """Bornes de toutes les valeurs flottantes du paquet en une comparaison"""
+        if np is None:
+            for row, definition, value in numbers:
+                for code, message in definition.check_number(value):
+                    report.add(definition, row, code, message, value)
+            return
+
+        count = len(numbers)
+        values = np.fromiter((v for _r, _d, v in numbers), dtype=float, count=count)
+        lows = np.fromiter((d.min_value for _r, d, _v in numbers), dtype=float, count=count)
+        highs = np.fromiter((d.max_value for _r, d, _v in numbers), dtype=float, count=count)
+        invalid = np.isnan(values) | (values < lows) | (values > highs)
+        for index in np.flatnonzero(invalid):
+            row, definition, value = numbers[index]
+            report.add(definition, row, 'range', definition.range_message(values[index]), value)
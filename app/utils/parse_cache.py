@@ -0,0 +1,121 @@
+# app/utils/parse_cache.py
+"""
+Cache des résultats de parsing, indexé par l'empreinte du contenu (sha256).
+Partagé par CustomConfigParser et ConfigFileParser.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024  # Taille estimée cumulée des enregistrements (octets)
+
+def content_hash(text):
+    """Calcule l'empreinte sha256 d'un contenu texte (même valeur que file_hash à l'upload)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _record_size(record):
+    """Estimation grossière de l'empreinte mémoire d'un enregistrement"""
+    return 64 + len(record.key) + len(str(record.value)) + len(record.section or '')
+
+class ParseCache:
+    """Cache LRU borné à la fois en nombre d'entrées et en taille cumulée"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_size=DEFAULT_MAX_SIZE):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # clé -> (enregistrements, taille)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_entries=None, max_size=None):
+        """Ajuste les limites (appelé depuis create_app avec la configuration Flask)"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_size is not None:
+                self.max_size = max_size
+            self._evict()
+
+    def get(self, key):
+        """Retourne les enregistrements en cache (et les marque récents) ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, records, size):
+        """Ajoute un résultat de parsing ; ignoré s'il dépasse à lui seul la taille maximale"""
+        if size > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (records, size)
+            self._size += size
+            self._evict()
+
+    def iter_records(self, key, factory):
+        """
+        Rejoue les enregistrements en cache, ou parse via `factory()` en mémorisant
+        le résultat au passage (si le parsing va jusqu'au bout et tient dans le cache).
+
+        Args:
+            key: Clé de cache (None désactive le cache)
+            factory (callable): Retourne un itérable de ConfigRecord
+        """
+        if key is None:
+            yield from factory()
+            return
+
+        cached = self.get(key)
+        if cached is not None:
+            yield from cached
+            return
+
+        yield from self.collect(key, factory())
+
+    def collect(self, key, records):
+        """Laisse passer les enregistrements en les mémorisant sous `key` en fin de parcours"""
+        if key is None:
+            yield from records
+            return
+
+        collected, size = [], 0
+        for record in records:
+            if collected is not None:
+                size += _record_size(record)
+                if size > self.max_size:
+                    collected = None  # Trop volumineux : on continue en streaming pur
+                else:
+                    collected.append(record)
+            yield record
+
+        if collected is not None:
+            self.put(key, tuple(collected), size)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_size):
+            _key, (_records, size) = self._entries.popitem(last=False)
+            self._size -= size
+
+# Instance partagée par tout le processus
+parse_cache = ParseCache()
@@ -0,0 +1,127 @@
+# app/utils/parser_registry.py
+"""
+Registre des parsers de fichiers de configuration.
+
+Chaque ConfigSchema associe un motif de nom de fichier (glob, ex. "params*.cfg")
+à une classe de parser (ConfigSchema.parser_class). Tous les motifs sont compilés
+en une seule expression régulière, et une instance de parser est conservée par schéma :
+la construction des parsers et la compilation des motifs n'ont lieu qu'une fois par
+processus (puis à chaque modification d'un ConfigSchema).
+"""
+import fnmatch
+import logging
+import ntpath
+import re
+import threading
+import time
+
+from app.utils.custom_config_parser import CustomConfigParser, ConfigFileParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARSER = 'ConfigFileParser'
+DEFAULT_TTL = 300  # Secondes avant relecture des schémas (modifications faites par un autre processus)
+
+# Classes de parser utilisables dans ConfigSchema.parser_class
+PARSER_CLASSES = {
+    'CustomConfigParser': CustomConfigParser,
+    'ConfigFileParser': ConfigFileParser,
+}
+
+def register_parser(cls):
+    """Décorateur : rend une classe de parser sélectionnable depuis ConfigSchema.parser_class"""
+    PARSER_CLASSES[cls.__name__] = cls
+    return cls
+
+class ParserRegistry:
+    """
+    Aiguillage nom de fichier -> (schéma, parser).
+
+    Les motifs sont testés sur le nom de fichier seul (sans dossier), du plus long
+    au plus court : un motif précis ("params_robot.cfg") l'emporte sur un motif
+    générique ("*.cfg").
+    Les instances de parser sont partagées : n'utiliser que leurs méthodes iter_*,
+    parse() accumulant son résultat dans l'instance.
+    """
+
+    def __init__(self, default_parser=DEFAULT_PARSER, ttl=DEFAULT_TTL):
+        self.default_parser = default_parser
+        self.ttl = ttl
+        self._matcher = None
+        self._schemas = {}  # nom du groupe de la regex -> (schema_id, parser)
+        self._default = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def configure(self, default_parser=None, ttl=None):
+        """Ajuste le parser par défaut et la durée de validité (appelé depuis create_app)"""
+        with self._lock:
+            if default_parser is not None:
+                self.default_parser = default_parser
+            if ttl is not None:
+                self.ttl = ttl
+            self._loaded_at = None
+
+    def invalidate(self):
+        """Force la recompilation au prochain appel (ConfigSchema ajouté, modifié ou supprimé)"""
+        self._loaded_at = None
+
+    def parser_for(self, file_name, schema_id=None):
+        """
+        Parser à utiliser pour un fichier.
+
+        Args:
+            file_name (str): Nom du fichier uploadé
+            schema_id (int): ConfigSchema déjà associé au fichier (prioritaire sur le motif)
+
+        Returns:
+            tuple: (id du ConfigSchema ou None, instance de parser)
+        """
+        self._ensure_loaded()
+        matcher, schemas, default = self._matcher, self._schemas, self._default
+        if schema_id is not None and f"s{schema_id}" in schemas:
+            return schemas[f"s{schema_id}"]
+        if matcher is not None and file_name:
+            match = matcher.match(ntpath.basename(file_name))
+            if match is not None:
+                return schemas[match.lastgroup]
+        return None, default
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and (not self.ttl or time.monotonic() - loaded_at < self.ttl):
+            return
+        with self._lock:
+            if self._loaded_at is loaded_at:
+                self._load()
+
+    def _load(self):
+        # Import local : le modèle importe lui-même ce module pour l'invalidation
+        from app.models.configuration import ConfigSchema
+
+        rows = ConfigSchema.query.with_entities(
+            ConfigSchema.id, ConfigSchema.name, ConfigSchema.file_pattern, ConfigSchema.parser_class
+        ).all()
+
+        parsers = {}
+        schemas = {}
+        alternatives = []
+        for schema_id, name, file_pattern, parser_class in sorted(rows, key=lambda row: (-len(row[2]), row[0])):
+            cls = PARSER_CLASSES.get(parser_class)
+            if cls is None:
+                logger.warning("ConfigSchema %s : parser inconnu '%s', schéma ignoré", name, parser_class)
+                continue
+            if parser_class not in parsers:
+                parsers[parser_class] = cls()
+            group = f"s{schema_id}"
+            schemas[group] = (schema_id, parsers[parser_class])
+            alternatives.append(f"(?P<{group}>{fnmatch.translate(file_pattern)})")
+
+        default_class = PARSER_CLASSES.get(self.default_parser, ConfigFileParser)
+        self._default = parsers.get(self.default_parser) or default_class()
+        self._schemas = schemas
+        self._matcher = re.compile('|'.join(alternatives)) if alternatives else None
+        self._loaded_at = time.monotonic()
+
+# Instance partagée par tout le processus
+parser_registry = ParserRegistry()
@@ -0,0 +1,73 @@
+# app/utils/section_index.py
+"""
+Index des sections d'un fichier de configuration.
+
+Les lignes <nom> découpent le fichier en sections ; l'index conserve pour chaque clé
+sa section, son numéro de ligne et sa position en octets, ce qui permet de relire
+une seule section sans reparser tout le fichier.
+"""
+
+INDEX_VERSION = 1
+
+class SectionIndex:
+    """
+    Arbre compact sections -> clés, sérialisable en JSON.
+
+    Format stocké :
+        {"version": 1, "sections": [
+            {"name": "General", "line_start": 2, "line_end": 40, "start": 10, "end": 1250,
+             "keys": [["cle", n° de ligne, début, fin], ...]},
+            ...
+        ]}
+    Une section rouverte plus loin dans le fichier donne une nouvelle entrée ;
+    les clés en double dans des sections différentes sont toutes conservées.
+    """
+
+    def __init__(self, sections=None):
+        self.sections = sections or []
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """Construit l'index depuis des tokens (section, clé, valeur, ligne, début, fin)"""
+        sections = []
+        current = None
+        for section, key, _value, line_no, start, end in tokens:
+            if current is None or current['name'] != section:
+                current = {
+                    'name': section,
+                    'line_start': line_no,
+                    'line_end': line_no,
+                    'start': start,
+                    'end': end,
+                    'keys': []
+                }
+                sections.append(current)
+            current['keys'].append([key, line_no, start, end])
+            current['line_end'] = line_no
+            current['end'] = end
+        return cls(sections)
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data or data.get('version') != INDEX_VERSION:
+            return None
+        return cls(data.get('sections', []))
+
+    def to_dict(self):
+        return {'version': INDEX_VERSION, 'sections': self.sections}
+
+    @property
+    def section_names(self):
+        """Noms des sections dans l'ordre du fichier (sans doublons)"""
+        names = []
+        for section in self.sections:
+            if section['name'] not in names:
+                names.append(section['name'])
+        return names
+
+    def get_sections(self, name):
+        """Entrées de l'index correspondant à une section (une par bloc du fichier)"""
+        return [section for section in self.sections if section['name'] == name]
+
+    def __len__(self):
+        return sum(len(section['keys']) for section in self.sections)
@@ -2,7 +2,8 @@
 
 import re
 import unicodedata
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect, or_, select
+from app.extensions import db
 
 def slugify(text, max_length=None):
     """
@@ -31,59 +32,163 @@ def slugify(text, max_length=None):
     
     return text
 
-def generate_model_slug(base_text, model_class, custom_value=None, max_length=25):
+# Réserve de l'espace pour le suffixe "-999"
+SUFFIX_LENGTH = 4
+# Préfixes recherchés par requête lors d'une allocation en lot
+PREFETCH_CHUNK_SIZE = 500
+
+_ALLOCATOR_KEY = 'slug_allocator'
+
+def default_base_text(model_class):
+    """Texte de repli quand le texte de base ne donne aucun slug : type d'entité, sinon table"""
+    identity = inspect(model_class).polymorphic_identity
+    return getattr(identity, 'value', None) or model_class.__tablename__
+
+class SlugAllocator:
+    """
+    Attribution de slugs uniques sans une requête par candidat.
+
+    Tous les candidats d'un texte (slug de base, slug composé avec la valeur
+    personnalisée, slug suivi d'un compteur) commencent par un même préfixe : les slugs
+    existants qui partagent ce préfixe sont lus en une requête, puis le premier libre est
+    choisi en mémoire. Les slugs attribués sont réservés dans l'allocateur, ce qui évite
+    les doublons entre objets créés dans un même lot.
+
+    La colonne slug est celle de la table qui la porte (entities pour les entités
+    polymorphiques), l'unicité étant contrôlée sur toute la table.
+
+    Un texte qui ne donne aucun slug (vide, ponctuation seule) est remplacé par
+    `default_text` (par défaut le type du modèle) : un préfixe vide ferait lire toute
+    la colonne.
+    """
+
+    def __init__(self, model_class, max_length=25, connection=None):
+        self.column = inspect(model_class).columns['slug']
+        self.max_length = max_length
+        self.connection = connection
+        self.default_text = default_base_text(model_class)
+        self.taken = set()
+        self._fetched = set()  # Préfixes déjà lus en base
+
+    def _base_text(self, base_text, default_text=None):
+        return base_text if slugify(base_text) else (default_text or self.default_text)
+
+    def _candidates(self, base_text, custom_value=None):
+        """Slug de base, slug composé éventuel, et préfixe commun à tous les candidats"""
+        base_slug = slugify(base_text, self.max_length - SUFFIX_LENGTH)
+        # 70% pour le texte principal, le reste pour la valeur personnalisée (-1 pour le tiret)
+        combined_safe_length = self.max_length - SUFFIX_LENGTH - 1
+        part1_length = int(combined_safe_length * 0.7)
+        part2_length = combined_safe_length - part1_length
+        custom_slug = None
+        if custom_value:
+            custom_slug = f"{slugify(base_text, part1_length)}-{slugify(custom_value, part2_length)}"
+        # Tous les candidats (base, composé, base raccourcie des compteurs >= 1000) commencent
+        # par le texte tronqué à la plus petite de ces longueurs
+        prefix = slugify(base_text, min(part1_length, self.max_length - SUFFIX_LENGTH - 1))
+        return base_slug, custom_slug, prefix
+
+    def prefetch(self, base_texts, default_text=None):
+        """Lit en quelques requêtes les slugs existants pour un lot de textes"""
+        prefixes = {self._candidates(self._base_text(text, default_text))[2] for text in base_texts}
+        prefixes -= self._fetched
+        prefixes = sorted(prefixes)
+        for start in range(0, len(prefixes), PREFETCH_CHUNK_SIZE):
+            self._fetch(prefixes[start:start + PREFETCH_CHUNK_SIZE])
+
+    def _fetch(self, prefixes):
+        query = select(self.column).where(
+            or_(*(self.column.startswith(prefix, autoescape=True) for prefix in prefixes))
+        )
+        execute = self.connection.execute if self.connection is not None else db.session.execute
+        self.taken.update(execute(query).scalars())
+        self._fetched.update(prefixes)
+
+    def allocate(self, base_text, custom_value=None, default_text=None):
+        """
+        Slug unique de longueur <= max_length : slug de base, sinon slug composé avec
+        `custom_value`, sinon slug de base suivi du premier compteur libre.
+        """
+        base_text = self._base_text(base_text, default_text)
+        base_slug, custom_slug, prefix = self._candidates(base_text, custom_value)
+        if prefix not in self._fetched:
+            self._fetch([prefix])
+
+        slug = base_slug
+        if slug in self.taken:
+            if custom_slug and custom_slug not in self.taken:
+                slug = custom_slug
+            else:
+                counter = 1
+                while slug in self.taken:
+                    # Au-delà de 999, base raccourcie pour un suffixe plus long
+                    if counter == 1000:
+                        base_slug = slugify(base_text, self.max_length - SUFFIX_LENGTH - 1)
+                    slug = f"{base_slug}-{counter}"
+                    counter += 1
+        self.taken.add(slug)
+        return slug
+
+def generate_model_slug(base_text, model_class, custom_value=None, max_length=25, connection=None):
     """
     Génère un slug unique pour n'importe quel modèle, en respectant strictement max_length.
     Permet également d'essayer un slug personnalisé avec une valeur supplémentaire avant d'ajouter un compteur.
+    Une seule requête (slugs existants partageant le préfixe), voir SlugAllocator.
     
     Args:
         base_text: Le texte à convertir en slug (username, name, etc.)
         model_class: La classe du modèle (User, UserGroup, etc.)
         custom_value: Valeur supplémentaire à utiliser pour le slug (optionnel)
         max_length: Longueur maximale du slug
+        connection: Connexion à utiliser (hooks de flush), sinon db.session
     
     Returns:
         str: Un slug unique de longueur <= max_length
     """
-    # Réserver de l'espace pour le suffixe potentiel "-999"
-    suffix_length = 4  
-    safe_length = max_length - suffix_length
-    
-    # Générer le slug de base avec une longueur réduite pour accommoder un éventuel suffixe
-    base_slug = slugify(base_text, safe_length)
-    slug = base_slug
-    
-    # Création de la requête pour vérifier si le slug existe déjà
-    query = model_class.query.filter(model_class.slug == slug)
-    
-    # Vérifier si le slug existe déjà
-    if query.first():
-        # Si une valeur personnalisée est fournie, essayer un slug avec cette valeur
-        if custom_value:
-            # Calculer l'espace disponible pour chaque partie du slug composé
-            combined_safe_length = max_length - suffix_length - 1  # -1 pour le tiret de séparation
-            part1_length = int(combined_safe_length * 0.7)  # 70% pour le texte principal
-            part2_length = combined_safe_length - part1_length  # Le reste pour la valeur personnalisée
-            
-            # Générer le slug composé
-            custom_slug = f"{slugify(base_text, part1_length)}-{slugify(custom_value, part2_length)}"
-            
-            # Vérifier si ce slug composé existe déjà
-            custom_query = model_class.query.filter(model_class.slug == custom_slug)
-            
-            if not custom_query.first():
-                return custom_slug
-    
-        # Si le slug existe ou si le slug composé existe aussi, ajouter un compteur
-        counter = 1
-        while query.first():
-            # Si le compteur atteint 1000, réduire davantage la base pour un suffixe plus long
-            if counter == 1000:
-                suffix_length += 1
-                base_slug = slugify(base_text, max_length - suffix_length)
-            
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-            query = model_class.query.filter(model_class.slug == slug)
-    
-    return slug
\ No newline at end of file
+    return SlugAllocator(model_class, max_length, connection).allocate(base_text, custom_value)
+
+def allocate_slugs(model_class, base_texts, custom_values=None, max_length=25):
+    """
+    Slugs uniques pour un lot de créations (imports en masse) : les slugs existants sont
+    lus en une requête par tranche de PREFETCH_CHUNK_SIZE préfixes, et deux textes
+    identiques du lot reçoivent des slugs distincts.
+
+    Args:
+        base_texts (list): Textes à convertir
+        custom_values (list): Valeur personnalisée de chaque texte (optionnel)
+
+    Returns:
+        list: Slugs, dans l'ordre de base_texts
+    """
+    base_texts = list(base_texts)
+    custom_values = list(custom_values) if custom_values is not None else [None] * len(base_texts)
+    allocator = SlugAllocator(model_class, max_length)
+    allocator.prefetch(base_texts)
+    return [allocator.allocate(text, custom) for text, custom in zip(base_texts, custom_values)]
+
+def slug_allocator(session, model_class, connection=None, max_length=25):
+    """Allocateur partagé par tous les objets d'un même flush (voir prefetch_new_slugs)"""
+    allocators = session.info.setdefault(_ALLOCATOR_KEY, {})
+    table = inspect(model_class).columns['slug'].table
+    allocator = allocators.get(table)
+    if allocator is None:
+        allocator = allocators[table] = SlugAllocator(model_class, max_length, connection)
+    return allocator
+
+@event.listens_for(db.session, 'before_flush')
+def prefetch_new_slugs(session, flush_context, instances):
+    """Nouveaux objets sans slug : slugs existants lus en lot avant les before_insert"""
+    pending = {}
+    for obj in session.new:
+        if getattr(type(obj), '__generates_slug__', False) and not obj.slug and getattr(obj, 'name', None):
+            pending.setdefault(type(obj), []).append(obj.name)
+    for model_class, names in pending.items():
+        slug_allocator(session, model_class).prefetch(names, default_base_text(model_class))
+
+@event.listens_for(db.session, 'after_flush_postexec')
+def release_slug_allocator(session, flush_context):
+    session.info.pop(_ALLOCATOR_KEY, None)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_slug_allocator(session):
+    session.info.pop(_ALLOCATOR_KEY, None)
@@ -0,0 +1,158 @@
+# app/utils/upload_helpers.py
+"""
+Utilitaires pour la réception des fichiers de configuration uploadés.
+"""
+import codecs
+import hashlib
+import os
+import re
+import tempfile
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Fins de ligne d'un fichier lu en mode texte (mêmes règles que le tokenizer)
+LINE_BREAK = re.compile(r'\r\n|\r|\n')
+
+class StreamingUpload:
+    """
+    Lecture d'un fichier uploadé par blocs, en une seule passe :
+    décodage incrémental, calcul du sha256 et découpage en lignes.
+    Le texte décodé est recopié au fil de l'eau dans un fichier du dossier d'upload,
+    la mémoire utilisée reste donc bornée par la taille d'un bloc.
+
+    Le commit doit avoir lieu dans le bloc `with` : en cas d'exception, le fichier rangé
+    par save_to (s'il n'existait pas déjà) est supprimé avec le fichier temporaire.
+
+    Usage :
+        with StreamingUpload(file.stream, folder) as upload:
+            for line in upload.iter_lines():
+                ...
+            upload.save_to(config_instance, inline_max_size)
+            db.session.commit()
+    """
+
+    def __init__(self, stream, upload_folder, encoding='utf-8', chunk_size=DEFAULT_CHUNK_SIZE):
+        self.stream = stream
+        self.upload_folder = upload_folder
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._hasher = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._spool = None
+        self._created_path = None  # Fichier rangé par save_to, absent jusque-là
+
+    def __enter__(self):
+        os.makedirs(self.upload_folder, exist_ok=True)
+        self._spool = tempfile.NamedTemporaryFile(
+            'w',
+            encoding=self.encoding,
+            newline='',
+            dir=self.upload_folder,
+            suffix='.part',
+            delete=False
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Fichier temporaire non sauvegardé (erreur ou abandon) : on le supprime
+        if self._spool is not None:
+            self._spool.close()
+            if os.path.exists(self._spool.name):
+                os.remove(self._spool.name)
+        # Erreur après save_to (ex. commit refusé) : aucune configuration ne référence le fichier
+        if exc_type is not None and self._created_path and os.path.exists(self._created_path):
+            os.remove(self._created_path)
+        return False
+
+    @property
+    def file_hash(self):
+        """Empreinte sha256 du contenu brut lu jusqu'ici"""
+        return self._hasher.hexdigest()
+
+    def compute_hash(self):
+        """
+        Pré-calcule le sha256 quand le flux est rejouable (werkzeug le stocke alors
+        sur disque), afin de consulter le cache de parsing avant de lire le contenu.
+        Retourne None si le flux ne peut pas être relu.
+        """
+        seekable = getattr(self.stream, 'seekable', None)
+        if not seekable or not seekable():
+            return None
+        hasher = hashlib.sha256()
+        start = self.stream.tell()
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+        self.stream.seek(start)
+        return hasher.hexdigest()
+
+    def store_existing(self, config_instance, file_hash, inline_max_size):
+        """
+        Réutilise un fichier identique déjà présent dans le dossier d'upload
+        (nommé par son sha256) au lieu de relire le flux.
+
+        Returns:
+            bool: True si le fichier existant a été réutilisé
+        """
+        existing_path = os.path.join(self.upload_folder, f"{file_hash}.cfg")
+        if not os.path.exists(existing_path):
+            return False
+
+        config_instance.file_hash = file_hash
+        config_instance.file_path = existing_path
+        size = os.path.getsize(existing_path)
+        if size <= inline_max_size:
+            with open(existing_path, 'r', encoding=self.encoding, newline='') as f:
+                config_instance.raw_content = f.read()
+        return True
+
+    def iter_lines(self):
+        """Produit les lignes décodées du flux, bloc par bloc"""
+        pending = ''
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            self.size += len(chunk)
+            self._hasher.update(chunk)
+
+            text = self._decoder.decode(chunk)
+            self._spool.write(text)
+
+            text = pending + text
+            # Un '\r' en fin de bloc peut être suivi d'un '\n' dans le bloc suivant
+            held = '\r' if text.endswith('\r') else ''
+            lines = LINE_BREAK.split(text[:-1] if held else text)
+            pending = lines.pop() + held
+            yield from lines
+
+        tail = self._decoder.decode(b'', final=True)
+        self._spool.write(tail)
+        pending += tail
+        if pending:
+            yield pending
+
+    def save_to(self, config_instance, inline_max_size):
+        """
+        Finalise l'upload sur une ConfigurationInstance : renseigne file_hash et file_path,
+        et ne recopie le contenu dans raw_content que pour les petits fichiers.
+
+        Args:
+            config_instance (ConfigurationInstance): Instance à compléter
+            inline_max_size (int): Taille maximale (octets) stockée en base dans raw_content
+        """
+        self._spool.close()
+        final_path = os.path.join(self.upload_folder, f"{self.file_hash}.cfg")
+        if not os.path.exists(final_path):
+            self._created_path = final_path
+        os.replace(self._spool.name, final_path)
+        self._spool = None
+
+        config_instance.file_hash = self.file_hash
+        config_instance.file_path = final_path
+        if self.size <= inline_max_size:
+            with open(final_path, 'r', encoding=self.encoding, newline='') as f:
+                config_instance.raw_content = f.read()
@@ -0,0 +1,147 @@
+# app/utils/value_archive.py
+"""
+Archivage des valeurs de paramètres désactivées.
+
+Chaque modification laisse l'ancienne ParameterValue en place avec is_active=False :
+au-delà d'un âge configurable (PARAMETER_ARCHIVE_AFTER_DAYS), ces lignes sont déplacées
+vers parameter_values_archive, par lots d'ids (une courte transaction par lot :
+INSERT ... SELECT puis DELETE, sans verrou long sur la table chaude).
+
+Les lectures courantes ne lisent que les valeurs actives et ignorent l'archive ;
+l'historique (config_history) l'inclut à la demande via typed_values(include_archive=True).
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, func, insert, select, union_all
+
+from app.extensions import db
+from app.models.parameters.archive import ParameterValueArchive
+from app.models.parameters.dependencies import ParameterDependency
+from app.models.parameters.effective import EffectiveParameterValue
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_BATCH_SIZE = 5000
+
+# Colonnes communes à parameter_values et à l'archive
+BASE_COLUMNS = (
+    'id', 'value_type', 'parameter_definition_id', 'entity_id', 'entity_type', 'config_instance_id',
+    'created_at', 'updated_at', 'is_active', 'deactivated_at', 'notes'
+)
+
+# Colonnes des tables concrètes autres que id et value, à plat dans l'archive
+EXTRA_COLUMNS = {'float': ('unit',), 'string': ('max_length',)}
+
+def typed_columns():
+    """
+    Colonnes des tables concrètes, à plat : (value_type, colonne, nom à plat), soit
+    {value_type}_value pour chaque type puis {value_type}_{colonne} pour les autres.
+    """
+    for value_type in VALUE_CLASSES:
+        yield value_type, 'value', f'{value_type}_value'
+    for value_type, names in EXTRA_COLUMNS.items():
+        for name in names:
+            yield value_type, name, f'{value_type}_{name}'
+
+def _live_values():
+    """parameter_values avec les tables concrètes à plat (cf. typed_columns), comme l'archive"""
+    values = ParameterValue.__table__
+    columns = [values.c[name] for name in BASE_COLUMNS]
+    joined = values
+    for value_class in VALUE_CLASSES.values():
+        table = value_class.__table__
+        joined = joined.outerjoin(table, table.c.id == values.c.id)
+    for value_type, name, flat_name in typed_columns():
+        columns.append(VALUE_CLASSES[value_type].__table__.c[name].label(flat_name))
+    return select(*columns).select_from(joined)
+
+def typed_values(include_archive=False):
+    """
+    Sous-requête des valeurs (colonnes de parameter_values + {value_type}_value pour
+    chaque type, float_unit et string_max_length), archive comprise si demandé (UNION ALL).
+    """
+    live = _live_values()
+    if not include_archive:
+        return live.subquery('typed_values')
+    archive = ParameterValueArchive.__table__
+    archived = select(
+        *(archive.c[name] for name in BASE_COLUMNS),
+        *(archive.c[flat_name] for _value_type, _name, flat_name in typed_columns())
+    )
+    return union_all(live, archived).subquery('typed_values')
+
+class ValueArchiver:
+    """
+    Déplace vers l'archive les valeurs inactives dont la désactivation remonte à plus de
+    `older_than`. Les valeurs encore référencées (dépendances, configuration effective)
+    restent en place.
+    """
+
+    def __init__(self, older_than=timedelta(days=DEFAULT_ARCHIVE_AFTER_DAYS), batch_size=DEFAULT_BATCH_SIZE):
+        self.cutoff = datetime.now(timezone.utc) - older_than
+        self.batch_size = batch_size
+        self.stats = {'archived': 0, 'batches': 0}
+
+    def _eligible(self):
+        values = ParameterValue.__table__
+        return (
+            values.c.is_active == False,
+            func.coalesce(values.c.deactivated_at, values.c.updated_at, values.c.created_at) < self.cutoff,
+            ~exists().where(ParameterDependency.source_value_id == values.c.id),
+            ~exists().where(EffectiveParameterValue.source_value_id == values.c.id)
+        )
+
+    def count(self):
+        """Nombre de valeurs à archiver (rien n'est écrit)"""
+        return db.session.execute(
+            select(func.count()).select_from(ParameterValue.__table__).where(*self._eligible())
+        ).scalar()
+
+    def run(self, progress=None):
+        """
+        Archive par lots de `batch_size` valeurs, un commit par lot.
+
+        Args:
+            progress (callable): Reçoit un message texte après chaque lot (optionnel)
+
+        Returns:
+            dict: Compteurs archived / batches
+        """
+        values = ParameterValue.__table__
+        last_id = 0
+        while True:
+            ids = db.session.execute(
+                select(values.c.id)
+                .where(values.c.id > last_id, *self._eligible())
+                .order_by(values.c.id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            try:
+                self._archive_batch(ids)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            last_id = ids[-1]
+            self.stats['batches'] += 1
+            self.stats['archived'] += len(ids)
+            if progress:
+                progress(f"📦 Lot {self.stats['batches']} : {self.stats['archived']} valeurs archivées")
+        return self.stats
+
+    def _archive_batch(self, ids):
+        values = ParameterValue.__table__
+        live = _live_values().where(values.c.id.in_(ids))
+        db.session.execute(
+            insert(ParameterValueArchive.__table__).from_select(
+                [*BASE_COLUMNS, *(flat_name for _value_type, _name, flat_name in typed_columns())],
+                live
+            )
+        )
+        for value_class in VALUE_CLASSES.values():
+            table = value_class.__table__
+            db.session.execute(delete(table).where(table.c.id.in_(ids)))
+        db.session.execute(delete(values).where(values.c.id.in_(ids)))
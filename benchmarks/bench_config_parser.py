@@ -0,0 +1,127 @@
+# benchmarks/bench_config_parser.py
+"""
+Benchmark du tokenizer compilé de CustomConfigParser face à l'ancienne implémentation
+(strip / startswith / split / try int / try float ligne par ligne), et lecture d'un
+fichier sur disque en mode texte face au balayage mmap.
+
+Usage :
+    python -m benchmarks.bench_config_parser [nb_lignes ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from io import StringIO
+
+from app.utils.custom_config_parser import CustomConfigParser
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+class LegacyCustomConfigParser:
+    """Copie de l'implémentation historique, conservée comme référence"""
+
+    def __init__(self, separator=":=", ignore_lines=["<"]):
+        self.config = {}
+        self.separator = separator
+        self.ignore_lines = ignore_lines
+
+    def parse(self, source):
+        return self._parse(StringIO(source))
+
+    def _parse(self, file_like):
+        for line in file_like:
+            line = line.strip()
+            if any(line.startswith(pattern) for pattern in self.ignore_lines):
+                continue
+            key_value = line.split(self.separator, 1)
+            if len(key_value) != 2:
+                continue
+            key = key_value[0].strip()
+            value = key_value[1].strip().rstrip(';')
+            try:
+                self.config[key] = int(value)
+            except ValueError:
+                try:
+                    self.config[key] = float(value)
+                except ValueError:
+                    self.config[key] = value
+        return self.config
+
+def generate_content(nb_lines, seed=42):
+    """Fichier params.cfg synthétique : sections, entiers, flottants, chaînes, lignes vides"""
+    rng = random.Random(seed)
+    lines = []
+    section = 0
+    for i in range(nb_lines):
+        if i % 500 == 0:
+            lines.append(f"<Section{section}>")
+            section += 1
+            continue
+        kind = i % 7
+        if kind in (0, 1):
+            value = str(rng.randint(-10_000, 10_000))
+        elif kind in (2, 3):
+            value = f"{rng.uniform(-1000, 1000):.4f}"
+        elif kind == 4:
+            value = ''
+        elif kind == 5:
+            value = f'"chemin/vers/fichier_{i}.dat"'
+        else:
+            value = rng.choice(['TRUE', 'FALSE', 'AUTO', 'Mode manuel'])
+        lines.append(f"  Param_{section}_{i} := {value};")
+    return '\n'.join(lines) + '\n'
+
+def timed(func, *args, repeat=3):
+    """Meilleur temps sur `repeat` exécutions (limite le bruit de la machine)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def consume(iterator):
+    count = 0
+    for _record in iterator:
+        count += 1
+    return count
+
+def parse_text_file(path):
+    """Lecture historique d'un fichier : mode texte, ligne par ligne"""
+    with open(path, 'r') as f:
+        return CustomConfigParser().parse(f)
+
+def run(sizes=DEFAULT_SIZES):
+    print(
+        f"{'lignes':>10} | {'ancien (s)':>10} | {'compilé (s)':>11} | {'gain':>6} | {'streaming (s)':>13} | "
+        f"{'fichier texte (s)':>17} | {'fichier mmap (s)':>16}"
+    )
+    print('-' * 103)
+    for nb_lines in sizes:
+        content = generate_content(nb_lines)
+        legacy, legacy_time = timed(lambda: LegacyCustomConfigParser().parse(content))
+        current, current_time = timed(lambda: CustomConfigParser().parse(content))
+        _count, streaming_time = timed(lambda: consume(CustomConfigParser().iter_records(content)))
+        if legacy != current:
+            raise AssertionError(f"Résultats différents pour {nb_lines} lignes")
+
+        with tempfile.NamedTemporaryFile('w', suffix='.cfg', delete=False) as f:
+            f.write(content)
+        try:
+            text_file, text_file_time = timed(lambda: parse_text_file(f.name))
+            mapped_file, mapped_file_time = timed(lambda: CustomConfigParser().parse(f.name))
+        finally:
+            os.remove(f.name)
+        if text_file != legacy or mapped_file != legacy:
+            raise AssertionError(f"Résultats différents (fichier) pour {nb_lines} lignes")
+
+        print(
+            f"{nb_lines:>10} | {legacy_time:>10.3f} | {current_time:>11.3f} | "
+            f"{legacy_time / current_time:>5.1f}x | {streaming_time:>13.3f} | "
+            f"{text_file_time:>17.3f} | {mapped_file_time:>16.3f}"
+        )
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,189 @@
+# benchmarks/bench_list_pages.py
+"""
+Benchmark du chargement des pages clients.list et robot_instances.list : nombre de
+requêtes SQL et temps, chargement historique (liste complète, robots chargés client par
+client, jointures multipliant les lignes, statistiques calculées en Python) face au
+chargement actuel (une page, selectin, agrégats SQL).
+
+Les données synthétiques sont insérées dans la base DATABASE_URL (SQLite en mémoire par
+défaut) ; utiliser une base vide dédiée, les tables sont supprimées à la fin.
+
+Usage :
+    python -m benchmarks.bench_list_pages [nb_clients ...]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.enums import EntityType
+
+DEFAULT_SIZES = (10_000,)
+ROBOTS_PER_CLIENT = 3
+SOFTWARES = 20
+VERSIONS_PER_SOFTWARE = 5
+ROBOT_MODELS = 10
+
+def generate_fleet(nb_clients, seed=42):
+    """Clients (plusieurs pays), modèles, logiciels/versions, robots et installations"""
+    rng = random.Random(seed)
+    tables = db.metadata.tables
+    ids = iter(range(1, 10**9))
+    entities, clients, models, softwares, versions, robots, installs = [], [], [], [], [], [], []
+
+    def entity(entity_type, name):
+        entity_id = next(ids)
+        entities.append({'id': entity_id, 'entity_type': entity_type.name, 'name': name,
+                         'slug': f'{entity_type.value}-{entity_id}'})
+        return entity_id
+
+    db.session.execute(insert(tables['postal_codes']), [
+        {'id': 1, 'code': '75000', 'city': 'Paris', 'country_code': 'FRA'},
+        {'id': 2, 'code': '1000', 'city': 'Bruxelles', 'country_code': 'BEL'}
+    ])
+    for c in range(nb_clients):
+        clients.append({'id': entity(EntityType.CLIENT, f'Client {c:06d}'), 'postal_code_id': 1 + (c % 10 == 0)})
+    for m in range(ROBOT_MODELS):
+        models.append({'id': entity(EntityType.ROBOT_MODEL, f'Modèle {m}'), 'company': 'ACME'})
+    for s in range(SOFTWARES):
+        software_id = entity(EntityType.SOFTWARE, f'Logiciel {s}')
+        softwares.append({'id': software_id, 'description': ''})
+        for v in range(VERSIONS_PER_SOFTWARE):
+            versions.append({'id': entity(EntityType.SOFTWARE_VERSION, f'Logiciel {s} {v}.0'),
+                             'version': f'{v}.0', 'software_id': software_id})
+    serial = 0
+    for client in clients:
+        for _ in range(ROBOTS_PER_CLIENT):
+            robot_id = entity(EntityType.ROBOT_INSTANCE, f'Robot {serial}')
+            robots.append({'id': robot_id, 'serial_number': f'SN{serial:08d}', 'client_id': client['id'],
+                           'robot_model_id': rng.choice(models)['id']})
+            for version in rng.sample(versions, 3):
+                installs.append({'robot_instance_id': robot_id, 'software_version_id': version['id'],
+                                 'installation_date': datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365))})
+            serial += 1
+
+    db.session.execute(insert(tables['entities']), entities)
+    for name, rows in (('client', clients), ('robotmodel', models), ('software', softwares),
+                       ('softwareversion', versions), ('robotinstance', robots),
+                       ('robot_instance_software_versions', installs)):
+        db.session.execute(insert(tables[name]), rows)
+    db.session.commit()
+    return len(robots)
+
+# --- Chargement historique (référence) --------------------------------------------------
+
+def legacy_clients_list():
+    """Chargement de clients.list avant pagination : tous les clients, robots en lazy"""
+    from sqlalchemy import func
+    from app.models.entities.client import Client
+    from app.models.entities.robot_instance import RobotInstance
+
+    clients = Client.query.options(db.joinedload(Client.postal_code_relation)).all()
+    rows = [(client.name, sorted(robot.serial_number for robot in client.robots)) for client in clients]
+    now = datetime.now()
+    Client.query.filter(Client.created_at >= datetime(now.year, now.month, 1)).count()
+    total_robots = db.session.query(func.count(RobotInstance.id)).scalar()
+    country_code = clients[0].postal_code_relation.country_code if clients else None
+    same_country = all(
+        client.postal_code_relation and client.postal_code_relation.country_code == country_code
+        for client in clients
+    )
+    return rows, {'total_clients': len(clients), 'total_robots': total_robots, 'same_country': same_country}
+
+def legacy_robot_instances_list():
+    """Chargement de robot_instances.list avant pagination : jointures sur les trois relations"""
+    from app.models.entities.client import Client
+    from app.models.entities.robot_model import RobotModel
+    from app.models.entities.robot_instance import RobotInstance
+
+    robots = RobotInstance.query.options(
+        db.joinedload(RobotInstance.client),
+        db.joinedload(RobotInstance.model),
+        db.joinedload(RobotInstance.software_versions)
+    ).all()
+    rows = [(robot.serial_number, robot.client.name, robot.model.name,
+             sorted(assoc.software_version.version for assoc in robot.software_versions)) for robot in robots]
+    stats = {
+        'total_robots': len(robots),
+        'robots_with_software': sum(1 for robot in robots if robot.software_versions),
+        'unique_clients': len({robot.client_id for robot in robots})
+    }
+    Client.query.all()
+    RobotModel.query.all()
+    return rows, stats
+
+# --- Chargement actuel -------------------------------------------------------------------
+
+def clients_list():
+    from app.routes.clients import clients_page, clients_stats
+
+    page = clients_page({})
+    rows = [(client.name, sorted(robot.serial_number for robot in client.robots)) for client in page]
+    return rows, clients_stats()
+
+def robot_instances_list():
+    from app.models.entities.client import Client
+    from app.models.entities.robot_model import RobotModel
+    from app.routes.robot_instances import robot_instances_page, robot_instances_stats
+
+    page = robot_instances_page({})
+    rows = [(robot.serial_number, robot.client.name, robot.model.name,
+             sorted(assoc.software_version.version for assoc in robot.software_versions)) for robot in page]
+    stats = robot_instances_stats()
+    db.session.query(Client.id, Client.name).order_by(Client.name).all()
+    db.session.query(RobotModel.id, RobotModel.name).order_by(RobotModel.name).all()
+    return rows, stats
+
+def measure(func):
+    """(résultat, nombre de requêtes, secondes), session vidée au préalable"""
+    db.session.expunge_all()
+    queries = [0]
+
+    def count(*_args):
+        queries[0] += 1
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return result, queries[0], elapsed
+
+def run(sizes=DEFAULT_SIZES):
+    if os.environ['DATABASE_URL'].startswith('sqlite'):
+        Config.SQLALCHEMY_ENGINE_OPTIONS = {}  # Options propres à PostgreSQL
+    app = create_app()
+
+    print(f"{'clients':>8} | {'page':<16} | {'ancien (req.)':>13} | {'ancien (s)':>10} | "
+          f"{'actuel (req.)':>13} | {'actuel (s)':>10}")
+    print('-' * 86)
+    for nb_clients in sizes:
+        with app.test_request_context():
+            db.create_all()
+            try:
+                generate_fleet(nb_clients)
+                for name, legacy, current in (('clients.list', legacy_clients_list, clients_list),
+                                              ('robot_instances', legacy_robot_instances_list, robot_instances_list)):
+                    (legacy_rows, legacy_stats), legacy_queries, legacy_time = measure(legacy)
+                    (rows, stats), queries, current_time = measure(current)
+                    # La page actuelle est le début de la liste complète ; statistiques identiques
+                    if sorted(legacy_rows)[:len(rows)] != sorted(rows) or \
+                            any(stats[key] != value for key, value in legacy_stats.items()):
+                        raise AssertionError(f"Résultats différents pour {name} ({nb_clients} clients)")
+                    print(f"{nb_clients:>8} | {name:<16} | {legacy_queries:>13} | {legacy_time:>10.3f} | "
+                          f"{queries:>13} | {current_time:>10.3f}")
+            finally:
+                db.session.remove()
+                db.drop_all()
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -1,4 +1,6 @@
+import click
 from app import create_app, db
+from app.models.enums import EntityType
 
 app = create_app()
 
@@ -8,5 +10,165 @@ def init_db():
         db.create_all()
         print("🗃️ Base de données initialisée")
 
+@app.cli.command("ingest-configs")
+@click.argument("path", type=click.Path(exists=True))
+@click.option("--entity-type", default=EntityType.ROBOT_INSTANCE.value,
+              type=click.Choice([e.value for e in EntityType]), help="Type des entités concernées")
+@click.option("--entity-id", type=int, help="Rattache tous les fichiers à cette entité")
+@click.option("--match-by", default="slug",
+              help="Colonne comparée au dossier de chaque fichier (ex. serial_number)")
+@click.option("--batch-size", default=100, show_default=True, help="Fichiers par transaction")
+@click.option("--workers", type=int, help="Processus de parsing (défaut : nombre de CPU)")
+def ingest_configs(path, entity_type, entity_id, match_by, batch_size, workers):
+    """Importe un dossier ou une archive (.zip, .tar.gz) de fichiers de configuration"""
+    from app.utils.ingest_helpers import ConfigIngestor
+
+    with app.app_context():
+        ingestor = ConfigIngestor(
+            EntityType(entity_type),
+            upload_folder=app.config['CONFIG_UPLOAD_FOLDER'],
+            inline_max_size=app.config['CONFIG_INLINE_MAX_SIZE'],
+            entity_id=entity_id,
+            match_by=match_by,
+            batch_size=batch_size,
+            workers=workers
+        )
+        stats = ingestor.run(path, progress=print)
+        print(
+            f"🗂️ {stats['files']} fichiers importés ({stats['parameters']} paramètres) en {stats['batches']} lots, "
+            f"{stats['skipped']} sans entité, {stats['errors']} en erreur"
+        )
+
+@app.cli.command("refresh-effective-config")
+def refresh_effective_config():
+    """Recalcule entièrement la table effective_parameter_values"""
+    from app.utils.effective_config import refresh_effective_values
+
+    with app.app_context():
+        count = refresh_effective_values()
+        db.session.commit()
+        print(f"⚙️ {count} paramètres effectifs recalculés")
+
+@app.cli.command("impact-analysis")
+@click.option("--entity-type", required=True, type=click.Choice([e.value for e in EntityType]),
+              help="Type de l'entité modifiée")
+@click.option("--entity-id", required=True, type=int, help="Id de l'entité modifiée")
+@click.option("--definition-id", required=True, type=int, help="Id de la définition du paramètre")
+@click.option("--value", required=True, help="Valeur proposée (JSON, ou texte brut)")
+@click.option("--samples", default=20, show_default=True, help="Robots affichés en exemple")
+def impact_analysis(entity_type, entity_id, definition_id, value, samples):
+    """Simule une modification de paramètre et affiche les robots concernés (rien n'est écrit)"""
+    import json
+    from app.utils.impact_analysis import analyze_change
+
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass  # Texte brut
+
+    with app.app_context():
+        try:
+            report = analyze_change(EntityType(entity_type), entity_id, definition_id, value, sample_size=samples)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        result = report.to_dict()
+        robots = result['robots']
+        print(
+            f"🔎 {robots['candidates']} robots concernés : {robots['reached']} atteints "
+            f"(dont {robots['changed']} dont la valeur change), {robots['overridden']} masqués par une surcharge"
+        )
+        for level, count in result['overridden_by'].items():
+            print(f"   - surcharge {level} : {count}")
+        for dependency in result['dependencies']:
+            print(
+                f"🔗 {dependency['name']} : activé sur {dependency['activated']} robots, "
+                f"désactivé sur {dependency['deactivated']}"
+            )
+        for robot in result['samples']['changed']:
+            print(f"   ✔ {robot['serial_number']} ({robot['slug']})")
+
+@app.cli.command("validate-parameters")
+@click.option("--entity-type", type=click.Choice([e.value for e in EntityType]), help="Limite à un type d'entité")
+@click.option("--entity-id", "entity_ids", type=int, multiple=True, help="Limite à une ou plusieurs entités")
+@click.option("--limit", default=50, show_default=True, help="Violations affichées")
+def validate_parameters(entity_type, entity_ids, limit):
+    """Vérifie toutes les valeurs actives contre leur définition (bornes, format, choix)"""
+    from app.utils.parameter_validation import ParameterValidator
+
+    with app.app_context():
+        report = ParameterValidator().validate(
+            entity_type=EntityType(entity_type) if entity_type else None,
+            entity_ids=entity_ids or None
+        )
+        for violation in report.violations[:limit]:
+            print(
+                f"❌ {violation.entity_type.value if violation.entity_type else '?'}:{violation.entity_id} "
+                f"{violation.name} = {violation.value!r} : {violation.message}"
+            )
+        summary = ", ".join(f"{code} : {count}" for code, count in report.by_code().items())
+        print(f"✅ {report.checked} valeurs vérifiées, {len(report.violations)} non conformes" +
+              (f" ({summary})" if summary else ""))
+
+@app.cli.command("bulk-apply-param")
+@click.option("--where-definition", "match_definition_id", required=True, type=int,
+              help="Id de la définition servant de critère (X)")
+@click.option("--where-value", "match_value", required=True, help="Valeur de X (JSON, ou texte brut)")
+@click.option("--definition-id", required=True, type=int, help="Id de la définition à poser (P)")
+@click.option("--value", help="Valeur de P (JSON, ou texte brut) ; inutile avec --deactivate")
+@click.option("--deactivate", is_flag=True, help="Désactive P au lieu de le poser")
+@click.option("--entity-type", type=click.Choice([e.value for e in EntityType]), help="Limite à un type d'entité")
+@click.option("--batch-size", default=5000, show_default=True, help="Entités par transaction")
+@click.option("--dry-run", is_flag=True, help="Affiche seulement les compteurs")
+def bulk_apply_param(match_definition_id, match_value, definition_id, value, deactivate, entity_type,
+                     batch_size, dry_run):
+    """Pose (ou désactive) un paramètre sur toutes les entités où X = Y"""
+    import json
+    from app.utils.bulk_apply_helpers import BulkParameterApply
+
+    def parse(raw):
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return raw  # Texte brut
+
+    with app.app_context():
+        try:
+            operation = BulkParameterApply(
+                match_definition_id, parse(match_value), definition_id, parse(value),
+                mode='deactivate' if deactivate else 'set',
+                entity_type=EntityType(entity_type) if entity_type else None,
+                batch_size=batch_size,
+                notes="Application en masse (flask bulk-apply-param)"
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        stats = operation.dry_run() if dry_run else operation.run(progress=print)
+        prefix = "🔎 Simulation : " if dry_run else "✅ "
+        print(
+            f"{prefix}{stats['entities']} entités sélectionnées, {stats['created']} valeurs créées, "
+            f"{stats['deactivated']} désactivées, {stats['unchanged']} déjà à jour"
+        )
+
+@app.cli.command("archive-parameter-values")
+@click.option("--older-than-days", type=int, help="Âge minimal depuis la désactivation (défaut : PARAMETER_ARCHIVE_AFTER_DAYS)")
+@click.option("--batch-size", type=int, help="Valeurs par transaction (défaut : PARAMETER_ARCHIVE_BATCH_SIZE)")
+@click.option("--dry-run", is_flag=True, help="Affiche seulement le nombre de valeurs concernées")
+def archive_parameter_values(older_than_days, batch_size, dry_run):
+    """Déplace les valeurs désactivées anciennes vers parameter_values_archive"""
+    from datetime import timedelta
+    from app.utils.value_archive import ValueArchiver
+
+    with app.app_context():
+        archiver = ValueArchiver(
+            older_than=timedelta(days=older_than_days or app.config['PARAMETER_ARCHIVE_AFTER_DAYS']),
+            batch_size=batch_size or app.config['PARAMETER_ARCHIVE_BATCH_SIZE']
+        )
+        if dry_run:
+            print(f"🔎 Simulation : {archiver.count()} valeurs à archiver")
+            return
+        stats = archiver.run(progress=print)
+        print(f"✅ {stats['archived']} valeurs archivées en {stats['batches']} lots")
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,84 @@
+# tests/conftest.py
+"""
+Application de test : SQLite en mémoire (DATABASE_URL par défaut), tables recréées et
+caches de processus vidés pour chaque test.
+"""
+import os
+
+import pytest
+from sqlalchemy import insert
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app
+from app.config import Config
+from app.extensions import db as _db
+from app.models import PostalCode
+from app.models.entities import Client
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
+from app.utils.dependency_graph import dependency_graph
+from app.utils.parameter_validation import validator_cache
+from app.utils.parse_cache import parse_cache
+from app.utils.parser_registry import parser_registry
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    if os.environ['DATABASE_URL'].startswith('sqlite'):
+        Config.SQLALCHEMY_ENGINE_OPTIONS = {}  # Options propres à PostgreSQL
+    app = create_app()
+    app.config.update(TESTING=True, CONFIG_UPLOAD_FOLDER=str(tmp_path_factory.mktemp('uploads')))
+    return app
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        _db.create_all()
+        for cache in (validator_cache, parse_cache):
+            cache.clear()
+        parser_registry.invalidate()
+        dependency_graph.invalidate()
+        try:
+            yield _db
+        finally:
+            _db.session.remove()
+            _db.drop_all()
+
+@pytest.fixture
+def client_entity(db):
+    """Un client (et son code postal), déjà enregistré"""
+    postal_code = PostalCode(code='75000', city='Paris', country_code='FRA')
+    db.session.add(postal_code)
+    db.session.flush()
+    client = Client(name='ACME', postal_code_id=postal_code.id)
+    db.session.add(client)
+    db.session.commit()
+    return client
+
+@pytest.fixture
+def add_value(db):
+    """
+    Écrit une valeur hors ORM (ligne parente et ligne concrète), comme les imports en
+    masse ; les colonnes propres à la table concrète (unit, max_length...) passent en
+    arguments nommés `extra`.
+
+    Returns:
+        callable: add(definition, entity_type, entity_id, value_type, value, ...) -> id
+    """
+    def add(definition, entity_type, entity_id, value_type, value, active=True,
+            created_at=None, deactivated_at=None, extra=None):
+        row = {
+            'value_type': value_type,
+            'parameter_definition_id': definition.id,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'is_active': active,
+            'deactivated_at': deactivated_at
+        }
+        if created_at is not None:
+            row['created_at'] = created_at
+        value_id = db.session.execute(insert(ParameterValue.__table__).values(**row)).inserted_primary_key[0]
+        db.session.execute(insert(VALUE_CLASSES[value_type].__table__).values(
+            id=value_id, value=value, **(extra or {})
+        ))
+        return value_id
+    return add
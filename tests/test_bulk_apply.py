@@ -0,0 +1,110 @@
+# tests/test_bulk_apply.py
+"""
+Application en masse (BulkParameterApply) : "mettre P = V sur toutes les entités où
+X = Y", en mode set ou deactivate, et comptes de dry_run identiques à ceux de run().
+"""
+import pytest
+from sqlalchemy import select
+
+from app.models.enums import EntityType
+from app.models.parameters.definitions import FloatParameterDefinition
+from app.models.parameters.values import ParameterValue, VALUE_CLASSES
+from app.utils.bulk_apply_helpers import BulkParameterApply
+
+CLIENT = EntityType.CLIENT
+
+def float_definition(name):
+    return FloatParameterDefinition(name=name, description='', default_value=0, min_value=0,
+                                    max_value=100, unit='', target_entity=CLIENT)
+
+@pytest.fixture
+def fleet(db, add_value):
+    """
+    X (site) : 1 pour les entités 1 à 3, 2 pour l'entité 4.
+    P (speed) : 50 sur 1, 10 sur 2 et 4, absent sur 3.
+    """
+    site, speed = float_definition('site'), float_definition('speed')
+    db.session.add_all([site, speed])
+    db.session.flush()
+    for entity_id, value in ((1, 1.0), (2, 1.0), (3, 1.0), (4, 2.0)):
+        add_value(site, CLIENT, entity_id, 'float', value)
+    for entity_id, value in ((1, 50.0), (2, 10.0), (4, 10.0)):
+        add_value(speed, CLIENT, entity_id, 'float', value)
+    db.session.commit()
+    return site, speed
+
+def values_of(db, definition):
+    """{entity_id: [(valeur, active)]} d'une définition, lignes concrètes comprises"""
+    values, floats = ParameterValue.__table__, VALUE_CLASSES['float'].__table__
+    rows = db.session.execute(
+        select(values.c.entity_id, floats.c.value, values.c.is_active)
+        .join(floats, floats.c.id == values.c.id)
+        .where(values.c.parameter_definition_id == definition.id)
+        .order_by(values.c.entity_id, values.c.id)
+    ).all()
+    result = {}
+    for entity_id, value, active in rows:
+        result.setdefault(entity_id, []).append((value, active))
+    return result
+
+def active_of(db, definition):
+    return {
+        entity_id: [value for value, active in rows if active]
+        for entity_id, rows in values_of(db, definition).items()
+    }
+
+def counts(stats):
+    return {key: stats[key] for key in ('entities', 'deactivated', 'created', 'unchanged')}
+
+@pytest.mark.parametrize('batch_size', [1, 2, 100])
+def test_set(db, fleet, batch_size):
+    site, speed = fleet
+    operation = BulkParameterApply(site.id, 1.0, speed.id, 50.0, batch_size=batch_size)
+    preview = operation.dry_run()
+
+    stats = operation.run()
+
+    assert counts(stats) == preview == {'entities': 3, 'deactivated': 1, 'created': 2, 'unchanged': 1}
+    assert active_of(db, speed) == {1: [50.0], 2: [50.0], 3: [50.0], 4: [10.0]}
+    assert values_of(db, speed)[2] == [(10.0, False), (50.0, True)]
+
+def test_set_numeric_text(db, fleet):
+    site, speed = fleet
+    stats = BulkParameterApply(site.id, '1', speed.id, '50').run()
+    assert stats['created'] == 2
+    assert active_of(db, speed)[3] == [50.0]
+
+def test_deactivate(db, fleet):
+    site, speed = fleet
+    operation = BulkParameterApply(site.id, 1.0, speed.id, mode='deactivate')
+    preview = operation.dry_run()
+
+    stats = operation.run()
+
+    assert counts(stats) == preview == {'entities': 3, 'deactivated': 2, 'created': 0, 'unchanged': 0}
+    assert active_of(db, speed) == {1: [], 2: [], 4: [10.0]}
+
+def test_match_on_the_applied_parameter(db, fleet):
+    # X == P : les entités à P = 10 passent à P = 60 ; l'ancienne valeur reste sélectionnée
+    # jusqu'à l'insertion de la nouvelle
+    _site, speed = fleet
+    operation = BulkParameterApply(speed.id, 10.0, speed.id, 60.0, batch_size=1)
+    preview = operation.dry_run()
+
+    stats = operation.run()
+
+    assert counts(stats) == preview == {'entities': 2, 'deactivated': 2, 'created': 2, 'unchanged': 0}
+    assert active_of(db, speed) == {1: [50.0], 2: [60.0], 4: [60.0]}
+
+def test_second_run_changes_nothing(db, fleet):
+    site, speed = fleet
+    BulkParameterApply(site.id, 1.0, speed.id, 50.0).run()
+    operation = BulkParameterApply(site.id, 1.0, speed.id, 50.0)
+
+    assert operation.dry_run() == {'entities': 3, 'deactivated': 0, 'created': 0, 'unchanged': 3}
+    assert counts(operation.run()) == {'entities': 3, 'deactivated': 0, 'created': 0, 'unchanged': 3}
+
+def test_rejects_out_of_range_value(db, fleet):
+    site, speed = fleet
+    with pytest.raises(ValueError):
+        BulkParameterApply(site.id, 1.0, speed.id, 500.0)
@@ -0,0 +1,75 @@
+# tests/test_config_tokenizer.py
+"""
+Le balayage mmap (octets) doit produire exactement les enregistrements d'une lecture
+du même fichier en mode texte, et du même contenu parsé en mémoire.
+"""
+import io
+
+import pytest
+
+from app.utils.custom_config_parser import ConfigFileParser, CustomConfigParser
+from app.utils.upload_helpers import StreamingUpload
+
+FIXTURE = (
+    "<Général>\r\n"
+    "  vitesse := 12;\r\n"
+    " 　<Moteur>\n"                  # Retrait Unicode avant une section
+    "couple := 3.5 ;\r"                       # '\r' seul comme fin de ligne
+    "nom := Bras principal;\r"
+    " décalage := -7 ;\n"           # Blancs Unicode autour d'un entier
+    "</Moteur>\r\n"
+    "chiffres := ٣٤;\n"             # Chiffres non ASCII
+    "vide :=\r\n"
+    "sans séparateur\r"
+    "mode = AUTO\n"
+    "</Général>\r"
+    "dernier := 1e3"
+)
+
+PARSERS = [CustomConfigParser, ConfigFileParser]
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'params.cfg'
+    path.write_bytes(FIXTURE.encode('utf-8'))
+    return path
+
+@pytest.mark.parametrize('parser_class', PARSERS)
+def test_mmap_matches_text_mode(parser_class, config_file):
+    with open(config_file, 'r', encoding='utf-8') as f:
+        text_mode = list(parser_class().iter_records(f))
+    mapped = list(parser_class().iter_file_records(str(config_file)))
+    assert mapped == text_mode
+
+@pytest.mark.parametrize('parser_class', PARSERS)
+def test_in_memory_text_matches_text_mode(parser_class, config_file):
+    with open(config_file, 'r', encoding='utf-8') as f:
+        text_mode = list(parser_class().iter_records(f))
+    assert list(parser_class().iter_text_records(FIXTURE)) == text_mode
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 4096])
+def test_streaming_upload_matches_text_mode(chunk_size, config_file, tmp_path):
+    with open(config_file, 'r', encoding='utf-8') as f:
+        text_mode = list(CustomConfigParser().iter_records(f))
+    stream = io.BytesIO(FIXTURE.encode('utf-8'))
+    with StreamingUpload(stream, str(tmp_path), chunk_size=chunk_size) as upload:
+        streamed = list(CustomConfigParser().iter_records(upload.iter_lines()))
+    assert streamed == text_mode
+
+def test_fixture_rules(config_file):
+    records = {record.key: record for record in CustomConfigParser().iter_file_records(str(config_file))}
+    assert records['couple'].value == 3.5 and records['couple'].section == 'Moteur'
+    assert records['nom'].line_no == 5
+    assert records['décalage'].value == -7
+    assert records['chiffres'].value == 34 and records['chiffres'].section is None
+    assert records['dernier'].value == 1000.0 and records['dernier'].section is None
+
+@pytest.mark.parametrize('parser_class', PARSERS)
+def test_section_index_offsets_match(parser_class, config_file):
+    parser = parser_class()
+    from_text = parser.build_text_section_index(FIXTURE).to_dict()
+    from_file = parser.build_file_section_index(str(config_file)).to_dict()
+    assert from_text == from_file
+    for entry in parser.build_file_section_index(str(config_file)).to_dict()['sections']:
+        assert list(parser.iter_text_section_records(FIXTURE, entry)) == \
+            list(parser.iter_file_section_records(str(config_file), entry))
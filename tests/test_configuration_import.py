@@ -0,0 +1,142 @@
+# tests/test_configuration_import.py
+"""
+Import de fichiers (formulaire et commande ingest-configs) : type des définitions créées
+et valeurs incompatibles signalées comme une erreur d'import, pas comme une erreur 500.
+"""
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from app.models.configuration import ConfigurationInstance
+from app.models.enums import EntityType
+from app.models.parameters.definitions import (
+    EnumParameterDefinition, FloatParameterDefinition, ParameterDefinition, StringParameterDefinition
+)
+from app.utils.ingest_helpers import ConfigIngestor
+
+@pytest.mark.parametrize('value, definition_class', [
+    ('5', FloatParameterDefinition),
+    ('-5', FloatParameterDefinition),
+    ('3.14', FloatParameterDefinition),
+    (12, FloatParameterDefinition),
+    ('²', StringParameterDefinition),
+    ('inf', StringParameterDefinition),
+    ('hello', StringParameterDefinition),
+])
+def test_create_definition_type(value, definition_class):
+    definition = ConfigurationInstance(file_name='a.cfg')._create_definition('k', value)
+    assert type(definition) is definition_class
+
+@pytest.fixture
+def mode_definition(db):
+    definition = EnumParameterDefinition(name='mode', description='', enum_values=['AUTO'])
+    db.session.add(definition)
+    db.session.commit()
+    return definition
+
+def test_upload_with_invalid_value_is_reported(db, app, client_entity, mode_definition, monkeypatch):
+    rendered = []
+    monkeypatch.setattr('app.routes.configurations.render_template', lambda *args, **kwargs: rendered.append(args) or '')
+    http = app.test_client()
+    response = http.post('/configurations/add', data={
+        'entity_type': 'client',
+        'entity_id': str(client_entity.id),
+        'config_file': (io.BytesIO(b'mode=MANUEL\nspeed=-5\n'), 'robot.cfg')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200 and rendered
+    with http.session_transaction() as session:
+        assert [category for category, _message in session['_flashes']] == ['error']
+    assert db.session.query(ConfigurationInstance).count() == 0
+
+def test_ingest_with_invalid_value_is_reported(db, app, client_entity, mode_definition, tmp_path):
+    (tmp_path / 'valid.cfg').write_text('speed=-5\n', encoding='utf-8')
+    (tmp_path / 'invalid.cfg').write_text('mode=MANUEL\n', encoding='utf-8')
+    messages = []
+    ingestor = ConfigIngestor(
+        EntityType.CLIENT, app.config['CONFIG_UPLOAD_FOLDER'], 1024,
+        entity_id=client_entity.id, batch_size=1, workers=1
+    )
+    stats = ingestor.run(str(tmp_path), progress=messages.append)
+
+    assert stats['files'] == 1 and stats['errors'] == 1
+    assert any('annulé' in message for message in messages)
+    speed = db.session.query(ParameterDefinition).filter_by(name='speed').one()
+    assert isinstance(speed, FloatParameterDefinition)
+
+SECTIONED = '<Moteur>\nvitesse := 12;\n</Moteur>\n<Bras>\nvitesse := 3;\n</Bras>\n'
+
+def test_upload_stores_section_index(db, app, client_entity):
+    response = app.test_client().post('/configurations/add', data={
+        'entity_type': 'client',
+        'entity_id': str(client_entity.id),
+        'config_file': (io.BytesIO(SECTIONED.encode('utf-8')), 'robot.cfg')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 302
+    config = db.session.query(ConfigurationInstance).one()
+    assert config.section_index == config.build_section_index().to_dict()
+
+def test_ingest_stores_section_index(db, app, client_entity, tmp_path):
+    (tmp_path / 'robot.cfg').write_text(SECTIONED, encoding='utf-8')
+    ConfigIngestor(
+        EntityType.CLIENT, app.config['CONFIG_UPLOAD_FOLDER'], 1024,
+        entity_id=client_entity.id, workers=1
+    ).run(str(tmp_path))
+
+    config = db.session.query(ConfigurationInstance).one()
+    assert config.section_index is not None
+    assert config.section_index == config.build_section_index().to_dict()
+
+def make_archive(tmp_path, kind, members):
+    if kind == 'zip':
+        path = tmp_path / 'configs.zip'
+        with zipfile.ZipFile(path, 'w') as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+    else:
+        path = tmp_path / 'configs.tar.gz'
+        with tarfile.open(path, 'w:gz') as archive:
+            for name, content in members.items():
+                data = content.encode('utf-8')
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    return str(path)
+
+@pytest.mark.parametrize('kind', ['zip', 'tar'])
+def test_ingest_archive_members_through_temporary_files(db, app, client_entity, tmp_path, kind, monkeypatch):
+    monkeypatch.setattr('app.utils.ingest_helpers.MEMBER_CHUNK_SIZE', 4)  # Plusieurs blocs par membre
+    archive = make_archive(tmp_path, kind, {'a/robot.cfg': 'speed=5\nlabel=hello\n', 'b.cfg': 'k=1\n'})
+    upload_folder = app.config['CONFIG_UPLOAD_FOLDER']
+    ingestor = ConfigIngestor(EntityType.CLIENT, upload_folder, 1024, entity_id=client_entity.id, workers=1)
+
+    stats = ingestor.run(archive)
+
+    assert (stats['files'], stats['parameters'], stats['errors']) == (2, 3, 0)
+    contents = {config.file_name: config.raw_content for config in db.session.query(ConfigurationInstance)}
+    assert contents == {'robot.cfg': 'speed=5\nlabel=hello\n', 'b.cfg': 'k=1\n'}
+    # Copies des membres et tranches de paramètres supprimées après usage
+    assert not [name for name in os.listdir(upload_folder) if name.endswith(('.member', '.records'))]
+
+def test_failed_commit_removes_stored_upload(db, app, client_entity, monkeypatch):
+    from sqlalchemy.exc import SQLAlchemyError
+
+    def refuse_commit():
+        raise SQLAlchemyError("commit refusé")
+    monkeypatch.setattr(db.session, 'commit', refuse_commit)
+    monkeypatch.setattr('app.routes.configurations.render_template', lambda *args, **kwargs: '')
+    upload_folder = app.config['CONFIG_UPLOAD_FOLDER']
+    before = set(os.listdir(upload_folder))
+
+    response = app.test_client().post('/configurations/add', data={
+        'entity_type': 'client',
+        'entity_id': str(client_entity.id),
+        'config_file': (io.BytesIO(b'contenu unique = 42\n'), 'robot.cfg')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert set(os.listdir(upload_folder)) == before
@@ -0,0 +1,54 @@
+# tests/test_dependency_graph.py
+"""
+Cache du graphe des dépendances : invalidé à la fin de la transaction qui modifie
+parameter_dependencies (commit ou rollback), jamais à partir de lignes non validées.
+"""
+import pytest
+from sqlalchemy import insert
+
+from app.models.enums import EntityType
+from app.models.parameters.definitions import FloatParameterDefinition
+from app.models.parameters.dependencies import ParameterDependency
+from app.models.parameters.values import ParameterValue
+from app.utils.dependency_graph import dependency_graph
+
+@pytest.fixture
+def definitions(db, client_entity):
+    source = FloatParameterDefinition(name='source', description='', default_value=0, min_value=0, max_value=10, unit='')
+    target = FloatParameterDefinition(name='target', description='', default_value=0, min_value=0, max_value=10, unit='')
+    db.session.add_all([source, target])
+    db.session.flush()
+    value_id = db.session.execute(insert(ParameterValue.__table__).values(
+        value_type='float', parameter_definition_id=source.id, is_active=True,
+        entity_type=EntityType.CLIENT, entity_id=client_entity.id
+    )).inserted_primary_key[0]
+    db.session.commit()
+    return source.id, target.id, value_id
+
+def add_dependency(db, definitions):
+    source_id, target_id, value_id = definitions
+    db.session.add(ParameterDependency(
+        source_parameter_id=source_id, target_parameter_id=target_id, source_value_id=value_id,
+        condition_type='equals', condition_value=1
+    ))
+    db.session.flush()
+
+def test_commit_rebuilds_graph(db, definitions):
+    source_id, target_id, _value_id = definitions
+    assert dependency_graph.graph().sources_of(target_id) == []
+
+    add_dependency(db, definitions)
+    db.session.commit()
+
+    assert set(dependency_graph.graph().sources_of(target_id)) == {source_id}
+
+def test_rollback_drops_graph_built_from_uncommitted_rows(db, definitions):
+    source_id, target_id, _value_id = definitions
+    add_dependency(db, definitions)
+    # Reconstruction pendant la transaction (ex. TTL expiré) : l'arc non validé y figure
+    dependency_graph.invalidate()
+    assert set(dependency_graph.graph().sources_of(target_id)) == {source_id}
+
+    db.session.rollback()
+
+    assert set(dependency_graph.graph().sources_of(target_id)) == set()
@@ -0,0 +1,36 @@
+# tests/test_parameter_validation.py
+"""
+Contrôle des valeurs saisies : chaque ligne du formulaire est vérifiée, y compris quand
+plusieurs lignes portent sur la même définition.
+"""
+import pytest
+
+from app.models.parameters.definitions import FloatParameterDefinition
+from app.models.parameters.values import ParameterValue
+from app.utils.parameter_validation import validate_form_rows, validate_form_values
+
+@pytest.fixture
+def speed(db):
+    definition = FloatParameterDefinition(name='speed', description='', default_value=1,
+                                          min_value=0, max_value=10, unit='m/s')
+    db.session.add(definition)
+    db.session.commit()
+    return definition
+
+def test_validate_form_rows_checks_every_row(speed):
+    errors = validate_form_rows([(speed.id, '5'), (speed.id, '12'), (speed.id, ''), (speed.id, '99')])
+    assert [index for index, _message in errors] == [1, 3]
+    assert validate_form_values({speed.id: '12'}) == {speed.id: errors[0][1]}
+
+def test_edit_rejects_invalid_duplicate_row(db, app, client_entity, speed):
+    http = app.test_client()
+    response = http.post(
+        f'/additional-params/edit/clients/{client_entity.name}',
+        data={f'param_{speed.id}': ['5', '12']}
+    )
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(f'/additional-params/edit/clients/{client_entity.name}')
+    with http.session_transaction() as session:
+        assert [category for category, _message in session['_flashes']] == ['danger']
+    assert db.session.query(ParameterValue.__table__).count() == 0
@@ -0,0 +1,66 @@
+# tests/test_parameter_values.py
+"""
+Typage des valeurs importées : un texte numérique (ConfigFileParser, non typé) rattaché
+à une définition float est stocké en float, et reste conforme à sa définition.
+"""
+import pytest
+from sqlalchemy import select
+
+from app.models.configuration import ConfigurationInstance
+from app.models.enums import EntityType
+from app.models.parameters.definitions import (
+    FloatParameterDefinition, ParameterDefinition, StringParameterDefinition
+)
+from app.models.parameters.values import ParameterValue, parse_float
+from app.utils.effective_config import EffectiveConfigResolver
+from app.utils.ingest_helpers import ConfigIngestor
+from app.utils.parameter_validation import ParameterValidator
+
+def stored_types(db):
+    """{nom de la définition: type concret de la valeur}"""
+    values = ParameterValue.__table__
+    return dict(db.session.execute(
+        select(ParameterDefinition.name, values.c.value_type)
+        .join(values, values.c.parameter_definition_id == ParameterDefinition.id)
+    ).all())
+
+@pytest.mark.parametrize('text, expected', [
+    ('5', 5.0), ('-5', -5.0), ('3.14', 3.14), (' 1e3 ', 1000.0),
+    ('²', None), ('abc', None), ('', None), ('nan', None), ('inf', None)
+])
+def test_parse_float(text, expected):
+    assert parse_float(text) == expected
+
+def test_coerce_numeric_text_for_float_definition():
+    speed = FloatParameterDefinition(name='speed')
+    label = StringParameterDefinition(name='label')
+    assert ParameterValue.coerce(speed, '5') == ('float', 5.0)
+    assert ParameterValue.coerce(speed, 'vite') == ('string', 'vite')
+    assert ParameterValue.coerce(label, '5') == ('string', '5')
+
+def test_extract_parameters_stores_numeric_text_as_float(db, client_entity):
+    config = ConfigurationInstance(
+        file_name='robot.cfg',
+        raw_content='speed=5\nlabel=hello',
+        entity_type=EntityType.CLIENT,
+        entity_id=client_entity.id
+    )
+    config.extract_parameters()
+    db.session.commit()
+
+    assert stored_types(db) == {'speed': 'float', 'label': 'string'}
+    config.validate()
+    layer = EffectiveConfigResolver().layer(EntityType.CLIENT, client_entity.id)
+    assert {parameter.name: parameter.value for parameter in layer.values()} == {'speed': 5.0, 'label': 'hello'}
+
+def test_ingest_numeric_text_passes_validation(db, client_entity, app, tmp_path):
+    (tmp_path / 'params.cfg').write_text('k=5\n', encoding='utf-8')
+    ingestor = ConfigIngestor(
+        EntityType.CLIENT, app.config['CONFIG_UPLOAD_FOLDER'], 1024,
+        entity_id=client_entity.id, workers=1
+    )
+    stats = ingestor.run(str(tmp_path))
+
+    assert stats['files'] == 1 and stats['errors'] == 0
+    assert stored_types(db) == {'k': 'float'}
+    assert ParameterValidator().validate().is_valid
@@ -0,0 +1,60 @@
+# tests/test_slug_helpers.py
+"""
+Attribution des slugs (SlugAllocator) : doublons d'un même flush, texte sans slug
+possible, et compteurs au-delà de 999.
+"""
+import pytest
+from sqlalchemy import event, insert
+
+from app.models.base import Entity
+from app.models.entities import Client, Software
+from app.models.enums import EntityType
+from app.utils.slug_helpers import allocate_slugs, generate_model_slug, slugify
+
+@pytest.fixture
+def like_parameters(db):
+    """Paramètres des requêtes LIKE émises (préfixes recherchés)"""
+    captured = []
+
+    def capture(_conn, _cursor, statement, parameters, *_args):
+        if 'LIKE' in statement:
+            captured.extend(parameters)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    yield captured
+    event.remove(db.engine, 'before_cursor_execute', capture)
+
+def new_client(client_entity, name):
+    return Client(name=name, postal_code_id=client_entity.postal_code_id)
+
+def test_duplicate_names_in_one_flush(db, client_entity):
+    clients = [new_client(client_entity, 'Robots Inc') for _ in range(3)]
+    db.session.add_all(clients)
+    db.session.commit()
+
+    assert [client.slug for client in clients] == ['robots-inc', 'robots-inc-1', 'robots-inc-2']
+
+def test_punctuation_only_name_falls_back_to_model_type(db, client_entity, like_parameters):
+    objects = [new_client(client_entity, '!!!'), Software(name='%%', description=''),
+               new_client(client_entity, '???')]
+    db.session.add_all(objects)
+    db.session.commit()
+
+    assert [obj.slug for obj in objects] == ['client', 'software', 'client-1']
+    # Jamais de préfixe vide (LIKE '%' lirait toute la colonne)
+    assert like_parameters and '' not in like_parameters
+    assert allocate_slugs(Client, ['', '***']) == ['client-2', 'client-3']
+
+def test_counter_beyond_999_keeps_max_length(db):
+    name = 'Very Long Client Name Incorporated'
+    base = slugify(name, 21)
+    taken = [base] + [f'{base}-{counter}' for counter in range(1, 1000)]
+    db.session.execute(insert(Entity.__table__), [
+        {'entity_type': EntityType.CLIENT, 'name': name, 'slug': slug} for slug in taken
+    ])
+    db.session.commit()
+
+    shortened = slugify(name, 20)
+    assert generate_model_slug(name, Client) == f'{shortened}-1000'
+    slugs = allocate_slugs(Client, [name, name])
+    assert slugs == [f'{shortened}-1000', f'{shortened}-1001']
+    assert all(len(slug) <= 25 for slug in slugs)
@@ -0,0 +1,78 @@
+# tests/test_value_archive.py
+"""
+Archivage des valeurs désactivées : les lignes déplacées vers parameter_values_archive
+gardent la valeur typée et les autres colonnes de leur table concrète, et l'historique
+reste identique quand il inclut l'archive.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.enums import EntityType
+from app.models.parameters.archive import ParameterValueArchive
+from app.models.parameters.definitions import FloatParameterDefinition, StringParameterDefinition
+from app.utils.config_history import parameter_history
+from app.utils.value_archive import ValueArchiver, typed_values
+
+LONG_AGO = datetime.now(timezone.utc) - timedelta(days=800)
+
+@pytest.fixture
+def archived_values(db, client_entity, add_value):
+    """Deux valeurs désactivées il y a longtemps, une récente, une active"""
+    speed = FloatParameterDefinition(name='speed', description='', default_value=0,
+                                     min_value=0, max_value=100, unit='m/s')
+    label = StringParameterDefinition(name='label', description='')
+    db.session.add_all([speed, label])
+    db.session.flush()
+
+    def add(definition, value_type, value, created_at, deactivated_at=None, **extra):
+        return add_value(definition, EntityType.CLIENT, client_entity.id, value_type, value,
+                         active=deactivated_at is None, created_at=created_at,
+                         deactivated_at=deactivated_at, extra=extra)
+    ids = {
+        'old_speed': add(speed, 'float', 5.0, LONG_AGO - timedelta(days=10), LONG_AGO, unit='m/s'),
+        'old_label': add(label, 'string', 'avant', LONG_AGO - timedelta(days=10), LONG_AGO, max_length=40),
+        'recent_speed': add(speed, 'float', 6.0, LONG_AGO, datetime.now(timezone.utc) - timedelta(days=1),
+                            unit='m/s'),
+        'speed': add(speed, 'float', 7.0, datetime.now(timezone.utc) - timedelta(days=1), unit='km/h'),
+    }
+    db.session.commit()
+    return ids
+
+def flat_rows(db, include_archive):
+    values = typed_values(include_archive)
+    return {
+        row.id: (row.value_type, row.float_value, row.float_unit, row.string_value, row.string_max_length)
+        for row in db.session.execute(select(values))
+    }
+
+def history(client_entity, include_archive):
+    rows = parameter_history(EntityType.CLIENT, client_entity.id, include_archive=include_archive)
+    return [(row['value_id'], row['name'], row['value'], row['valid_from'], row['valid_to']) for row in rows]
+
+def test_archive_round_trip(db, archived_values):
+    before = flat_rows(db, include_archive=False)
+    archiver = ValueArchiver(older_than=timedelta(days=365), batch_size=1)
+    assert archiver.count() == 2
+
+    stats = archiver.run()
+
+    assert stats == {'archived': 2, 'batches': 2}
+    assert db.session.query(func.count(ParameterValueArchive.id)).scalar() == 2
+    assert set(flat_rows(db, include_archive=False)) == {archived_values['recent_speed'], archived_values['speed']}
+    # Mêmes lignes, mêmes colonnes (unit, max_length comprises), avant et après archivage
+    assert flat_rows(db, include_archive=True) == before
+    assert before[archived_values['old_speed']] == ('float', 5.0, 'm/s', None, None)
+    assert before[archived_values['old_label']] == ('string', None, None, 'avant', 40)
+    assert ValueArchiver(older_than=timedelta(days=365)).count() == 0
+
+def test_history_includes_archive(db, client_entity, archived_values):
+    before = history(client_entity, include_archive=False)
+
+    ValueArchiver(older_than=timedelta(days=365)).run()
+
+    assert history(client_entity, include_archive=True) == before
+    assert [row[0] for row in history(client_entity, include_archive=False)] == [
+        archived_values['recent_speed'], archived_values['speed']
+    ]